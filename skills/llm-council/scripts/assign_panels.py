@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Assign evaluators to response panels for Stage 2 cross-evaluation.
+
+Deterministic for a given seed; nobody evaluates their own response. Below
+the panel threshold every participant evaluates every other response.
+
+Input (stdin JSON):
+  {
+    "participants": ["claude", "codex", "gemini", "grok", "llama"],
+    "labels": {"claude": "A", "codex": "B", ...},   # response label per participant (optional)
+    "seed": 7,                                      # optional (default: config seed)
+    "panel_size": 3,                                # optional (default: config)
+    "latency": {"codex": 42.0, "gemini": 18.5}      # seconds per evaluation (optional)
+  }
+
+Output (stdout JSON):
+  {"mode": "panel|full_cross_eval", "design": "bibd|cyclic|latency_weighted|full",
+   "panel_size": 3,
+   "assignments": {"claude": ["B", "D", "E"], ...},   # evaluator -> labels to score
+   "panels": {"A": ["codex", "grok", "llama"], ...},  # label -> evaluators
+   "load": {"claude": 3, ...},
+   "critical_path": 126.0}                             # only with latency
+
+Each evaluator returns {"evaluator", "scores": {label: {...}}} for its
+assigned labels; those outputs go straight into score_results.py, and
+"assignments" is the "pending" input of check_early_stop.py.
+
+Config: protocols/standard.yaml -> cross_evaluation.panel_evaluation
+"""
+
+import statistics
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from lib import panels
+from lib.io_helpers import CouncilError, run, load_config
+
+
+def _latencies(participants, latency):
+    """Seconds per evaluation for everyone; participants without one get the median."""
+    unknown = [key for key in latency if key not in participants]
+    if unknown:
+        raise CouncilError(f"'latency' keys are not participants: {unknown} "
+                           "(key latencies by participant name, not label)")
+    if not all(isinstance(v, (int, float)) and not isinstance(v, bool) and v > 0
+               for v in latency.values()):
+        raise CouncilError("'latency' values must be positive numbers")
+    known = {p: float(latency[p]) for p in participants if p in latency}
+    fallback = statistics.median(known.values())
+    return {p: known.get(p, fallback) for p in participants}
+
+
+def assign(participants, panel_size, config, seed, latency=None):
+    """{"mode", "design", "panel_size", "assignments"} over participant names."""
+    n = len(participants)
+    full = (not config.get("enabled", True) or n < config.get("threshold", 4)
+            or panel_size >= n - 1)
+    if full:
+        return {"mode": "full_cross_eval", "design": "full", "panel_size": n - 1,
+                "assignments": {p: [q for q in participants if q != p] for p in participants}}
+
+    if latency and config.get("latency_weighting", True):
+        result = panels.latency_weighted(participants, panel_size, latency, seed)
+    else:
+        result = panels.balanced(participants, panel_size, seed)
+    result.pop("offsets", None)
+    return {"mode": "panel", "panel_size": panel_size, **result}
+
+
+def handle(data):
+    participants = data.get("participants")
+    if (not participants or not isinstance(participants, list)
+            or not all(isinstance(p, str) for p in participants)):
+        raise CouncilError("Input must contain 'participants' array of names")
+    if len(set(participants)) != len(participants):
+        raise CouncilError("'participants' must be unique")
+    if len(participants) < 2:
+        raise CouncilError("Cross-evaluation needs at least 2 participants")
+
+    labels = data.get("labels") or {p: p for p in participants}
+    missing = [p for p in participants if p not in labels]
+    if missing:
+        raise CouncilError(f"'labels' missing participants: {missing}")
+    if len(set(labels[p] for p in participants)) != len(participants):
+        raise CouncilError("'labels' must be unique")
+
+    config = load_config("cross_evaluation.panel_evaluation")
+    panel_size = data.get("panel_size", config.get("panel_size", 3))
+    if not isinstance(panel_size, int) or panel_size < 1:
+        raise CouncilError("'panel_size' must be a positive integer")
+    seed = data.get("seed", config.get("seed", 0))
+    latency = data.get("latency")
+    if latency is not None and not isinstance(latency, dict):
+        raise CouncilError("'latency' must be an object")
+    if latency:
+        latency = _latencies(participants, latency)
+
+    result = assign(participants, panel_size, config, seed, latency)
+    by_participant = result.pop("assignments")
+    result["assignments"] = {p: [labels[q] for q in by_participant[p]] for p in participants}
+    result["panels"] = {labels[r]: evaluators
+                        for r, evaluators in panels.panels_of(by_participant).items()}
+    result["load"] = {p: len(by_participant[p]) for p in participants}
+    if latency:
+        result["critical_path"] = round(max(latency[p] * result["load"][p]
+                                            for p in participants), 1)
+    return result
+
+
+def main():
+    run(handle)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,21 +2,41 @@
 """
 Resource budget check for LLM Council.
 
+Given the stage about to start (next_stage), the check is predictive: the
+remaining stages of the current mode are simulated from recorded stage
+timings (record_history.py "stages"; same mode and participant count where
+there are enough, else the closest match), and the council degrades when the
+probability of overrunning the budget exceeds max_overrun_probability. It
+degrades to the first mode down DEGRADATION_ORDER that fits (stages already
+done are reused); with no lower mode left, it stops only when the median
+predicted finish is over budget. Without next_stage, in strict
+mode, or while a remaining stage has no timing history, elapsed time is
+compared to trigger_ratio x budget instead.
+
 Input (stdin JSON):
   {"elapsed": 45, "total_budget": 180, "current_mode": "deep",
-   "strict": false, "trigger_ratio": 0.8}
+   "strict": false, "trigger_ratio": 0.8,
+   "next_stage": "debate",     # optional: enables the prediction
+   "participants": 3,          # optional: external participants
+   "debate_rounds": 2}         # optional: rounds left (default limits.debate.max_rounds)
 
 Output (stdout JSON):
-  {"action": "continue|degrade|stop", "ratio": 0.25, "degrade_to": "..."|null, "reason": "..."}
+  {"action": "continue|degrade|stop", "ratio": 0.25, "degrade_to": "..."|null, "reason": "...",
+   "method": "predictive|ratio",
+   "predicted": {"overrun_probability": 0.31, "finish": 172.4, "finish_p90": 204.0,
+                 "remaining_stages": ["debate", "synthesize"],
+                 "modes": {"deep": {...}, "standard": {...}}}|null}
 
-Defaults loaded from: protocols/standard.yaml -> resource_budget
+Defaults loaded from: protocols/standard.yaml -> resource_budget, protocol_modes, history
 """
 
+import random
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
-from lib.io_helpers import read_input, write_output, fail, load_config
+from lib.history import HistoryStore, quantile
+from lib.io_helpers import CouncilError, run, load_config
 
 DEGRADATION_ORDER = ["deep", "standard", "quick"]
 
@@ -55,9 +75,81 @@ def check_budget(elapsed, total_budget, current_mode, strict, trigger_ratio):
             "reason": "within budget"}
 
 
-def main():
-    data = read_input()
-
+def stage_durations(rows, mode, participants, min_samples):
+    """Durations for one stage, from the closest history with min_samples rows."""
+    tiers = ((lambda m, p: m == mode and p == participants),
+             (lambda m, p: p == participants),
+             (lambda m, p: m == mode),
+             (lambda m, p: True))
+    for matches in tiers:
+        durations = [seconds for m, p, seconds in rows if matches(m, p)]
+        if len(durations) >= min_samples:
+            return durations
+    return None
+
+
+def simulate_finish(remaining, durations, rounds, elapsed, total_budget, simulations, seed):
+    """Monte Carlo finish times of the remaining stages -> prediction dict."""
+    rng = random.Random(seed)
+    draws = [(durations[stage], rounds if stage == "debate" else 1) for stage in remaining]
+    finishes = sorted(elapsed + sum(rng.choice(d) for d, n in draws for _ in range(n))
+                      for _ in range(simulations))
+    overruns = sum(f > total_budget for f in finishes)
+    return {"overrun_probability": round(overruns / simulations, 3),
+            "finish": quantile(finishes, 0.5), "finish_p90": quantile(finishes, 0.9),
+            "remaining_stages": remaining}
+
+
+def predictive_check(elapsed, total_budget, current_mode, next_stage, participants,
+                     rounds, samples, mode_stages, settings):
+    """Budget decision from predicted finish times, or None when there is too little history."""
+    stages = mode_stages.get(current_mode, [])
+    if next_stage not in stages:
+        raise CouncilError(f"Stage '{next_stage}' is not part of mode {current_mode}")
+    done = set(stages[:stages.index(next_stage)])
+    min_samples = settings.get("min_samples", 5)
+    threshold = settings.get("max_overrun_probability", 0.2)
+    ratio = round(elapsed / total_budget, 3)
+
+    modes = {}
+    for mode in DEGRADATION_ORDER[DEGRADATION_ORDER.index(current_mode):]:
+        remaining = [s for s in mode_stages.get(mode, []) if s not in done]
+        durations = {s: stage_durations(samples.get(s, []), mode, participants, min_samples)
+                     for s in remaining}
+        missing = [s for s, d in durations.items() if d is None]
+        if missing:
+            if mode == current_mode:
+                return None, missing
+            continue  # cannot judge this fallback mode
+        modes[mode] = simulate_finish(remaining, durations, rounds, elapsed, total_budget,
+                                      settings.get("simulations", 1000), settings.get("seed", 0))
+
+    current = modes[current_mode]
+    predicted = dict(current, modes={m: {k: v for k, v in p.items() if k != "remaining_stages"}
+                                     for m, p in modes.items()})
+    summary = (f"P(overrun) {current['overrun_probability']:.0%}, predicted finish "
+               f"{current['finish']:.0f}s of {total_budget}s")
+
+    def decision(action, degrade_to, reason):
+        return {"action": action, "ratio": ratio, "degrade_to": degrade_to, "reason": reason,
+                "method": "predictive", "predicted": predicted}, None
+
+    if current["overrun_probability"] <= threshold:
+        return decision("continue", None, f"{summary} (<= {threshold:.0%})")
+    lower = [m for m in modes if m != current_mode]
+    if not lower:
+        # Nothing to degrade to: only stop a council that is expected to overrun
+        if current["finish"] > total_budget:
+            return decision("stop", None, f"{summary}; no further degradation possible")
+        return decision("continue", None,
+                        f"{summary}; no further degradation, median finish within budget")
+    fits = [m for m in lower if modes[m]["overrun_probability"] <= threshold]
+    target = fits[0] if fits else min(lower, key=lambda m: modes[m]["overrun_probability"])
+    return decision("degrade", target,
+                    f"{summary}; {target}: {modes[target]['overrun_probability']:.0%}")
+
+
+def handle(data):
     # Load defaults from config
     defaults = load_config("resource_budget")
     time_cfg = defaults.get("time", {})
@@ -65,7 +157,7 @@ def main():
 
     elapsed = data.get("elapsed")
     if elapsed is None:
-        fail("Missing required field: elapsed")
+        raise CouncilError("Missing required field: elapsed")
 
     total_budget = data.get("total_budget")
     current_mode = data.get("current_mode", "standard")
@@ -75,15 +167,44 @@ def main():
         totals = time_cfg.get("total", {})
         total_budget = totals.get(current_mode)
         if total_budget is None:
-            fail(f"No budget defined for mode: {current_mode}")
+            raise CouncilError(f"No budget defined for mode: {current_mode}")
 
     strict = data.get("strict", time_cfg.get("strict", False))
     trigger_ratio = data.get("trigger_ratio", deg_cfg.get("trigger_ratio", 0.8))
 
-    result = check_budget(elapsed, total_budget, current_mode, strict, trigger_ratio)
+    result, note = None, None
+    next_stage = data.get("next_stage")
+    predictive = deg_cfg.get("predictive", {})
+    if next_stage is not None and not strict and total_budget > 0 and \
+            predictive.get("enabled", True) and current_mode in DEGRADATION_ORDER:
+        participants = data.get("participants")
+        rounds = data.get("debate_rounds", defaults.get("limits", {}).get(
+            "debate", {}).get("max_rounds", 3))
+        if not isinstance(rounds, int) or rounds < 0:
+            raise CouncilError("'debate_rounds' must be a non-negative integer")
+        modes_cfg = load_config("protocol_modes")
+        mode_stages = {m: modes_cfg.get(m, {}).get("stages", []) for m in DEGRADATION_ORDER}
+        with HistoryStore() as store:
+            samples = store.stage_samples({s for stages in mode_stages.values() for s in stages})
+        result, missing = predictive_check(elapsed, total_budget, current_mode, next_stage,
+                                           participants, rounds, samples, mode_stages,
+                                           predictive)
+        if result is None:
+            note = f"too little timing history for {', '.join(missing)}"
+
+    if result is None:
+        result = check_budget(elapsed, total_budget, current_mode, strict, trigger_ratio)
+        result["method"] = "ratio"
+        result["predicted"] = None
+        if note:
+            result["reason"] += f" ({note})"
     result["elapsed_seconds"] = elapsed
     result["budget_seconds"] = total_budget
-    write_output(result)
+    return result
+
+
+def main():
+    run(handle)
 
 
 if __name__ == "__main__":
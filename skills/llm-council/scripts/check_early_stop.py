@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Decide whether outstanding evaluator calls can be cancelled.
+
+Ranks the evaluations received so far (as score_results.py does) and checks
+whether the pending ones can still change the top-1 / top-k: first with a
+worst-case bound (certain), then with t prediction intervals of each
+response's final mean z at the configured confidence. Neither fires until
+every response that pending evaluators will still score has at least
+min_evaluations_per_label scores.
+
+Input (stdin JSON):
+  {
+    "evaluations": [...],                  # received so far (score_results format)
+    "weights": {"accuracy": 30, ...},
+    "pending": {"D": ["A", "B", "C"]},     # evaluator -> labels it will score, or
+                                           # ["D", ...] when panels are not known
+    "responses": ["A", "B", "C", "D"],     # all response labels (optional)
+    "target": "top_1",                     # optional: top_1 | top_k
+    "top_k": 3                             # optional
+  }
+
+Output (stdout JSON):
+  {"stop": true, "reason": "decided|confident|complete|undecided|insufficient|disabled",
+   "target": "top_1", "received": 3, "pending": ["D"], "cancel": ["D"],
+   "ranking": [...], "top_k": ["A", "B", "C"],
+   "decided": {"top_1": bool, "top_k": bool},
+   "confident": {"top_1": bool, "top_k": bool, "confidence": 0.95,
+                 "residual_sd": 0.42, "df": 6, "t": 4.03},
+   "bounds": [{"label", "z_score", "low", "high", "predicted_low", "predicted_high"}]}
+
+Config: protocols/standard.yaml -> cross_evaluation.early_stop
+        (+ cross_evaluation.panel_evaluation for unassigned pending evaluators)
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from lib.early_stop import Pending, bounds, decided, predicted_bounds, z_lists
+from lib.io_helpers import CouncilError, run, load_config
+from score_results import aggregate_scores
+
+TARGETS = ("top_1", "top_k")
+
+
+def _labels_per_evaluator(cross_config, n_responses):
+    """How many responses an evaluator without a known panel will score."""
+    panel = cross_config.get("panel_evaluation", {})
+    if panel.get("enabled", False) and n_responses >= panel.get("threshold", 4):
+        return panel.get("panel_size", 3)
+    if cross_config.get("self_evaluation", False):
+        return n_responses
+    return n_responses - 1
+
+
+def parse_pending(pending, labels, cross_config):
+    """Normalize 'pending' into Pending entries over the known labels."""
+    if isinstance(pending, dict):
+        result = []
+        for evaluator, assigned in pending.items():
+            if not isinstance(assigned, list):
+                raise CouncilError(f"Pending evaluator '{evaluator}': labels must be a list")
+            unknown = [label for label in assigned if label not in labels]
+            if unknown:
+                raise CouncilError(f"Pending evaluator '{evaluator}': unknown labels {unknown}")
+            result.append(Pending(evaluator, assigned, len(assigned)))
+        return result
+    if isinstance(pending, list):
+        count = _labels_per_evaluator(cross_config, len(labels))
+        return [Pending(evaluator, labels, count) for evaluator in pending]
+    raise CouncilError("'pending' must be an object or an array")
+
+
+def handle(data):
+    evaluations = data.get("evaluations")
+    if not evaluations or not isinstance(evaluations, list):
+        raise CouncilError("Input must contain 'evaluations' array")
+    weights = data.get("weights")
+    if not weights or not isinstance(weights, dict):
+        raise CouncilError("Input must contain 'weights' object")
+
+    cross_config = load_config("cross_evaluation")
+    config = cross_config.get("early_stop", {})
+    target = data.get("target", config.get("target", "top_1"))
+    if target not in TARGETS:
+        raise CouncilError(f"'target' must be one of {list(TARGETS)}")
+
+    ranking = aggregate_scores(evaluations, weights)
+    labels = [r["label"] for r in ranking]
+    for label in data.get("responses") or []:
+        if label not in labels:
+            labels.append(label)
+    pending_input = data.get("pending") or []
+    if isinstance(pending_input, dict):
+        for assigned in pending_input.values():
+            for label in assigned if isinstance(assigned, list) else []:
+                if label not in labels:
+                    labels.append(label)
+    pending = parse_pending(pending_input, labels, cross_config)
+
+    top_k = max(1, min(int(data.get("top_k", config.get("top_k", 3))), len(labels)))
+    z_by_label = z_lists(evaluations, weights)
+    label_bounds = bounds(z_by_label, labels, pending)
+    certain = decided(labels, label_bounds, top_k)
+    confidence = config.get("confidence", 0.95)
+    predicted, fit = predicted_bounds(z_by_label, labels, pending, label_bounds, confidence)
+    confident = dict(decided(labels, predicted, top_k), confidence=confidence, **fit)
+    # Responses the pending evaluators will still score must have enough scores already
+    floor = config.get("min_evaluations_per_label", 2)
+    thin = [label for label in labels if len(z_by_label.get(label, [])) < floor
+            and any(label in p.candidates for p in pending)]
+
+    if not pending:
+        stop, reason = True, "complete"
+    elif not config.get("enabled", True):
+        stop, reason = False, "disabled"
+    elif thin or len(evaluations) < config.get("min_evaluations", 2):
+        stop, reason = False, "insufficient"
+    elif certain[target]:
+        stop, reason = True, "decided"
+    elif confident[target]:
+        stop, reason = True, "confident"
+    else:
+        stop, reason = False, "undecided"
+
+    z_scores = {r["label"]: r["z_score"] for r in ranking}
+    return {
+        "stop": stop,
+        "reason": reason,
+        "target": target,
+        "received": len(evaluations),
+        "pending": [p.evaluator for p in pending],
+        "cancel": [p.evaluator for p in pending] if stop else [],
+        "ranking": ranking,
+        "top_k": labels[:top_k],
+        "decided": certain,
+        "confident": confident,
+        "bounds": [{"label": label, "z_score": z_scores.get(label),
+                    "low": label_bounds[label][0], "high": label_bounds[label][1],
+                    "predicted_low": predicted[label][0], "predicted_high": predicted[label][1]}
+                   for label in labels],
+    }
+
+
+def main():
+    run(handle)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,37 +2,131 @@
 """
 Classify question sensitivity level.
 
-Input (stdin JSON):  {"question": "..."}
-Output (stdout JSON): {"level": "public|sensitive", "matched_keywords": [...]}
+Input (stdin JSON):  {"question": "...", "context": "..." (optional), "redact": bool (optional)}
+Output (stdout JSON):
+  {"level": "public|sensitive", "matched_keywords": [...],
+   "detections": [{"field": "question|context", "detector": "...", "start": 0, "end": 0}],
+   "redacted": {"question": "...", "context": "..."}}   # only when redacting
+
+Keywords are matched against the question; structured detectors (PEM keys,
+API tokens, card numbers, SSNs) scan the question and context.
+
+Batch mode: check_sensitivity.py --jsonl [FILE] [--workers N]
+  Input (JSONL, FILE or stdin): one input object per line, plus optional "id"
+  Output (stdout JSONL): one result per line, in input order, with "id" echoed
+  Invalid lines produce {"id": ..., "error": "..."} and processing continues.
 
 Config: protocols/standard.yaml -> security.sensitivity
 """
 
+import argparse
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
-from lib.io_helpers import read_input, write_output, fail, load_config
+from lib import detectors
+from lib.io_helpers import CouncilError, run, load_config, iter_jsonl, write_jsonl
+from lib.keyword_matcher import get_matcher
+from lib.parallel import pool_imap
 
 
 def check_sensitivity(question, sensitive_keywords):
     """Keyword match against question text."""
-    q_lower = question.lower()
-    matched = [kw for kw in sensitive_keywords if kw.lower() in q_lower]
+    matched = get_matcher([("sensitive", sensitive_keywords)]).matched_keywords(question)
     level = "sensitive" if matched else "public"
     return {"level": level, "matched_keywords": matched}
 
 
-def main():
-    data = read_input()
+def detect(fields, detector_ids):
+    """Run detectors over {field: text}; returns findings tagged by field."""
+    findings = []
+    for field, text in fields.items():
+        for finding in detectors.scan(text, detector_ids):
+            findings.append({"field": field, **finding})
+    return findings
+
+
+def handle(data):
     question = data.get("question")
-    if not question:
-        fail("Input must contain 'question' string")
+    if not question or not isinstance(question, str):
+        raise CouncilError("Input must contain 'question' string")
+    context = data.get("context")
+    if context is not None and not isinstance(context, str):
+        raise CouncilError("'context' must be a string")
 
     config = load_config("security.sensitivity")
     keywords = config.get("sensitive_keywords", [])
     result = check_sensitivity(question, keywords)
-    write_output(result)
+
+    det_config = config.get("detectors", {})
+    if not det_config.get("enabled", True):
+        return result
+
+    fields = {"question": question}
+    if context:
+        fields["context"] = context
+    try:
+        findings = detect(fields, det_config.get("ids"))
+    except ValueError as e:
+        raise CouncilError(f"security.sensitivity.detectors: {e}")
+
+    result["detections"] = findings
+    if findings:
+        result["level"] = "sensitive"
+    if data.get("redact", det_config.get("redact", False)):
+        template = det_config.get("redaction_template", "[REDACTED:{detector}]")
+        result["redacted"] = {
+            field: detectors.redact(text, [f for f in findings if f["field"] == field],
+                                    template)
+            for field, text in fields.items()
+        }
+    return result
+
+
+def _check_line(event):
+    data, error = event
+    if error is None:
+        try:
+            result = handle(data)
+        except CouncilError as e:
+            error = str(e)
+    if error is not None:
+        result = {"error": error}
+    if data is not None and "id" in data:
+        result = {"id": data["id"], **result}
+    return result
+
+
+def check_jsonl(lines, workers=1, out=None):
+    """Classify one question object per line, writing results as they finish.
+
+    Config and matchers load once per process; with workers > 1 lines are
+    spread over a process pool and written back in input order.
+    """
+    for result in pool_imap(_check_line, iter_jsonl(lines), workers):
+        write_jsonl(result, out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Classify question sensitivity")
+    parser.add_argument("--jsonl", nargs="?", const="-", metavar="FILE",
+                        help="batch mode: read JSONL questions from FILE (default stdin)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="process pool size for --jsonl (0 = CPU count)")
+    args = parser.parse_args()
+
+    if args.jsonl is None:
+        run(handle)
+        return
+    if args.jsonl == "-":
+        check_jsonl(sys.stdin, args.workers)
+        return
+    try:
+        with open(args.jsonl, encoding="utf-8") as f:
+            check_jsonl(f, args.workers)
+    except OSError as e:
+        write_jsonl({"error": f"Cannot read {args.jsonl}: {e}"})
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Stage 1 collection with hedged requests.
+
+Every participant is called at once. When a call is still running at the
+participant's historical latency quantile (resource_budget.hedging.quantile,
+p90 by default, from record_history.py data), one backup request goes out:
+to a spare tool (beyond max_participants, fastest first) or, failing that, a
+retry of the same tool. Whichever answers first is kept and the other call
+is cancelled. A call that fails outright is backed up the same way at once.
+
+Tools without enough history (own or pooled) are hedged after
+hedging.default_trigger seconds and assumed to take
+selection.default_latency. Hedges are capped per stage (max_hedges) and
+only issued when the backup's median latency still fits in the stage
+deadline: min(per_call, stage_budget_ratio x the mode's remaining time),
+the same budget select_participants.py plans against. Calls that finish (ok, timeout or
+error) are added to the call history; calls cancelled after losing a race
+are not. The stage's duration goes to the stage timings (check_budget.py).
+
+Input (stdin JSON):
+  {
+    "participants": ["mcp__codex__codex", "mcp__gemini__ask"],
+    "prompt": "...",                        # or "prompts": {tool: prompt}
+    "spares": ["mcp__grok__chat"],          # optional: hedge targets
+    "mode": "standard", "elapsed": 20,      # optional: budget accounting
+    "endpoint": "http://127.0.0.1:8700/mcp",  # MCP HTTP (or "endpoints": {tool: url})
+    "simulate": {"tools": {"mcp__codex__codex": {"median": 20, "sigma": 0.4,
+                                                 "tail": {"probability": 0.1, "multiplier": 5}}},
+                 "seed": 0, "time_scale": 0.01},  # instead of endpoints (not recorded)
+    "hedge_after": {"mcp__codex__codex": 35}  # optional: override the history quantile
+  }
+
+Output (stdout JSON):
+  {
+    "responses": [{"participant", "tool", "attempt": "primary|spare|retry", "hedged",
+                   "latency", "response"}],
+    "failed": [{"participant", "error", "hedged", "latency"}],
+    "hedges": {"issued": 1, "won": 1, "max": 2},
+    "stage": {"deadline": 90.0, "elapsed": 31.2, "total_elapsed": 51.2, "budget_remaining": 128.8},
+    "recorded_calls": 3
+  }
+
+Latencies are seconds since the stage started (simulated seconds when simulating).
+
+Config: protocols/standard.yaml -> resource_budget (time, selection, hedging), history
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from lib.history import HistoryStore, quantile
+from lib.io_helpers import CouncilError, run, load_config
+from lib.transport import SimulatedTransport, from_input
+from select_participants import stage_budget
+
+
+def _describe(error):
+    if isinstance(error, asyncio.TimeoutError):
+        return "timeout"
+    return str(error) or type(error).__name__
+
+
+async def collect(transport, prompts, spares, hedge_after, median, per_call, deadline,
+                  max_hedges, allow_retry, time_scale=1.0):
+    """Run one hedged fan-out; returns (results in participant order, hedges, calls).
+
+    All times are in (simulated) seconds; time_scale converts to real ones.
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    hedges = {"issued": 0, "won": 0, "max": max_hedges}
+    spares = list(spares)
+    calls = []
+
+    def now():
+        return (loop.time() - start) / time_scale
+
+    async def attempt(tool, prompt):
+        began = now()
+        outcome = "error"
+        try:
+            timeout = min(per_call, deadline - began)
+            if timeout <= 0:
+                raise asyncio.TimeoutError
+            text = await transport.call(tool, prompt, timeout * time_scale)
+            outcome = "ok"
+            return text
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            raise
+        except asyncio.CancelledError:
+            outcome = None  # lost a race: latency unknown
+            raise
+        finally:
+            if outcome:
+                calls.append({"tool": tool, "latency": round(now() - began, 3),
+                              "outcome": outcome, "stage": "collect"})
+
+    def backup_for(participant):
+        if hedges["issued"] >= max_hedges:
+            return None
+        remaining = deadline - now()
+        for i, spare in enumerate(spares):
+            if median.get(spare, 0) < remaining:
+                return spares.pop(i), "spare"
+        if allow_retry and median.get(participant, 0) < remaining:
+            return participant, "retry"
+        return None
+
+    async def run_one(participant):
+        prompt = prompts[participant]
+        tasks = {asyncio.ensure_future(attempt(participant, prompt)): (participant, "primary")}
+        trigger = hedge_after.get(participant)
+        hedged, errors = False, []
+        while tasks:
+            wait = None
+            if not hedged and trigger is not None:
+                wait = max(0.0, trigger - now()) * time_scale
+            done, _ = await asyncio.wait(tasks, timeout=wait,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                tool, kind = tasks.pop(task)
+                if task.exception() is None:
+                    for other in tasks:
+                        other.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+                    hedges["won"] += kind != "primary"
+                    return {"participant": participant, "tool": tool, "attempt": kind,
+                            "hedged": hedged, "latency": round(now(), 3),
+                            "response": task.result()}
+                errors.append(f"{tool}: {_describe(task.exception())}")
+            # Hedge once: at the trigger, or at once if every attempt failed
+            if not hedged and (not done or not tasks):
+                hedged = True
+                backup = backup_for(participant)
+                if backup:
+                    hedges["issued"] += 1
+                    tasks[asyncio.ensure_future(attempt(backup[0], prompt))] = backup
+        return {"participant": participant, "error": "; ".join(errors), "hedged": hedged,
+                "latency": round(now(), 3)}
+
+    results = await asyncio.gather(*(run_one(p) for p in prompts))
+    return results, hedges, calls
+
+
+def latency_plan(tools, history, q, min_samples, default_trigger=None, default_median=None):
+    """({tool: hedge trigger}, {tool: median}) from own or pooled history.
+
+    With no usable history a tool gets the configured defaults (cold start).
+    """
+    pooled = sorted(latency for rows in history.values() for latency, _ in rows)
+    trigger, median = {}, {}
+    for tool in tools:
+        latencies = sorted(latency for latency, _ in history.get(tool, []))
+        if len(latencies) < min_samples:
+            latencies = pooled
+        if len(latencies) >= min_samples:
+            trigger[tool] = quantile(latencies, q)
+            median[tool] = quantile(latencies, 0.5)
+        else:
+            if default_trigger is not None:
+                trigger[tool] = default_trigger
+            if default_median is not None:
+                median[tool] = default_median
+    return trigger, median
+
+
+def _prompts(data, participants):
+    prompts = data.get("prompts")
+    if prompts is None:
+        prompt = data.get("prompt")
+        if not isinstance(prompt, str) or not prompt:
+            raise CouncilError("Provide 'prompt' or 'prompts'")
+        return {p: prompt for p in participants}
+    if not isinstance(prompts, dict) or set(prompts) != set(participants):
+        raise CouncilError("'prompts' must map every participant to its prompt")
+    return {p: prompts[p] for p in participants}
+
+
+def handle(data):
+    participants = data.get("participants")
+    if not participants or not isinstance(participants, list) or \
+            not all(isinstance(p, str) for p in participants):
+        raise CouncilError("Input must contain 'participants' array of tool names")
+    if len(set(participants)) != len(participants):
+        raise CouncilError("Duplicate participants")
+    spares = data.get("spares") or []
+    if not isinstance(spares, list) or not all(isinstance(s, str) for s in spares):
+        raise CouncilError("'spares' must be an array of tool names")
+    spares = [s for s in spares if s not in participants]
+    prompts = _prompts(data, participants)
+    transport, time_scale = from_input(data)
+    simulated = isinstance(transport, SimulatedTransport)
+
+    budget_cfg = load_config("resource_budget")
+    settings = budget_cfg.get("hedging", {})
+    mode = data.get("mode") or load_config("protocol_modes").get("default", "standard")
+    elapsed = data.get("elapsed", 0)
+    if not isinstance(elapsed, (int, float)) or elapsed < 0:
+        raise CouncilError("'elapsed' must be a non-negative number of seconds")
+    deadline = stage_budget(mode, elapsed, budget_cfg, budget_cfg.get("selection", {}))
+    per_call = budget_cfg.get("time", {}).get("per_call", 120)
+
+    with HistoryStore() as store:
+        history = store.samples()
+    trigger, median = latency_plan(participants + spares, history,
+                                   settings.get("quantile", 0.9),
+                                   settings.get("min_samples", 5),
+                                   settings.get("default_trigger"),
+                                   budget_cfg.get("selection", {}).get("default_latency"))
+    overrides = data.get("hedge_after") or {}
+    if not isinstance(overrides, dict) or not all(
+            isinstance(v, (int, float)) and not isinstance(v, bool) and v >= 0
+            for v in overrides.values()):
+        raise CouncilError("'hedge_after' must map tools to non-negative seconds")
+    trigger.update(overrides)
+    enabled = settings.get("enabled", True)
+    spares.sort(key=lambda s: median.get(s, float("inf")))
+
+    results, hedges, calls = asyncio.run(collect(
+        transport, prompts, spares, trigger if enabled else {}, median, per_call, deadline,
+        settings.get("max_hedges", 2) if enabled else 0,
+        settings.get("retry_same_tool", True), time_scale))
+
+    stage_elapsed = max([r["latency"] for r in results] or [0.0])
+    recorded = 0
+    if calls and not simulated and settings.get("record_history", True):
+        with HistoryStore() as store:
+            store.record_calls(calls)
+            store.record_stages([{"mode": mode, "stage": "collect", "seconds": stage_elapsed,
+                                  "participants": len(participants)}])
+        recorded = len(calls)
+    total = budget_cfg.get("time", {}).get("total", {}).get(mode, 0)
+    return {
+        "responses": [r for r in results if "response" in r],
+        "failed": [r for r in results if "response" not in r],
+        "hedges": hedges,
+        "stage": {"deadline": round(deadline, 1), "elapsed": round(stage_elapsed, 3),
+                  "total_elapsed": round(elapsed + stage_elapsed, 3),
+                  "budget_remaining": round(total - elapsed - stage_elapsed, 3)},
+        "recorded_calls": recorded,
+    }
+
+
+def main():
+    run(handle)
+
+
+if __name__ == "__main__":
+    main()
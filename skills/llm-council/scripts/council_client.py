@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Thin client for the council helper daemon.
+
+Usage:
+    python3 scripts/council_client.py <method> <<< '<stdin JSON>'
+
+Same stdin/stdout JSON contract as scripts/<method>.py (e.g. check_budget,
+sanitize_content). Falls back to running the handler in-process when no
+daemon is listening, so it is always safe to call.
+"""
+
+import os
+import sys
+
+# os.path rather than pathlib: this client is on the latency-critical path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from lib import rpc
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit(rpc.emit({"ok": False,
+                           "error": "Usage: council_client.py <method> < input.json"}))
+
+    method = sys.argv[1]
+    raw_input = sys.stdin.read()
+    try:
+        response = rpc.call(method, raw_input)
+    except OSError:
+        # No daemon: pay the startup cost once, in this process
+        from council_daemon import dispatch
+        response = dispatch({"method": method, "input": raw_input})
+    sys.exit(rpc.emit(response))
+
+
+if __name__ == "__main__":
+    main()
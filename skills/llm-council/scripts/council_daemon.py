@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Long-lived helper daemon for LLM Council scripts.
+
+Loads protocols/standard.yaml once and serves every script's handler over a
+Unix domain socket, so stage transitions skip interpreter startup, imports
+and YAML parsing. Config is re-parsed only when the file changes.
+
+Usage:
+    python3 scripts/council_daemon.py [--socket PATH]
+
+Clients use the same stdin/stdout JSON contract as the scripts:
+    python3 scripts/council_client.py check_budget <<< '{"elapsed": 45, ...}'
+
+Socket: $LLM_COUNCIL_SOCKET, else $XDG_RUNTIME_DIR/llm-council.sock,
+else /tmp/llm-council-<uid>.sock
+"""
+
+import argparse
+import importlib
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from lib import rpc
+from lib.io_helpers import CouncilError, parse_input, load_config
+
+# RPC method name -> script module exposing handle(data)
+METHODS = {
+    "assign_panels": "assign_panels",
+    "check_budget": "check_budget",
+    "check_early_stop": "check_early_stop",
+    "check_sensitivity": "check_sensitivity",
+    "collect_responses": "collect_responses",
+    "detect_llms": "detect_llms",
+    "detect_search": "detect_search",
+    "detect_tools": "detect_tools",
+    "pairwise_tournament": "pairwise_tournament",
+    "probe_tools": "probe_tools",
+    "record_history": "record_history",
+    "run_stage": "run_stage",
+    "sanitize_content": "sanitize_content",
+    "score_online": "score_online",
+    "score_results": "score_results",
+    "select_participants": "select_participants",
+    "validate_weights": "validate_weights",
+}
+
+_handlers = {}
+
+
+def _get_handler(method):
+    handler = _handlers.get(method)
+    if handler is None:
+        handler = importlib.import_module(METHODS[method]).handle
+        _handlers[method] = handler
+    return handler
+
+
+def dispatch(request):
+    """Run one request dict and return a response dict (never raises)."""
+    method = request.get("method")
+    if method == "ping":
+        return {"ok": True, "result": {"pong": True, "pid": os.getpid()}}
+    if method not in METHODS:
+        return {"ok": False, "error": f"Unknown method: {method}"}
+    try:
+        data = parse_input(request.get("input", ""))
+        return {"ok": True, "result": _get_handler(method)(data)}
+    except CouncilError as e:
+        return {"ok": False, "error": str(e)}
+    except Exception as e:  # keep serving other clients
+        return {"ok": False, "error": f"Internal error in {method}: {e}"}
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """One connection may carry any number of newline-delimited requests."""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError as e:
+                response = {"ok": False, "error": f"Invalid request: {e}"}
+            else:
+                if isinstance(request, dict):
+                    response = dispatch(request)
+                else:
+                    response = {"ok": False, "error": "Request must be a JSON object"}
+            self.wfile.write(rpc.encode(response))
+            self.wfile.flush()
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def _claim_socket(path):
+    """Remove a stale socket file; refuse to start if a daemon is live."""
+    if not os.path.exists(path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        os.unlink(path)
+    else:
+        sys.exit(f"Daemon already listening on {path}")
+    finally:
+        probe.close()
+
+
+def warm_up():
+    """Import every handler and parse the config before accepting requests."""
+    for method in METHODS:
+        _get_handler(method)
+    load_config("resource_budget")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--socket", default=rpc.default_socket_path(),
+                        help="Unix socket path")
+    args = parser.parse_args()
+
+    warm_up()
+    _claim_socket(args.socket)
+
+    old_umask = os.umask(0o177)  # socket is private to this user
+    try:
+        server = _Server(args.socket, _RequestHandler)
+    finally:
+        os.umask(old_umask)
+
+    def _stop(signum, frame):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+
+    print(f"llm-council daemon listening on {args.socket}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(args.socket):
+            os.unlink(args.socket)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Detect LLM and search tools among available MCP tools in one pass.
+
+Each tool is normalized and its text scanned once for both signal sets,
+instead of once per detect_llms.py / detect_search.py call.
+
+Input (stdin JSON):
+  {"tools": [{"name": "...", "description": "...", "parameters": {...}}],
+   "cache": true,             # optional: false = bypass the result cache
+   "changes_only": false,     # optional: report only changes since the last run
+   "catalog": "default"}      # optional: whose last run to diff against
+
+Output (stdout JSON):
+  {"llm": {"participants": [...], "confirmation_needed": [...]},
+   "search": {"search_tools": [...], "confirmation_needed": [...]}}
+  changes_only: {"llm": {"added", "changed", "removed", "unchanged"}, "search": {...}}
+
+Config: protocols/standard.yaml -> llm_tool_detection, search_tool_detection,
+        tool_detection_cache
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from lib.io_helpers import CouncilError, run
+from lib.tool_classifier import detect, detect_options
+
+
+def handle(data):
+    tools = data.get("tools")
+    if not tools or not isinstance(tools, list):
+        raise CouncilError("Input must contain 'tools' array")
+    return detect(tools, **detect_options(data))
+
+
+def main():
+    run(handle)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Bradley-Terry model for pairwise comparisons.
+
+Each response i has a strength w_i with P(i beats j) = w_i / (w_i + w_j).
+Strengths are fitted with Hunter's MM iteration; a tie counts half a win
+for each side. Every response also plays `prior` virtual ties against a
+fixed reference of strength 1, which keeps unbeaten or winless responses
+finite and anchors the scale (a Bayesian prior in game units).
+"""
+
+import math
+
+
+def fit(n_items, comparisons, prior=1.0, max_iterations=500, tolerance=1e-8):
+    """Fit strengths from [(i, j, score_i)] where score_i is 1, 0.5 or 0.
+
+    Returns:
+        {"strength": [log w_i, mean 0], "stderr": [...], "iterations": n,
+         "converged": bool}
+    """
+    wins = [prior / 2.0] * n_items
+    games = {}  # (i, j) with i < j -> number of comparisons
+    for i, j, score in comparisons:
+        wins[i] += score
+        wins[j] += 1.0 - score
+        key = (i, j) if i < j else (j, i)
+        games[key] = games.get(key, 0) + 1
+    opponents = [[] for _ in range(n_items)]
+    for (i, j), n in games.items():
+        opponents[i].append((j, n))
+        opponents[j].append((i, n))
+
+    w = [1.0] * n_items
+    converged = False
+    iterations = 0
+    for iterations in range(1, max_iterations + 1):
+        updated = []
+        for i in range(n_items):
+            den = prior / (w[i] + 1.0) + sum(n / (w[i] + w[j]) for j, n in opponents[i])
+            updated.append(wins[i] / den if den > 0 else w[i])
+        change = max((abs(math.log(a) - math.log(b)) for a, b in zip(updated, w)),
+                     default=0.0)
+        w = updated
+        if change < tolerance:
+            converged = True
+            break
+
+    log_w = [math.log(v) for v in w]
+    mean = sum(log_w) / n_items if n_items else 0.0
+    return {
+        "strength": [v - mean for v in log_w],
+        "stderr": _stderr(w, opponents, prior),
+        "iterations": iterations,
+        "converged": converged,
+    }
+
+
+def _stderr(w, opponents, prior):
+    """Approximate stderr of each log-strength from the Fisher information diagonal."""
+    result = []
+    for i, wi in enumerate(w):
+        info = prior * wi / (wi + 1.0) ** 2
+        info += sum(n * wi * w[j] / (wi + w[j]) ** 2 for j, n in opponents[i])
+        result.append(1.0 / math.sqrt(info) if info > 0 else float("inf"))
+    return result
+
+
+def win_probability(strength_i, strength_j):
+    """P(i beats j) from log-strengths."""
+    return 1.0 / (1.0 + math.exp(strength_j - strength_i))
@@ -0,0 +1,157 @@
+"""
+Evaluator calibration across sessions.
+
+Per-session z-normalization estimates each evaluator's scale from the few
+scores it gave in that session (and gives up below 2). The store keeps a
+running mean/variance per evaluator and rubric dimension across sessions in
+SQLite (cache_dir()/calibration.sqlite3), merged with Chan's parallel
+Welford update so each session adds its stats in one row write.
+
+calibrated_ranking() standardizes every dimension score against that
+history blended with the in-session stats: the history counts as up to
+`prior_weight` observations, so a new evaluator is normalized on its
+session alone and a well-known one mostly on its history.
+"""
+
+import math
+import sqlite3
+import time
+
+from .io_helpers import CouncilError, cache_dir
+from .score_engine import weighted_score
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS evaluator_stats (
+    evaluator TEXT NOT NULL,
+    dimension TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    mean REAL NOT NULL,
+    m2 REAL NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (evaluator, dimension)
+);
+CREATE TABLE IF NOT EXISTS recorded_sessions (
+    session TEXT PRIMARY KEY,
+    recorded REAL NOT NULL
+);
+"""
+
+
+def default_path():
+    return cache_dir() / "calibration.sqlite3"
+
+
+class CalibrationStore:
+    """SQLite-backed running stats per (evaluator, dimension)."""
+
+    def __init__(self, path=None):
+        self.path = path or default_path()
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.conn = sqlite3.connect(str(self.path), timeout=30)
+            self.conn.executescript(_SCHEMA)
+        except (OSError, sqlite3.Error) as e:
+            raise CouncilError(f"Cannot open calibration store {self.path}: {e}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.conn.close()
+
+    def priors(self, evaluators):
+        """{(evaluator, dimension): (n, mean, variance)} for the given evaluators."""
+        evaluators = list(evaluators)
+        if not evaluators:
+            return {}
+        marks = ",".join("?" * len(evaluators))
+        rows = self.conn.execute(
+            f"SELECT evaluator, dimension, n, mean, m2 FROM evaluator_stats "
+            f"WHERE evaluator IN ({marks})", evaluators)
+        return {(e, d): (n, mean, m2 / n if n else 0.0) for e, d, n, mean, m2 in rows}
+
+    def record(self, session_id, evaluations):
+        """Add one session's scores; returns False if the session was already recorded."""
+        stats = session_stats(evaluations)
+        now = time.time()
+        with self.conn:
+            inserted = self.conn.execute(
+                "INSERT OR IGNORE INTO recorded_sessions (session, recorded) VALUES (?, ?)",
+                (str(session_id), now)).rowcount
+            if not inserted:
+                return False
+            for (evaluator, dim), (n, mean, m2) in stats.items():
+                row = self.conn.execute(
+                    "SELECT n, mean, m2 FROM evaluator_stats WHERE evaluator = ? AND dimension = ?",
+                    (evaluator, dim)).fetchone()
+                if row:
+                    n, mean, m2 = _merge(row, (n, mean, m2))
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO evaluator_stats VALUES (?, ?, ?, ?, ?, ?)",
+                    (evaluator, dim, n, mean, m2, now))
+        return True
+
+
+def session_stats(evaluations):
+    """{(evaluator, dimension): (n, mean, m2)} over one session's scores."""
+    values = {}
+    for ev in evaluations:
+        evaluator = ev.get("evaluator", "?")
+        for dim_scores in ev.get("scores", {}).values():
+            for dim, score in dim_scores.items():
+                values.setdefault((evaluator, dim), []).append(score)
+    stats = {}
+    for key, scores in values.items():
+        mean = sum(scores) / len(scores)
+        stats[key] = (len(scores), mean, sum((s - mean) ** 2 for s in scores))
+    return stats
+
+
+def _merge(a, b):
+    """Combine two (n, mean, m2) summaries."""
+    n_a, mean_a, m2_a = a
+    n_b, mean_b, m2_b = b
+    n = n_a + n_b
+    delta = mean_b - mean_a
+    return n, mean_a + delta * n_b / n, m2_a + m2_b + delta * delta * n_a * n_b / n
+
+
+def blend(prior, session, prior_weight):
+    """Mean and stdev from history (capped at prior_weight obs) plus session stats."""
+    n_s, mean_s, m2_s = session
+    k = min(prior[0], prior_weight) if prior else 0
+    if k == 0:
+        return mean_s, math.sqrt(m2_s / n_s) if n_s >= 2 else 0.0
+    _, mean_p, var_p = prior
+    n, mean, m2 = _merge((k, mean_p, var_p * k), session)
+    return mean, math.sqrt(m2 / n)
+
+
+def calibrated_ranking(evaluations, weights, priors, prior_weight=20):
+    """[{label, z_score, raw_score}]: weighted per-dimension z-scores, averaged.
+
+    Each score is standardized against its evaluator's blended stats for that
+    dimension; a response's z for one evaluator is the weight-averaged
+    dimension z, and its z_score the mean over evaluators.
+    """
+    stats = session_stats(evaluations)
+    z_lists, raw_lists = {}, {}
+    for ev in evaluations:
+        evaluator = ev.get("evaluator", "?")
+        for label, dim_scores in ev.get("scores", {}).items():
+            total = weight_sum = 0.0
+            for dim, score in dim_scores.items():
+                w = weights.get(dim, 0)
+                mean, stdev = blend(priors.get((evaluator, dim)), stats[(evaluator, dim)],
+                                    prior_weight)
+                total += w * ((score - mean) / stdev if stdev > 0 else 0.0)
+                weight_sum += w
+            z_lists.setdefault(label, []).append(total / weight_sum if weight_sum else 0.0)
+            raw_lists.setdefault(label, []).append(weighted_score(dim_scores, weights))
+
+    ranking = [{"label": label,
+                "z_score": round(sum(z) / len(z), 4),
+                "raw_score": round(sum(raw_lists[label]) / len(raw_lists[label]), 3)}
+               for label, z in z_lists.items()]
+    ranking.sort(key=lambda r: r["z_score"], reverse=True)
+    return ranking
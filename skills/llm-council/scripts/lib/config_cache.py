@@ -0,0 +1,87 @@
+"""
+On-disk compiled cache for parsed config files.
+
+Parsed YAML trees are stored with marshal (the format CPython uses for .pyc
+files) under the user cache dir, one entry per config path and parser. An
+entry is reused while the file's mtime and size match; if only the mtime
+moved, the content hash decides. Any edit to the YAML invalidates it.
+
+Cache failures are never fatal: unreadable, stale or unwritable entries just
+fall back to parsing.
+"""
+
+import hashlib
+import marshal
+import os
+
+_FORMAT_VERSION = 1
+
+
+def _entry_path(directory, path, parser_tag):
+    key = f"{os.path.abspath(path)}\0{parser_tag}".encode("utf-8")
+    name = hashlib.sha256(key).hexdigest()[:24]
+    return os.path.join(directory, f"config-{name}.marshal")
+
+
+def _read_entry(entry_path):
+    try:
+        with open(entry_path, "rb") as f:
+            entry = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(entry, dict) or entry.get("format") != _FORMAT_VERSION:
+        return None
+    return entry
+
+
+def _write_entry(entry_path, entry):
+    tmp_path = f"{entry_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            f.write(marshal.dumps(entry))
+        os.replace(tmp_path, entry_path)
+    except (OSError, ValueError):
+        # ValueError: tree holds a type marshal can't store (e.g. datetime)
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+def load(path, st, parse, parser_tag, directory):
+    """Return the parsed tree for `path`, using the compiled cache.
+
+    Args:
+        path: config file path
+        st: os.stat_result for `path` (already taken by the caller)
+        parse: function(text) -> tree, used on a cache miss
+        parser_tag: identifies the active parser, e.g. "pyyaml" or "fallback"
+        directory: cache directory
+    """
+    entry_path = _entry_path(directory, path, parser_tag)
+    entry = _read_entry(entry_path)
+
+    if entry and entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+        return entry["tree"]
+
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())  # describe exactly the bytes we hash
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+
+    if entry and entry["sha256"] == digest:
+        tree = entry["tree"]  # touched but unchanged
+    else:
+        tree = parse(raw.decode("utf-8"))
+
+    _write_entry(entry_path, {
+        "format": _FORMAT_VERSION,
+        "path": os.path.abspath(path),
+        "parser": parser_tag,
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+        "sha256": digest,
+        "tree": tree,
+    })
+    return tree
@@ -0,0 +1,221 @@
+"""
+Persistent cache of MCP tool detection results across sessions.
+
+The tool catalog rarely changes between council runs, so results are stored
+in SQLite (cache_dir()/tool_detection.sqlite3) under a key built from the
+detection kind, a hash of that kind's config section and a hash of the
+tool's name/description/parameters. Editing either the tool or the config
+gives a new key; stale entries age out through LRU eviction once the table
+holds more than `max_entries` rows.
+
+The store also keeps the last result set per (catalog, kind) with a hash of
+the whole catalog. An unchanged catalog is answered from that one row, with
+no per-tool work beyond hashing; it is also what a run diffs against to
+report only what changed since the previous one.
+
+Passed tool probes (scripts/probe_tools.py) are kept here too, keyed by
+probe_key(), and count as verified for a TTL.
+
+Cache failures are never fatal: callers fall back to classifying or probing.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+from .io_helpers import NO_CACHE_ENV, cache_dir, load_config
+
+# Bump when scoring logic changes in a way the config hash cannot see
+_FORMAT_VERSION = 1
+
+# SQLite's default limit on bound parameters per statement
+_MAX_VARIABLES = 900
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    result TEXT NOT NULL,
+    used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_used ON results (used);
+CREATE TABLE IF NOT EXISTS snapshots (
+    catalog TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    results TEXT NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (catalog, kind)
+);
+CREATE TABLE IF NOT EXISTS probes (
+    key TEXT PRIMARY KEY,
+    latency_ms REAL NOT NULL,
+    passed REAL NOT NULL
+);
+"""
+
+# [(config section, digest)]; identity-compared like the classifier cache
+_CONFIG_DIGESTS = []
+
+
+def default_path():
+    return cache_dir() / "tool_detection.sqlite3"
+
+
+def open_cache():
+    """DetectionCache per the tool_detection_cache config, or None when off/unusable."""
+    settings = load_config("tool_detection_cache")
+    if not settings.get("enabled", True) or os.environ.get(NO_CACHE_ENV):
+        return None
+    path = settings.get("path")
+    try:
+        return DetectionCache(Path(path).expanduser() if path else None,
+                              max_entries=settings.get("max_entries", 5000))
+    except (OSError, sqlite3.Error):
+        return None
+
+
+def digest(value):
+    text = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def config_digest(section):
+    """Hash of a detection config section, memoized per config tree."""
+    for cached, section_digest in _CONFIG_DIGESTS:
+        if cached is section:
+            return section_digest
+    section_digest = digest([_FORMAT_VERSION, section])
+    _CONFIG_DIGESTS.append((section, section_digest))
+    del _CONFIG_DIGESTS[:-4]
+    return section_digest
+
+
+def tool_digest(tool):
+    """Hash of the fields that feed detection."""
+    return digest([tool.get("name", ""), tool.get("description", ""),
+                  tool.get("parameters", {})])
+
+
+def entry_key(kind, config_hash, tool_hash):
+    return f"{kind}:{config_hash}:{tool_hash}"
+
+
+def probe_key(tool, endpoint, prompt, expected):
+    return digest(["probe", tool, endpoint, prompt, expected])
+
+
+class DetectionCache:
+    """SQLite-backed LRU map from entry_key() to a detection result."""
+
+    def __init__(self, path=None, max_entries=5000):
+        self.path = path or default_path()
+        self.max_entries = max_entries
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), timeout=5)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.conn.close()
+
+    def get_many(self, keys):
+        """{key: result} for the cached keys; marks them recently used."""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        for start in range(0, len(keys), _MAX_VARIABLES):
+            chunk = keys[start:start + _MAX_VARIABLES]
+            marks = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT key, result FROM results WHERE key IN ({marks})", chunk)
+            found.update((key, json.loads(result)) for key, result in rows)
+        if found:
+            hits = list(found)
+            now = time.time()
+            with self.conn:
+                for start in range(0, len(hits), _MAX_VARIABLES):
+                    chunk = hits[start:start + _MAX_VARIABLES]
+                    marks = ",".join("?" * len(chunk))
+                    self.conn.execute(f"UPDATE results SET used = ? WHERE key IN ({marks})",
+                                      [now, *chunk])
+        return found
+
+    def put_many(self, entries):
+        """Store {key: result}, then evict least recently used rows over the limit."""
+        if not entries:
+            return
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+                ((key, json.dumps(result, ensure_ascii=False), now)
+                 for key, result in entries.items()))
+            self.conn.execute(
+                "DELETE FROM results WHERE key IN "
+                "(SELECT key FROM results ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,))
+
+    def snapshot(self, catalog, kind):
+        """(catalog digest, results) of the last run, or (None, None)."""
+        row = self.conn.execute(
+            "SELECT digest, results FROM snapshots WHERE catalog = ? AND kind = ?",
+            (catalog, kind)).fetchone()
+        return (row[0], json.loads(row[1])) if row else (None, None)
+
+    def save_snapshot(self, catalog, kind, catalog_digest, results):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?)",
+                (catalog, kind, catalog_digest, json.dumps(results, ensure_ascii=False),
+                 time.time()))
+
+    def passed_probes(self, keys, ttl):
+        """{key: latency_ms} for probes that passed within the last `ttl` seconds."""
+        keys = list(keys)
+        if not keys or ttl <= 0:
+            return {}
+        marks = ",".join("?" * len(keys))
+        rows = self.conn.execute(
+            f"SELECT key, latency_ms FROM probes WHERE key IN ({marks}) AND passed >= ?",
+            [*keys, time.time() - ttl])
+        return dict(rows)
+
+    def record_probes(self, passed, failed):
+        """Store passed probes {key: latency_ms}; forget failed ones."""
+        now = time.time()
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO probes VALUES (?, ?, ?)",
+                                  ((key, latency, now) for key, latency in passed.items()))
+            self.conn.executemany("DELETE FROM probes WHERE key = ?",
+                                  ((key,) for key in failed))
+
+
+def changes(previous, results):
+    """Diff one kind's results against the previous run's (None = no earlier run).
+
+    Returns {"added": [...], "changed": [...], "removed": [...], "unchanged": n};
+    changed results carry "previous": {score, classification}, removed ones
+    are {name, score, classification} from the last run.
+    """
+    previous = {r["name"]: r for r in previous or []}
+    added, changed, seen = [], [], set()
+    for r in results:
+        seen.add(r["name"])
+        before = previous.get(r["name"])
+        if before is None:
+            added.append(r)
+        elif (before["score"], before["classification"], before["evidence"]) != \
+                (r["score"], r["classification"], r["evidence"]):
+            changed.append({**r, "previous": {"score": before["score"],
+                                              "classification": before["classification"]}})
+    removed = [{"name": name, "score": before["score"],
+                "classification": before["classification"]}
+               for name, before in previous.items() if name not in seen]
+    return {"added": added, "changed": changed, "removed": removed,
+            "unchanged": len(results) - len(added) - len(changed)}
@@ -0,0 +1,167 @@
+"""
+Structured secret / PII detectors for sensitivity routing.
+
+Each detector is one regex with bounded quantifiers only, so its scan is
+linear in the text size, plus a check that turns a match into a span or
+rejects it (word boundaries, card IIN and Luhn, reserved SSN ranges). Patterns begin
+with a literal where possible: CPython's re then jumps between candidate
+positions instead of trying the pattern at every character, so a leading
+\\b or lookbehind is moved into the check. That also makes one pass per
+detector faster than a single merged alternation, which re would try branch
+by branch at every position. Run `benchmark.py detectors` for the costs.
+
+Findings are spans, never the matched text, so secrets are not echoed back
+into logs or transcripts. redact() masks the spans.
+"""
+
+import re
+
+_WORD_CHAR_RE = re.compile(r"[0-9A-Za-z_]")
+_SSN_AREA_RE = re.compile(r"(?<![0-9-])(?!000|666|9)[0-9]{3}")
+_CARD_LENGTHS = (19, 16, 15, 13)
+
+
+def _luhn_ok(digits):
+    total = 0
+    for i, ch in enumerate(reversed(digits)):
+        d = ord(ch) - 48
+        if i % 2:
+            d *= 2
+            if d > 9:
+                d -= 9
+        total += d
+    return total % 10 == 0
+
+
+def _word_start(m):
+    """Span if the token starts at a word boundary."""
+    start = m.start()
+    if start and _WORD_CHAR_RE.match(m.string, start - 1):
+        return None
+    return m.span()
+
+
+def _iin_ok(digits):
+    """Whether the issuer prefix (IIN) is a card network's and the length is its own."""
+    n = len(digits)
+    p2, p3, p4 = int(digits[:2]), int(digits[:3]), int(digits[:4])
+    if digits[0] == "4":                                   # Visa
+        return n in (13, 16, 19)
+    if p2 in (34, 37):                                     # American Express
+        return n == 15
+    if 51 <= p2 <= 55 or 2221 <= p4 <= 2720:               # Mastercard
+        return n == 16
+    if p4 == 6011 or 644 <= p3 <= 649 or p2 in (62, 65) or 3528 <= p4 <= 3589:
+        return n in (16, 19)                               # Discover, UnionPay, JCB
+    return False
+
+
+def _card(m):
+    """Longest IIN- and Luhn-valid card within the run, starting at a digit group.
+
+    The pattern grabs the whole run, which may carry a neighbouring number
+    ("4111 1111 1111 1111 2 items"), so shorter windows ending and starting
+    at group boundaries are tried before giving up.
+    """
+    text, base = m.group(), m.start()
+    positions = [i for i, ch in enumerate(text) if ch not in " -"]
+    digits = "".join(text[i] for i in positions)
+    starts = [k for k, i in enumerate(positions) if k == 0 or positions[k - 1] != i - 1]
+    for first in starts:
+        for length in _CARD_LENGTHS:
+            last = first + length - 1
+            if last >= len(digits):
+                continue
+            if last + 1 < len(digits) and positions[last + 1] == positions[last] + 1:
+                continue  # would split a digit group
+            number = digits[first:last + 1]
+            if _iin_ok(number) and _luhn_ok(number):
+                return base + positions[first], base + positions[last] + 1
+    return None
+
+
+def _ssn(m):
+    """The match starts at the first dash; the area number precedes it."""
+    start = m.start() - 3
+    if start < 0 or m.group(1) == "00" or m.group(2) == "0000":
+        return None
+    if not _SSN_AREA_RE.match(m.string, start, m.start()):
+        return None
+    return start, m.end()
+
+
+# id -> (pattern, check(match) -> (start, end) or None)
+DETECTORS = {
+    # Whole PEM block; the body is capped at 64 KB
+    "pem_private_key": (
+        r"-----BEGIN ((?:[A-Z0-9]{1,10} ){0,2}PRIVATE KEY)-----"
+        r"[A-Za-z0-9+/=\s:,.-]{0,65536}?-----END \1-----",
+        lambda m: m.span(),
+    ),
+    "aws_access_key": (r"A[KS]IA[0-9A-Z]{16}\b", _word_start),
+    "github_token": (r"gh[pousr]_[A-Za-z0-9]{36,255}\b", _word_start),
+    "llm_api_key": (r"sk-(?:ant-|proj-)?[A-Za-z0-9_-]{20,256}", _word_start),
+    "slack_token": (r"xox[abposr]-[A-Za-z0-9-]{10,256}", _word_start),
+    "google_api_key": (r"AIza[0-9A-Za-z_-]{35}(?![0-9A-Za-z_-])", _word_start),
+    # A run of 13-19+ digits, optionally grouped by single spaces or dashes,
+    # starting with a card network's first digit (2-6: not 13-digit epoch
+    # milliseconds); the check finds an IIN-, length- and Luhn-valid number
+    # in it. (?<![\d-]\d) makes the run start at a digit.
+    "credit_card": (r"[2-6](?<![0-9-][0-9])(?:[ -]?[0-9]){12,18}(?![0-9])", _card),
+    # NNN-NN-NNNN, anchored on the first dash
+    "us_ssn": (r"-([0-9]{2})-([0-9]{4})(?![0-9-])", _ssn),
+}
+
+# {tuple(detector ids): [(id, compiled, check)]}
+_COMPILED = {}
+
+
+def _compiled(detector_ids):
+    key = tuple(detector_ids)
+    compiled = _COMPILED.get(key)
+    if compiled is None:
+        unknown = [d for d in key if d not in DETECTORS]
+        if unknown:
+            raise ValueError(f"Unknown detector(s): {', '.join(unknown)}")
+        compiled = [(d, re.compile(DETECTORS[d][0]), DETECTORS[d][1]) for d in key]
+        _COMPILED[key] = compiled
+    return compiled
+
+
+def scan(text, detector_ids=None):
+    """Return [{"detector", "start", "end"}, ...] sorted by start.
+
+    Args:
+        text: text to scan
+        detector_ids: detectors to run (default: all)
+
+    Raises:
+        ValueError: for an unknown detector id.
+    """
+    findings = []
+    for detector_id, pattern, check in _compiled(detector_ids or list(DETECTORS)):
+        for m in pattern.finditer(text):
+            span = check(m)
+            if span:
+                findings.append({"detector": detector_id,
+                                 "start": span[0], "end": span[1]})
+    findings.sort(key=lambda f: (f["start"], -f["end"]))
+    return findings
+
+
+def redact(text, findings, template="[REDACTED:{detector}]"):
+    """Replace each finding's span with `template`; overlapping spans merge."""
+    out = []
+    pos = 0
+    for finding in findings:
+        start, end = finding["start"], finding["end"]
+        if end <= pos:
+            continue  # inside a span that is already masked
+        if start < pos:
+            start = pos
+        else:
+            out.append(text[pos:start])
+            out.append(template.format(detector=finding["detector"]))
+        pos = end
+    out.append(text[pos:])
+    return "".join(out)
@@ -0,0 +1,163 @@
+"""
+Early-stop checks: can the outstanding evaluations still change the result?
+
+Each pending evaluator z-normalizes its own scores, so whatever it returns,
+the z-score it gives one response is bounded: with m responses scored, a
+population z-score lies in [-sqrt(m-1), +sqrt(m-1)]. Folding that bound into
+each response's running z sum gives the lowest and highest final mean z it
+can reach (bounds()); when the current order holds even with every pending
+evaluator voting against it, the result is decided.
+
+The bound is exact but rarely fires before the last evaluation.
+predicted_bounds() gives instead a prediction interval for each response's
+final mean z: evaluator noise is estimated from how far the received
+z-scores spread around each response's mean (pooled over all responses),
+and a t-interval accounts for both the pending scores and the uncertainty in
+the current mean. decided() applied to those intervals says whether the
+result holds with the configured confidence.
+"""
+
+import math
+from statistics import NormalDist
+
+from .score_engine import weighted_score, z_normalize
+
+
+class Pending:
+    """One outstanding evaluator: the labels it may score and how many it will."""
+
+    def __init__(self, evaluator, candidates, count):
+        self.evaluator = evaluator
+        self.candidates = list(candidates)
+        self.count = min(count, len(self.candidates))
+        self.assigned = self.count == len(self.candidates)
+        # Largest |z| it can give; rounded like z_normalize() (round is monotone)
+        self.bound = round(math.sqrt(self.count - 1), 4) if self.count >= 2 else 0.0
+
+
+def z_lists(evaluations, weights):
+    """{label: [z-score from each evaluator that scored it]}, first-seen order."""
+    lists = {}
+    for ev in evaluations:
+        scores = {label: weighted_score(dim_scores, weights)
+                  for label, dim_scores in ev.get("scores", {}).items()}
+        for label, z in z_normalize(scores).items():
+            lists.setdefault(label, []).append(z)
+    return lists
+
+
+def bounds(z_by_label, labels, pending):
+    """Lowest and highest final mean z per label: {label: (low, high)}.
+
+    Assigned evaluators always add one z-score to each of their labels;
+    unassigned ones may or may not score a given label, so both cases count.
+    """
+    result = {}
+    for label in labels:
+        values = z_by_label.get(label, [])
+        certain = [p.bound for p in pending if p.assigned and label in p.candidates]
+        possible = sorted((p.bound for p in pending
+                           if not p.assigned and label in p.candidates), reverse=True)
+        n = len(values) + len(certain)
+        reach = sum(certain)
+        total = sum(values)
+        low = high = None
+        for j in range(len(possible) + 1):
+            if j:
+                reach += possible[j - 1]
+            if n + j == 0:
+                continue
+            lo = (total - reach) / (n + j)
+            hi = (total + reach) / (n + j)
+            low = lo if low is None else min(low, lo)
+            high = hi if high is None else max(high, hi)
+        if low is None:  # no evaluation received or possible: stays at 0
+            low = high = 0.0
+        result[label] = (round(low, 4), round(high, 4))
+    return result
+
+
+def decided(order, label_bounds, top_k):
+    """Whether the top-1 and the ordered top-k are fixed whatever arrives.
+
+    Final z-scores are rounded to 4 places and ties keep arrival order, so a
+    rank is only safe when the rounded bounds are strictly apart.
+    """
+    def beats(a, b):
+        return label_bounds[a][0] > label_bounds[b][1]
+
+    top_1 = bool(order) and all(beats(order[0], other) for other in order[1:])
+    in_order = all(beats(a, b) for a, b in zip(order[:top_k], order[1:top_k]))
+    separated = all(beats(a, b) for a in order[:top_k] for b in order[top_k:])
+    return {"top_1": top_1, "top_k": in_order and separated}
+
+
+def t_quantile(q, df):
+    """Student-t quantile for q >= 0.5 and integer df >= 1 (exact CDF, bisection)."""
+    if df > 1000:
+        return NormalDist().inv_cdf(q)
+    target = 2 * q - 1  # P(|T| < t)
+
+    def central(t):
+        theta = math.atan(t / math.sqrt(df))
+        c2 = math.cos(theta) ** 2
+        if df % 2:
+            term = total = math.cos(theta)
+            for j in range(3, df - 1, 2):
+                term *= c2 * (j - 1) / j
+                total += term
+            return 2 / math.pi * (theta + (math.sin(theta) * total if df > 1 else 0.0))
+        term = total = 1.0
+        for j in range(2, df - 1, 2):
+            term *= c2 * (j - 1) / j
+            total += term
+        return math.sin(theta) * total
+
+    low, high = 0.0, 1.0
+    while central(high) < target:
+        low, high = high, high * 2
+    for _ in range(60):
+        mid = (low + high) / 2
+        low, high = (mid, high) if central(mid) < target else (low, mid)
+    return high
+
+
+def residual_sd(z_by_label):
+    """Pooled spread of evaluators around each label's mean: (sd, degrees of freedom)."""
+    squares, df = 0.0, 0
+    for values in z_by_label.values():
+        if len(values) >= 2:
+            m = sum(values) / len(values)
+            squares += sum((z - m) ** 2 for z in values)
+            df += len(values) - 1
+    return (math.sqrt(squares / df), df) if df else (None, 0)
+
+
+def predicted_bounds(z_by_label, labels, pending, label_bounds, confidence):
+    """Prediction interval of each label's final mean z: {label: (low, high)}.
+
+    Each pending z-score is its label's true mean plus evaluator noise with
+    the pooled residual variance s^2. With n received and k still to come, the
+    final mean differs from the current one by a t(df) variable with
+    variance s^2 * k / (n * (n + k)). Unassigned evaluators count as scoring
+    the label (the widest case). Intervals are Bonferroni-corrected so they
+    all hold together with probability `confidence`, and clipped to the
+    worst-case bounds; a label with no score yet keeps the worst case.
+    """
+    sd, df = residual_sd(z_by_label)
+    if sd is None:
+        return dict(label_bounds), {"residual_sd": None, "df": 0}
+    alpha = (1 - confidence) / max(1, len(labels))
+    t = t_quantile(1 - alpha / 2, df)
+    result = {}
+    for label in labels:
+        values = z_by_label.get(label, [])
+        n = len(values)
+        k = sum(label in p.candidates for p in pending)
+        low, high = label_bounds[label]
+        if n:
+            mean = sum(values) / n
+            half = t * sd * math.sqrt(k / (n * (n + k)))
+            low, high = max(low, mean - half), min(high, mean + half)
+        result[label] = (round(low, 4), round(high, 4))
+    return result, {"residual_sd": round(sd, 4), "df": df, "t": round(t, 4)}
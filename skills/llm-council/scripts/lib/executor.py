@@ -0,0 +1,111 @@
+"""
+Async fan-out executor for a stage's LLM calls.
+
+fan_out() runs [{id, tool, prompt}] calls through a transport (see
+transport.py) with at most `max_concurrency` in flight, each bounded by
+per_call and all by the stage deadline, and yields one event per call as it
+lands, in completion order:
+
+  {"id", "tool", "status": "ok", "latency", "response"}
+  {"id", "tool", "status": "timeout" | "error", "latency", "error"}
+  {"id", "tool", "status": "cancelled", "latency", "reason"}
+
+A budget callback is polled while calls run; once it answers anything but
+"continue" a {"event": "budget", ...} event is yielded and every call still
+queued or running is cancelled (closing its connection), so a degrade or
+stop decision takes effect mid-stage. Closing the generator early (aclose) cancels
+outstanding calls too.
+
+Times are in seconds; with a time_scale (simulated transports) they are
+simulated seconds.
+"""
+
+import asyncio
+
+from .transport import TransportError
+
+
+async def fan_out(transport, calls, per_call, stage_deadline, max_concurrency=8,
+                  budget=None, poll_interval=1.0, time_scale=1.0):
+    """Async generator of call events; see the module docstring.
+
+    Args:
+        transport: object with async call(tool, prompt, timeout)
+        calls: [{"id", "tool", "prompt", "timeout"?}]
+        per_call: default per-call timeout (seconds)
+        stage_deadline: seconds from now after which everything is cancelled
+        max_concurrency: calls in flight at once
+        budget: optional callable(stage_elapsed) -> {"action", ...}; polled
+            every poll_interval seconds
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    gate = asyncio.Semaphore(max_concurrency)
+    started = {}
+
+    def now():
+        return (loop.time() - start) / time_scale
+
+    async def run(call):
+        async with gate:
+            began = started[call["id"]] = now()
+            timeout = min(call.get("timeout", per_call), stage_deadline - began)
+            event = {"id": call["id"], "tool": call["tool"]}
+            try:
+                if timeout <= 0:
+                    raise asyncio.TimeoutError
+                response = await transport.call(call["tool"], call["prompt"],
+                                                timeout * time_scale)
+            except asyncio.TimeoutError:
+                event.update(status="timeout", error=f"no reply within {timeout:g}s")
+            except TransportError as e:
+                event.update(status="error", error=str(e))
+            except Exception as e:  # a faulty backend fails its own call, not the stage
+                event.update(status="error", error=f"{type(e).__name__}: {e}")
+            else:
+                event.update(status="ok", response=response)
+            event["latency"] = round(now() - began, 3)
+            return event
+
+    tasks = {asyncio.ensure_future(run(call)): call for call in calls}
+    poller = None
+
+    def cancel_all(reason):
+        events = []
+        for task, call in tasks.items():
+            task.cancel()
+            began = started.get(call["id"])
+            events.append({"id": call["id"], "tool": call["tool"], "status": "cancelled",
+                           "latency": round(now() - began, 3) if began is not None else None,
+                           "reason": reason})
+        return events
+
+    try:
+        while tasks:
+            waiting = set(tasks)
+            if budget is not None:
+                if poller is None:
+                    poller = asyncio.ensure_future(asyncio.sleep(poll_interval * time_scale))
+                waiting.add(poller)
+            done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task is poller:
+                    continue
+                del tasks[task]
+                yield task.result()
+            if poller in done:
+                poller = None
+                decision = budget(now())
+                if decision.get("action", "continue") != "continue":
+                    yield {"event": "budget", "stage_elapsed": round(now(), 3), **decision}
+                    for event in cancel_all(f"budget {decision['action']}"):
+                        yield event
+                    break
+    finally:
+        if poller is not None:
+            poller.cancel()
+        pending = list(tasks)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
@@ -0,0 +1,149 @@
+"""
+Local history of LLM tool calls (latency and outcome per tool) and of whole
+council stages (duration per mode, stage and participant count).
+
+Rows live in SQLite (cache_dir()/history.sqlite3 unless history.path is
+set); each tool, and each mode's stage, keeps its most recent
+`history.window` rows, so stats follow how providers behave now rather than
+months ago. Times are in seconds; a timed-out call is recorded with the time
+it was given up after.
+
+Consumers: select_participants.py (participant_overflow: latency_aware),
+collect_responses.py (hedging), check_budget.py (predictive degradation).
+"""
+
+import math
+import sqlite3
+import time
+from pathlib import Path
+
+from .io_helpers import CouncilError, cache_dir, load_config
+
+OUTCOMES = ("ok", "timeout", "error")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS calls (
+    tool TEXT NOT NULL,
+    stage TEXT,
+    latency REAL NOT NULL,
+    outcome TEXT NOT NULL,
+    recorded REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS calls_tool ON calls (tool, recorded);
+CREATE TABLE IF NOT EXISTS stage_timings (
+    mode TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    participants INTEGER NOT NULL,
+    seconds REAL NOT NULL,
+    recorded REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS stage_timings_stage ON stage_timings (stage, mode, recorded);
+"""
+
+
+def default_path():
+    path = load_config("history").get("path")
+    return Path(path).expanduser() if path else cache_dir() / "history.sqlite3"
+
+
+class HistoryStore:
+    """SQLite-backed call history, trimmed to `window` calls per tool."""
+
+    def __init__(self, path=None, window=None):
+        self.path = path or default_path()
+        self.window = window or load_config("history").get("window", 200)
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.conn = sqlite3.connect(str(self.path), timeout=30)
+            self.conn.executescript(_SCHEMA)
+        except (OSError, sqlite3.Error) as e:
+            raise CouncilError(f"Cannot open history store {self.path}: {e}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.conn.close()
+
+    def record_calls(self, calls):
+        """Add [{tool, latency, outcome, stage?}] rows (validated by the caller)."""
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO calls VALUES (?, ?, ?, ?, ?)",
+                ((c["tool"], c.get("stage"), float(c["latency"]), c["outcome"],
+                  c.get("recorded", now)) for c in calls))
+            for tool in {c["tool"] for c in calls}:
+                self.conn.execute(
+                    "DELETE FROM calls WHERE tool = ? AND rowid NOT IN "
+                    "(SELECT rowid FROM calls WHERE tool = ? ORDER BY recorded DESC LIMIT ?)",
+                    (tool, tool, self.window))
+
+    def record_stages(self, stages):
+        """Add [{mode, stage, participants, seconds}] rows (validated by the caller)."""
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO stage_timings VALUES (?, ?, ?, ?, ?)",
+                ((s["mode"], s["stage"], int(s["participants"]), float(s["seconds"]),
+                  s.get("recorded", now)) for s in stages))
+            for mode, stage in {(s["mode"], s["stage"]) for s in stages}:
+                self.conn.execute(
+                    "DELETE FROM stage_timings WHERE mode = ? AND stage = ? AND rowid NOT IN "
+                    "(SELECT rowid FROM stage_timings WHERE mode = ? AND stage = ? "
+                    "ORDER BY recorded DESC LIMIT ?)",
+                    (mode, stage, mode, stage, self.window))
+
+    def stage_samples(self, stages):
+        """{stage: [(mode, participants, seconds)]} for `stages`, every mode."""
+        stages = list(stages)
+        if not stages:
+            return {}
+        marks = ",".join("?" * len(stages))
+        rows = self.conn.execute(
+            "SELECT stage, mode, participants, seconds FROM stage_timings "
+            f"WHERE stage IN ({marks})", stages)
+        samples = {}
+        for stage, mode, participants, seconds in rows:
+            samples.setdefault(stage, []).append((mode, participants, seconds))
+        return samples
+
+    def samples(self, tools=None):
+        """{tool: [(latency, outcome)]} for `tools` (None = every tool)."""
+        if tools is None:
+            rows = self.conn.execute("SELECT tool, latency, outcome FROM calls")
+        else:
+            tools = list(tools)
+            if not tools:
+                return {}
+            marks = ",".join("?" * len(tools))
+            rows = self.conn.execute(
+                f"SELECT tool, latency, outcome FROM calls WHERE tool IN ({marks})", tools)
+        samples = {}
+        for tool, latency, outcome in rows:
+            samples.setdefault(tool, []).append((latency, outcome))
+        return samples
+
+
+def quantile(sorted_values, q):
+    """Nearest-rank quantile of an ascending list (None when empty)."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(q * len(sorted_values)))
+    return round(sorted_values[rank - 1], 3)
+
+
+def summarize(samples):
+    """{calls, p50, p90, p95, timeout_rate, failure_rate} for [(latency, outcome)]."""
+    latencies = sorted(latency for latency, _ in samples)
+    n = len(samples)
+    timeouts = sum(outcome == "timeout" for _, outcome in samples)
+    errors = sum(outcome == "error" for _, outcome in samples)
+    return {
+        "calls": n,
+        "p50": quantile(latencies, 0.5),
+        "p90": quantile(latencies, 0.9),
+        "p95": quantile(latencies, 0.95),
+        "timeout_rate": round(timeouts / n, 4) if n else None,
+        "failure_rate": round(errors / n, 4) if n else None,
+    }
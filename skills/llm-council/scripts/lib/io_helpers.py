@@ -2,37 +2,79 @@
 Shared I/O helpers for LLM Council scripts.
 
 Contract: stdin JSON -> stdout JSON. Errors: {"error": msg} + exit(1).
+
+Scripts put their logic in a `handle(data)` function that returns the output
+dict and raises CouncilError on bad input; `run(handle)` wires it to the CLI
+contract, and the helper daemon calls the same handlers in-process.
 """
 
 import json
+import os
 import sys
 from pathlib import Path
 
-from .yaml_parser import load_yaml, extract_section
+from . import config_cache, yaml_parser
+from .yaml_parser import load_yaml, load_yaml_string, extract_section
 
 # Resolve standard.yaml relative to this file's location
 _LIB_DIR = Path(__file__).parent
 _PROTOCOLS_DIR = _LIB_DIR.parent.parent / "protocols"
 _DEFAULT_CONFIG = _PROTOCOLS_DIR / "standard.yaml"
 
+# Parsed config trees keyed by path: {path: (mtime_ns, size, tree)}
+_CONFIG_CACHE = {}
 
-def read_input():
-    """Read JSON from stdin."""
+CACHE_DIR_ENV = "LLM_COUNCIL_CACHE_DIR"
+NO_CACHE_ENV = "LLM_COUNCIL_NO_CACHE"
+
+
+class CouncilError(Exception):
+    """Invalid input or config. Reported as {"error": msg}."""
+
+
+def parse_input(text):
+    """Parse a JSON object from text, raising CouncilError if invalid."""
     try:
-        data = json.load(sys.stdin)
+        data = json.loads(text)
     except json.JSONDecodeError as e:
-        fail(f"Invalid JSON input: {e}")
+        raise CouncilError(f"Invalid JSON input: {e}")
     if not isinstance(data, dict):
-        fail("Input must be a JSON object")
+        raise CouncilError("Input must be a JSON object")
     return data
 
 
+def read_input():
+    """Read JSON from stdin."""
+    try:
+        return parse_input(sys.stdin.read())
+    except CouncilError as e:
+        fail(str(e))
+
+
 def write_output(data):
     """Write JSON to stdout."""
     json.dump(data, sys.stdout, ensure_ascii=False, indent=2)
     sys.stdout.write("\n")
 
 
+def iter_jsonl(stream):
+    """Yield (data, error) per non-blank JSONL line; one of them is None."""
+    for line_no, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            yield parse_input(line), None
+        except CouncilError as e:
+            yield None, f"line {line_no}: {e}"
+
+
+def write_jsonl(data, stream=None):
+    """Write one compact JSON line and flush, for streaming consumers."""
+    stream = stream or sys.stdout
+    stream.write(json.dumps(data, ensure_ascii=False) + "\n")
+    stream.flush()
+
+
 def fail(message):
     """Write error JSON to stdout and exit."""
     json.dump({"error": message}, sys.stdout, ensure_ascii=False)
@@ -40,21 +82,72 @@ def fail(message):
     sys.exit(1)
 
 
+def run(handler):
+    """CLI entry point: stdin JSON -> handler(data) -> stdout JSON."""
+    data = read_input()
+    try:
+        result = handler(data)
+    except CouncilError as e:
+        fail(str(e))
+    write_output(result)
+
+
+def cache_dir():
+    """Per-user cache dir: $LLM_COUNCIL_CACHE_DIR, else ~/.cache/llm-council."""
+    path = os.environ.get(CACHE_DIR_ENV)
+    if path:
+        return Path(path)
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "llm-council"
+
+
 def load_config(section_dotpath, config_path=None):
     """Load standard.yaml and extract a section by dot-path.
 
+    The parsed tree is kept in memory and reused until the file's mtime or
+    size changes, so long-lived processes parse the YAML once. Across
+    processes, a compiled copy in cache_dir() skips parsing entirely (set
+    LLM_COUNCIL_NO_CACHE=1 to disable). Callers must treat the returned
+    section as read-only.
+
     Args:
         section_dotpath: e.g. "llm_tool_detection.thresholds"
         config_path: override path to YAML file (default: protocols/standard.yaml)
 
     Returns:
-        The extracted section value, or calls fail() if not found.
+        The extracted section value.
+
+    Raises:
+        CouncilError: if the file or section is not found, or the YAML is malformed.
     """
     path = Path(config_path) if config_path else _DEFAULT_CONFIG
-    if not path.exists():
-        fail(f"Config file not found: {path}")
-    config = load_yaml(path)
+    try:
+        st = os.stat(path)
+    except OSError:
+        raise CouncilError(f"Config file not found: {path}")
+
+    cached = _CONFIG_CACHE.get(str(path))
+    if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        config = cached[2]
+    else:
+        try:
+            config = _load_tree(path, st)
+        except yaml_parser.PARSE_ERRORS as e:
+            raise CouncilError(f"Invalid config file {path}: {e}")
+        _CONFIG_CACHE[str(path)] = (st.st_mtime_ns, st.st_size, config)
+
     section = extract_section(config, section_dotpath)
     if section is None:
-        fail(f"Config section not found: {section_dotpath}")
+        raise CouncilError(f"Config section not found: {section_dotpath}")
     return section
+
+
+def _load_tree(path, st):
+    """Parse a config file, going through the on-disk compiled cache."""
+    if os.environ.get(NO_CACHE_ENV):
+        return load_yaml(path)
+    if yaml_parser.HAS_YAML:
+        parser_tag = "pyyaml"
+    else:
+        parser_tag = f"fallback-{yaml_parser.FALLBACK_VERSION}"
+    return config_cache.load(path, st, load_yaml_string, parser_tag, cache_dir())
@@ -0,0 +1,106 @@
+"""
+Joint normalization for sparse (panel) evaluation matrices.
+
+Per-evaluator z-scores assume every evaluator saw a comparable spread of
+responses; with panels of 2-3 that fails (an evaluator who drew the three
+best responses still hands one of them -1.2, and one who scored a single
+response contributes 0). Here each weighted score is modelled as
+
+    score[e, r] = offset[e] + scale[e] * quality[r] + noise
+
+and offsets, scales and qualities are fitted together over the observed
+entries by alternating least squares: with qualities fixed each evaluator
+is a 2-parameter linear fit, with evaluators fixed each quality is a
+1-parameter fit. Ridge terms pull each offset/scale toward the pooled fit
+and each quality toward 0, so evaluators and responses with few entries
+stay stable. Qualities are standardized (mean 0, population stdev 1) after
+every sweep, which fixes the model's shift/scale freedom and puts them on
+the same footing as mean z-scores.
+"""
+
+import math
+
+
+def fit(entries, n_evaluators, n_responses, ridge=1.0, max_iterations=200, tolerance=1e-6):
+    """Fit the offset/scale/quality model by alternating least squares.
+
+    Args:
+        entries: [(evaluator_index, response_index, weighted_score)]
+        ridge: strength of the pull toward pooled / zero estimates
+
+    Returns:
+        {"quality": [...], "offset": [...], "scale": [...], "iterations": n,
+         "converged": bool}
+    """
+    by_evaluator = [[] for _ in range(n_evaluators)]
+    by_response = [[] for _ in range(n_responses)]
+    for e, r, s in entries:
+        by_evaluator[e].append((r, s))
+        by_response[r].append((e, s))
+
+    # Start from each response's mean score; the pooled fit of all entries
+    # against it is the prior every evaluator is pulled toward
+    quality = [sum(s for _, s in scored) / len(scored) if scored else 0.0
+               for scored in by_response]
+    quality = _standardize(quality, by_response)
+    mean_score = sum(s for _, _, s in entries) / len(entries) if entries else 0.0
+    prior_offset, prior_scale = _linear_fit(
+        [(quality[r], s) for e, r, s in entries], mean_score, 1.0, 1e-9, 1e-9)
+    offset = [prior_offset] * n_evaluators
+    scale = [prior_scale] * n_evaluators
+
+    converged = False
+    iterations = 0
+    for iterations in range(1, max_iterations + 1):
+        for e, scored in enumerate(by_evaluator):
+            offset[e], scale[e] = _linear_fit(
+                [(quality[r], s) for r, s in scored], prior_offset, prior_scale, ridge, ridge)
+
+        updated = []
+        for r, scored in enumerate(by_response):
+            num = sum(scale[e] * (s - offset[e]) for e, s in scored)
+            den = sum(scale[e] * scale[e] for e, _ in scored) + ridge
+            updated.append(num / den if den > 0 else 0.0)
+        updated = _standardize(updated, by_response)
+
+        change = max((abs(a - b) for a, b in zip(updated, quality)), default=0.0)
+        quality = updated
+        if change < tolerance:
+            converged = True
+            break
+
+    return {"quality": quality, "offset": offset, "scale": scale,
+            "iterations": iterations, "converged": converged}
+
+
+def _linear_fit(points, prior_offset, prior_scale, offset_ridge, scale_ridge):
+    """Ridge fit of s = offset + scale * q around (prior_offset, prior_scale).
+
+    Minimizes sum (s - offset - scale*q)^2 + offset_ridge*(offset - prior_offset)^2
+    + scale_ridge*(scale - prior_scale)^2 via its 2x2 normal equations.
+    """
+    n = len(points)
+    sq = sum(q for q, _ in points)
+    sqq = sum(q * q for q, _ in points)
+    ss = sum(s for _, s in points)
+    sqs = sum(q * s for q, s in points)
+
+    a11, a12, a22 = n + offset_ridge, sq, sqq + scale_ridge
+    b1 = ss + offset_ridge * prior_offset
+    b2 = sqs + scale_ridge * prior_scale
+    det = a11 * a22 - a12 * a12
+    if det <= 0:
+        return prior_offset, prior_scale
+    return (b1 * a22 - a12 * b2) / det, (a11 * b2 - a12 * b1) / det
+
+
+def _standardize(values, by_response):
+    """Mean 0, population stdev 1 over responses that have any entries."""
+    seen = [v for v, scored in zip(values, by_response) if scored]
+    if len(seen) < 2:
+        return [0.0] * len(values)
+    mean = sum(seen) / len(seen)
+    stdev = math.sqrt(sum((v - mean) ** 2 for v in seen) / len(seen))
+    if stdev == 0:
+        return [0.0] * len(values)
+    return [(v - mean) / stdev if scored else 0.0 for v, scored in zip(values, by_response)]
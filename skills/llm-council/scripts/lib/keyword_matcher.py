@@ -0,0 +1,119 @@
+"""
+Multi-keyword substring matcher for keyword-group scoring.
+
+Built once per keyword config and cached per process. Matching is
+case-insensitive with the same semantics as `kw.lower() in text.lower()`,
+and the text is lowered once per call rather than once per group.
+
+Small keyword sets are checked with C substring search, which beats any
+regex in CPython. Large sets compile into one trie-shaped regex (shared
+prefixes, like an Aho-Corasick goto graph) that reports every keyword in a
+single pass: `(?=(...))` tries the trie at each position and yields the
+longest keyword starting there; shorter keywords that are prefixes of it
+are added from a precomputed closure. The scan stops early once every
+group already has a hit.
+"""
+
+import re
+
+# Above this many distinct keywords the single-pass trie scan is faster
+TRIE_MIN_KEYWORDS = 96
+
+# {groups key: KeywordMatcher}
+_MATCHERS = {}
+
+
+def get_matcher(groups):
+    """Return a cached KeywordMatcher for [(group_name, [keywords]), ...]."""
+    key = tuple((name, tuple(keywords)) for name, keywords in groups)
+    matcher = _MATCHERS.get(key)
+    if matcher is None:
+        matcher = KeywordMatcher(key)
+        _MATCHERS[key] = matcher
+    return matcher
+
+
+class KeywordMatcher:
+    """Keyword groups compiled for repeated matching."""
+
+    def __init__(self, groups):
+        self.groups = [(name, list(keywords)) for name, keywords in groups]
+        self.lowered = [[kw.lower() for kw in keywords] for _, keywords in self.groups]
+
+        distinct = {kw for keywords in self.lowered for kw in keywords}
+        self.always = {kw for kw in distinct if not kw}  # "" is in every text
+        words = sorted(distinct - self.always)
+        self.trie = None
+        if len(words) >= TRIE_MIN_KEYWORDS:
+            self.trie = re.compile(f"(?=({_trie_pattern(words)}))")
+            # keyword -> keywords that are its prefixes (itself included)
+            self.prefixes = {w: [p for p in words if w.startswith(p)] for w in words}
+            # keyword -> indexes of the groups it belongs to
+            self.owners = {w: [] for w in words}
+            for index, keywords in enumerate(self.lowered):
+                for kw in set(keywords) - self.always:
+                    self.owners[kw].append(index)
+
+    def matched_groups(self, text):
+        """Names of groups with at least one keyword in `text`, in group order."""
+        text = text.lower()
+        if self.trie is None:
+            hits = []
+            for (name, _), keywords in zip(self.groups, self.lowered):
+                for kw in keywords:
+                    if kw in text:
+                        hits.append(name)
+                        break  # one hit decides the group
+            return hits
+
+        found = self._find(text, stop_when_groups_hit=True)
+        return [name for (name, _), keywords in zip(self.groups, self.lowered)
+                if any(kw in found for kw in keywords)]
+
+    def matched_keywords(self, text):
+        """Every configured keyword found in `text`, in config order."""
+        found = self._find(text.lower(), stop_when_groups_hit=False)
+        return [kw for (_, keywords), lowered in zip(self.groups, self.lowered)
+                for kw, low in zip(keywords, lowered) if low in found]
+
+    def _find(self, text, stop_when_groups_hit):
+        """Set of lowered keywords present in lowered `text`."""
+        if self.trie is None:
+            return {kw for keywords in self.lowered for kw in keywords if kw in text}
+
+        found = set(self.always)
+        pending = {index for index, keywords in enumerate(self.lowered)
+                   if not self.always.intersection(keywords)}
+        for m in self.trie.finditer(text):
+            longest = m.group(1)
+            if longest in found:
+                continue
+            for kw in self.prefixes[longest]:
+                if kw not in found:
+                    found.add(kw)
+                    pending.difference_update(self.owners[kw])
+            if stop_when_groups_hit and not pending:
+                break
+        return found
+
+
+def _trie_pattern(words):
+    """Regex alternation shaped as a prefix trie; prefers the longest match."""
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}  # end of a keyword
+
+    def build(node):
+        branches = [re.escape(ch) + build(child)
+                    for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        if "" in node:
+            body = f"(?:{body})?"  # a keyword ends here; greedy tries longer first
+        return body
+
+    return build(trie)
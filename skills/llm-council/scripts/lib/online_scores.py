@@ -0,0 +1,85 @@
+"""
+Incremental score aggregation: one evaluator output at a time.
+
+Each evaluator's scores are z-normalized on arrival (normalization is
+per-evaluator, so it never needs the others), then folded into per-response
+running statistics. Running sums give the same mean z / raw scores as
+score_results once every evaluation is in; Welford's mean/M2 give the
+spread used for the margin between adjacent ranks.
+
+State is a plain JSON-serializable dict so it can live in a session file.
+"""
+
+import math
+
+from .score_engine import weighted_score, z_normalize
+
+
+class OnlineAggregator:
+    """Running per-response statistics over the evaluations received so far."""
+
+    def __init__(self, weights, state=None):
+        state = state or {}
+        self.weights = weights
+        self.evaluators = state.get("evaluators", [])
+        # {label: {"n", "z_sum", "raw_sum", "z_mean", "z_m2"}}, first-seen order
+        self.responses = state.get("responses", {})
+
+    def to_state(self):
+        return {"weights": self.weights, "evaluators": self.evaluators,
+                "responses": self.responses}
+
+    def add(self, evaluation):
+        """Fold one evaluator output ({"evaluator", "scores"}) into the stats."""
+        evaluator_weighted = {label: weighted_score(dim_scores, self.weights)
+                              for label, dim_scores in evaluation.get("scores", {}).items()}
+        self.evaluators.append(evaluation.get("evaluator", "?"))
+
+        for label, z in z_normalize(evaluator_weighted).items():
+            stats = self.responses.setdefault(
+                label, {"n": 0, "z_sum": 0.0, "raw_sum": 0.0, "z_mean": 0.0, "z_m2": 0.0})
+            stats["n"] += 1
+            stats["z_sum"] += z
+            stats["raw_sum"] += evaluator_weighted[label]
+            delta = z - stats["z_mean"]
+            stats["z_mean"] += delta / stats["n"]
+            stats["z_m2"] += delta * (z - stats["z_mean"])
+
+    def ranking(self):
+        """Provisional ranking: [{label, z_score, raw_score, evaluations, z_stdev}]."""
+        ranking = []
+        for label, stats in self.responses.items():
+            n = stats["n"]
+            ranking.append({
+                "label": label,
+                "z_score": round(stats["z_sum"] / n, 4),
+                "raw_score": round(stats["raw_sum"] / n, 3),
+                "evaluations": n,
+                "z_stdev": round(_sample_stdev(stats), 4) if n >= 2 else None,
+            })
+        ranking.sort(key=lambda r: r["z_score"], reverse=True)
+        return ranking
+
+    def margins(self, ranking):
+        """Gap between each pair of adjacent ranks, in z and in standard errors.
+
+        margin_sigma is the gap over the standard error of the difference of
+        the two means; None until both responses have 2+ evaluations.
+        """
+        margins = []
+        for above, below in zip(ranking, ranking[1:]):
+            a = self.responses[above["label"]]
+            b = self.responses[below["label"]]
+            gap = a["z_sum"] / a["n"] - b["z_sum"] / b["n"]
+            sigma = None
+            if a["n"] >= 2 and b["n"] >= 2:
+                se = math.sqrt(_sample_stdev(a) ** 2 / a["n"] + _sample_stdev(b) ** 2 / b["n"])
+                if se > 0:
+                    sigma = round(gap / se, 2)
+            margins.append({"above": above["label"], "below": below["label"],
+                            "margin": round(gap, 4), "margin_sigma": sigma})
+        return margins
+
+
+def _sample_stdev(stats):
+    return math.sqrt(stats["z_m2"] / (stats["n"] - 1))
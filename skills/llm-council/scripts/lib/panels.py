@@ -0,0 +1,163 @@
+"""
+Panel assignment: which evaluators score which responses.
+
+Balanced designs are circulant: participants sit at seeded positions
+0..N-1 on a cycle and the evaluator at position i scores the responses at
+i + d (mod N) for each offset d in a set D of k nonzero offsets. Every
+evaluator then scores exactly k responses, every response gets exactly k
+evaluators, and 0 is never an offset, so nobody scores their own response.
+
+Two evaluators at positions a and b share a panel once for every way of
+writing a - b as a difference of two offsets in D, so D is chosen to make
+those counts as even as possible. When they are all equal, D is a cyclic
+difference set and the panels form a balanced incomplete block design
+(e.g. N=7, k=3, D={1, 2, 4}: every pair of evaluators meets exactly once).
+
+Latency-weighted assignments give up equal loads to shorten the slowest
+evaluator's queue: loads are filled greedily by latency * load, then
+realized as panels with a small max-flow.
+"""
+
+import itertools
+import random
+from collections import deque
+
+MAX_OFFSET_SETS = 5000  # Exhaustive search up to this many candidate D
+
+
+def difference_counts(offsets, n):
+    """How often each nonzero residue mod n is a difference of two offsets."""
+    counts = [0] * n
+    for a, b in itertools.permutations(offsets, 2):
+        counts[(a - b) % n] += 1
+    return counts[1:]
+
+
+def _offset_candidates(n, k, rng):
+    pool = range(1, n)
+    total = 1
+    for i in range(k):
+        total = total * (n - 1 - i) // (i + 1)
+    if total <= MAX_OFFSET_SETS:
+        return itertools.combinations(pool, k)
+    return (tuple(sorted(rng.sample(pool, k))) for _ in range(MAX_OFFSET_SETS))
+
+
+def choose_offsets(n, k, rng):
+    """Pick D (k offsets in 1..n-1) with the most even difference counts.
+
+    Returns (offsets, is_difference_set).
+    """
+    best, best_key = [], None
+    for offsets in _offset_candidates(n, k, rng):
+        counts = difference_counts(offsets, n)
+        key = (max(counts) - min(counts), max(counts))
+        if best_key is None or key < best_key:
+            best, best_key = [offsets], key
+        elif key == best_key and offsets not in best:
+            best.append(offsets)
+    offsets = list(rng.choice(best))
+    return offsets, best_key[0] == 0
+
+
+def balanced(participants, k, seed):
+    """Circulant panels: {"assignments": {evaluator: [responses]}, ...}."""
+    rng = random.Random(seed)
+    n = len(participants)
+    order = rng.sample(participants, n)
+    offsets, is_difference_set = choose_offsets(n, k, rng)
+    assignments = {evaluator: sorted((order[(i + d) % n] for d in offsets),
+                                     key=order.index)
+                   for i, evaluator in enumerate(order)}
+    return {
+        "design": "bibd" if is_difference_set else "cyclic",
+        "offsets": offsets,
+        "assignments": {p: assignments[p] for p in participants},
+    }
+
+
+def weighted_loads(participants, k, latency):
+    """Evaluations per evaluator minimizing max(latency * load).
+
+    Each unit goes to the evaluator whose finish time grows least; ties go
+    to the earlier participant. Loads are capped at n - 1 (no self).
+    """
+    n = len(participants)
+    loads = {p: 0 for p in participants}
+    for _ in range(n * k):
+        open_ = [p for p in participants if loads[p] < n - 1]
+        evaluator = min(open_, key=lambda p: latency[p] * (loads[p] + 1))
+        loads[evaluator] += 1
+    return loads
+
+
+def realize(participants, k, loads, rng):
+    """Panels with the given evaluator loads, each response getting k evaluators.
+
+    Max-flow over source -> evaluator (load) -> response (1, not self) ->
+    sink (k); returns {evaluator: [responses]}, or None when infeasible.
+    """
+    n = len(participants)
+    order = rng.sample(range(n), n)  # seeded tie-breaking among equal paths
+    source, sink = 2 * n, 2 * n + 1
+    capacity = {}
+    edges = {v: [] for v in range(2 * n + 2)}
+
+    def add(u, v, c):
+        capacity[(u, v)] = capacity.get((u, v), 0) + c
+        capacity.setdefault((v, u), 0)
+        edges[u].append(v)
+        edges[v].append(u)
+
+    for e in order:
+        add(source, e, loads[participants[e]])
+        for r in order:
+            if r != e:
+                add(e, n + r, 1)
+    for r in order:
+        add(n + r, sink, k)
+
+    flow = 0
+    while True:
+        parent = {source: None}
+        queue = deque([source])
+        while queue and sink not in parent:
+            u = queue.popleft()
+            for v in edges[u]:
+                if v not in parent and capacity[(u, v)] > 0:
+                    parent[v] = u
+                    queue.append(v)
+        if sink not in parent:
+            break
+        v = sink
+        while parent[v] is not None:
+            u = parent[v]
+            capacity[(u, v)] -= 1
+            capacity[(v, u)] += 1
+            v = u
+        flow += 1
+
+    if flow < n * k:
+        return None
+    return {participants[e]: [participants[r] for r in range(n)
+                              if r != e and capacity[(n + r, e)] > 0]
+            for e in range(n)}
+
+
+def latency_weighted(participants, k, latency, seed):
+    """Panels whose loads follow weighted_loads(); falls back to balanced()."""
+    rng = random.Random(seed)
+    loads = weighted_loads(participants, k, latency)
+    assignments = realize(participants, k, loads, rng)
+    if assignments is None or len(set(loads.values())) == 1:
+        return balanced(participants, k, seed)
+    return {"design": "latency_weighted", "assignments": assignments}
+
+
+def panels_of(assignments):
+    """Invert {evaluator: [responses]} into {response: [evaluators]}."""
+    panels = {response: [] for response in assignments}
+    for evaluator, responses in assignments.items():
+        for response in responses:
+            panels[response].append(evaluator)
+    return panels
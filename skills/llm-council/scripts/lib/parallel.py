@@ -0,0 +1,74 @@
+"""
+Process-pool helpers for CPU-bound batch work.
+
+Pools are only worth their startup cost for large inputs, so pool_map()
+runs in-process unless there is more than one worker and more than one item.
+Worker functions must be module-level so they can be pickled.
+"""
+
+import itertools
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+
+def worker_count(requested=None):
+    """Number of workers to use: `requested` if > 0, else the CPU count."""
+    if requested and requested > 0:
+        return requested
+    return os.cpu_count() or 1
+
+
+def pool_map(fn, items, workers=None, initializer=None, initargs=()):
+    """Return [fn(item) for item in items], spread over a process pool.
+
+    `initializer(*initargs)` runs once per worker (or once in-process) and is
+    the place to compile shared state such as regex patterns, so it isn't
+    pickled with every item. Result order matches `items`.
+    """
+    items = list(items)
+    workers = max(1, min(worker_count(workers), len(items)))
+    chunksize = max(1, len(items) // (workers * 4))
+    return list(pool_imap(fn, items, workers, initializer, initargs, chunksize))
+
+
+def pool_imap(fn, items, workers=None, initializer=None, initargs=(), chunksize=16):
+    """Lazily yield fn(item) in order; see pool_map().
+
+    In-process (one worker) the input is consumed item by item. With a pool,
+    items are read in chunks of `chunksize` and at most two chunks per worker
+    are in flight, so memory stays bounded on endless input and results are
+    yielded as soon as their chunk (and every earlier one) is done.
+    """
+    workers = worker_count(workers)
+    if workers <= 1:
+        if initializer:
+            initializer(*initargs)
+        for item in items:
+            yield fn(item)
+        return
+
+    chunks = _chunks(items, chunksize)
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer,
+                             initargs=initargs) as pool:
+        in_flight = deque(pool.submit(_run_chunk, fn, chunk)
+                          for chunk in itertools.islice(chunks, workers * 2))
+        while in_flight:
+            results = in_flight.popleft().result()
+            chunk = next(chunks, None)
+            if chunk is not None:  # refill before yielding, so workers stay busy
+                in_flight.append(pool.submit(_run_chunk, fn, chunk))
+            yield from results
+
+
+def _chunks(items, size):
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, max(1, size)))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _run_chunk(fn, chunk):
+    return [fn(item) for item in chunk]
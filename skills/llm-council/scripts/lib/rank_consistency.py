@@ -0,0 +1,119 @@
+"""
+Rank-consistency check: does each evaluator order responses like the others?
+
+For every evaluator, its weighted scores are compared with the leave-one-out
+consensus (the mean z-score each response got from the OTHER evaluators)
+using Kendall's tau-b. Consensus sums are computed once, so leaving one
+evaluator out is a subtraction; tau uses Knight's algorithm (sort, then
+count discordant pairs as merge-sort inversions), O(R log R) per evaluator
+instead of O(R^2) pair checks.
+"""
+
+import math
+
+from . import score_engine
+
+
+def kendall_tau(x, y):
+    """Kendall's tau-b between two equal-length sequences (ties handled).
+
+    Returns None when either side is constant or fewer than 2 items.
+    """
+    n = len(x)
+    if n < 2:
+        return None
+    pairs = sorted(zip(x, y))
+    n0 = n * (n - 1) // 2
+    ties_x = _tied_pairs(p[0] for p in pairs)
+    ties_xy = _tied_pairs(pairs)
+    ys = [p[1] for p in pairs]
+    discordant = _count_inversions(ys)  # sorts ys in place
+    ties_y = _tied_pairs(ys)
+
+    denom = (n0 - ties_x) * (n0 - ties_y)
+    if denom == 0:
+        return None
+    concordant_minus_discordant = n0 - ties_x - ties_y + ties_xy - 2 * discordant
+    return concordant_minus_discordant / math.sqrt(denom)
+
+
+def _tied_pairs(sorted_values):
+    """Number of equal pairs in an already sorted sequence."""
+    total = run = 0
+    previous = object()
+    for value in sorted_values:
+        if value == previous:
+            run += 1
+        else:
+            total += run * (run + 1) // 2
+            run = 0
+            previous = value
+    return total + run * (run + 1) // 2
+
+
+def _count_inversions(values):
+    """Sort `values` in place (bottom-up merge sort); return strict inversions."""
+    n = len(values)
+    buffer = [None] * n
+    inversions = 0
+    width = 1
+    while width < n:
+        for lo in range(0, n, 2 * width):
+            mid = min(lo + width, n)
+            hi = min(lo + 2 * width, n)
+            i, j, k = lo, mid, lo
+            while i < mid and j < hi:
+                if values[j] < values[i]:
+                    buffer[k] = values[j]
+                    inversions += mid - i
+                    j += 1
+                else:
+                    buffer[k] = values[i]
+                    i += 1
+                k += 1
+            buffer[k:hi] = values[i:mid] if i < mid else values[j:hi]
+            values[lo:hi] = buffer[lo:hi]
+        width *= 2
+    return inversions
+
+
+def evaluator_taus(evaluators, per_evaluator):
+    """Kendall tau of each evaluator against the leave-one-out consensus.
+
+    Args:
+        evaluators: evaluator names, parallel to per_evaluator
+        per_evaluator: [{label: weighted_score}]
+
+    Returns:
+        [{"evaluator", "kendall_tau", "responses"}]; kendall_tau is None when
+        fewer than 2 responses are shared with other evaluators or either
+        ordering is flat.
+    """
+    z_per_evaluator = [score_engine.z_normalize(scores) for scores in per_evaluator]
+    z_sum, count = {}, {}
+    for z_scores in z_per_evaluator:
+        for label, z in z_scores.items():
+            z_sum[label] = z_sum.get(label, 0.0) + z
+            count[label] = count.get(label, 0) + 1
+
+    results = []
+    for evaluator, scores, z_scores in zip(evaluators, per_evaluator, z_per_evaluator):
+        own, consensus = [], []
+        for label, score in scores.items():
+            others = count[label] - 1
+            if others:
+                own.append(score)
+                # Rounded so float residue from the subtraction cannot split ties
+                consensus.append(round((z_sum[label] - z_scores[label]) / others, 9))
+        tau = kendall_tau(own, consensus)
+        results.append({"evaluator": evaluator,
+                        "kendall_tau": round(tau, 4) if tau is not None else None,
+                        "responses": len(own)})
+    return results
+
+
+def flag_inconsistent(taus, min_tau, min_responses):
+    """bias_flags entries for evaluator_taus() rows below `min_tau`."""
+    return [{"type": "rank_consistency", **row} for row in taus
+            if row["kendall_tau"] is not None and row["responses"] >= min_responses
+            and row["kendall_tau"] < min_tau]
@@ -0,0 +1,63 @@
+"""
+Unix-socket RPC framing shared by the council helper daemon and its client.
+
+Wire format: one JSON object per line.
+  request:  {"method": "check_budget", "input": "<raw stdin JSON text>"}
+  response: {"ok": true, "result": {...}} or {"ok": false, "error": "..."}
+
+Kept free of YAML/config imports so the client starts as fast as possible.
+"""
+
+import json
+import os
+import socket
+import sys
+
+SOCKET_ENV = "LLM_COUNCIL_SOCKET"
+
+
+def default_socket_path():
+    """Socket path: $LLM_COUNCIL_SOCKET, else per-user runtime/temp dir."""
+    path = os.environ.get(SOCKET_ENV)
+    if path:
+        return path
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, "llm-council.sock")
+    tmp_dir = os.environ.get("TMPDIR", "/tmp")
+    return os.path.join(tmp_dir, f"llm-council-{os.getuid()}.sock")
+
+
+def encode(message):
+    """Serialize one message as a JSON line."""
+    return (json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def call(method, raw_input, socket_path=None, timeout=30.0):
+    """Send one request to the daemon and return its response dict.
+
+    Raises:
+        OSError: if no daemon is listening or the connection drops.
+    """
+    path = socket_path or default_socket_path()
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        sock.sendall(encode({"method": method, "input": raw_input}))
+        with sock.makefile("rb") as reader:
+            line = reader.readline()
+    if not line:
+        raise ConnectionError("daemon closed the connection without a response")
+    return json.loads(line)
+
+
+def emit(response):
+    """Print a response with the scripts' stdout contract; return exit code."""
+    if response.get("ok"):
+        json.dump(response["result"], sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+        return 0
+    json.dump({"error": response.get("error", "unknown error")}, sys.stdout,
+              ensure_ascii=False)
+    sys.stdout.write("\n")
+    return 1
@@ -0,0 +1,337 @@
+"""
+Compiled pattern engine for response sanitization.
+
+Patterns are compiled once per process. Each pattern set (injection,
+self-ID) is merged into one alternation of named groups when that is
+faster, and every match is recorded and stripped in the same sub() pass, so
+a clean response costs at most one scan per pattern instead of two.
+
+Results are identical to applying the patterns one at a time (finditer to
+record, sub to strip). The combined scan is only trusted when that is
+provable: all hits come from a single pattern, no earlier pattern matches
+inside a hit, and nothing matches in the stripped text. Otherwise the set
+falls back to one sub() pass per pattern, recording matches in the callback.
+"""
+
+import re
+
+try:
+    from re import _constants as _sre, _parser as _sre_parse
+except ImportError:  # Python < 3.11
+    try:
+        import sre_constants as _sre
+        import sre_parse as _sre_parse
+    except ImportError:
+        _sre = _sre_parse = None
+
+_GLOBAL_FLAGS_RE = re.compile(r"^\(\?([aiLmsux]+)\)")
+_UNMERGEABLE_RE = re.compile(r"\\[1-9]|\(\?P=|\(\?\(")  # backrefs, conditionals
+_MULTISPACE_RE = re.compile(r"  +")
+
+# {(injection_patterns, self_id_patterns): Sanitizer}
+_SANITIZERS = {}
+
+
+def get_sanitizer(injection_patterns, self_id_patterns):
+    """Return a cached Sanitizer for these pattern lists."""
+    key = (tuple(injection_patterns), tuple(self_id_patterns))
+    sanitizer = _SANITIZERS.get(key)
+    if sanitizer is None:
+        sanitizer = Sanitizer(*key)
+        _SANITIZERS[key] = sanitizer
+    return sanitizer
+
+
+class Sanitizer:
+    """Injection stripping, then self-ID stripping, then space cleanup."""
+
+    def __init__(self, injection_patterns, self_id_patterns):
+        self.stages = [
+            PatternSet(injection_patterns, "injection"),
+            PatternSet(self_id_patterns, "self_id"),
+        ]
+
+    def sanitize(self, content):
+        stripped = []
+        result = content
+        for stage in self.stages:
+            result, hits = stage.strip(result)
+            stripped.extend(hits)
+        result = _MULTISPACE_RE.sub(" ", result).strip()
+        return {"sanitized": result, "stripped_patterns": stripped}
+
+
+class PatternSet:
+    """One ordered list of patterns, applied as if sequentially."""
+
+    def __init__(self, patterns, label):
+        self.label = label
+        self.compiled = [re.compile(p) for p in patterns]
+        self.combined = _combine(patterns)
+
+    def strip(self, content):
+        """Remove every match; return (result, ["<label>: <match>", ...])."""
+        if self.combined is None:
+            return self._strip_sequential(content)
+
+        hits = []
+
+        def record(m):
+            hits.append((m.lastgroup, m.start(), m.group()))
+            return ""
+
+        result = self.combined.sub(record, content)
+        if not hits:
+            return content, []
+
+        groups = {name for name, _, _ in hits}
+        if len(groups) == 1:
+            index = int(groups.pop()[2:])
+            spans = [(start, start + len(text)) for _, start, text in hits]
+            if not self._earlier_match_inside(content, index, spans) \
+                    and self.combined.search(result) is None:
+                return result, [f"{self.label}: {text}" for _, _, text in hits]
+
+        return self._strip_sequential(content)
+
+    def _strip_sequential(self, content):
+        stripped = []
+
+        def record(m):
+            stripped.append(f"{self.label}: {m.group()}")
+            return ""
+
+        for pattern in self.compiled:
+            content = pattern.sub(record, content)
+        return content, stripped
+
+    def _earlier_match_inside(self, content, index, spans):
+        """True if a pattern ordered before `index` matches inside a hit.
+
+        Such a match would have been stripped first by sequential
+        application, so the combined result can't be used.
+        """
+        for pattern in self.compiled[:index]:
+            m = None
+            for start, end in spans:
+                if m is None or m.start() <= start:
+                    m = pattern.search(content, start + 1)
+                    if m is None:
+                        break
+                if m.start() < end:
+                    return True
+        return False
+
+
+class StreamSanitizer:
+    """Incremental sanitizer for chunked LLM output.
+
+    feed() returns the part of the response that is already safe to pass on,
+    with patterns stripped; close() flushes the rest. Each pattern runs as its
+    own stage (so results follow sequential semantics) and holds back only its
+    maximum match width, capped at `max_holdback` characters for unbounded
+    patterns such as "[^.]*". Concatenated output equals sanitize() on the
+    whole text unless a match is longer than the cap. Memory stays bounded by
+    the holdbacks plus one chunk.
+    """
+
+    def __init__(self, injection_patterns, self_id_patterns, max_holdback=2048):
+        self.stages = [
+            _PatternStream(re.compile(p), "injection", max_holdback)
+            for p in injection_patterns
+        ] + [
+            _PatternStream(re.compile(p), "self_id", max_holdback)
+            for p in self_id_patterns
+        ]
+        self.whitespace = _WhitespaceStream()
+        # Small chunks are batched before entering the stages: the slowest
+        # stage would hold them back anyway, and it saves a call per stage.
+        self.batch = max((stage.step for stage in self.stages), default=1)
+        self.pending = []
+        self.pending_size = 0
+
+    def feed(self, chunk):
+        """Add a chunk; return {"sanitized": <safe text>, "stripped_patterns": [...]}."""
+        self.pending.append(chunk)
+        self.pending_size += len(chunk)
+        if self.pending_size < self.batch:
+            return {"sanitized": "", "stripped_patterns": []}
+        return self._push(self._take_pending(), final=False)
+
+    def close(self):
+        """Flush everything held back; the stream can't be fed afterwards."""
+        return self._push(self._take_pending(), final=True)
+
+    def _take_pending(self):
+        text = "".join(self.pending)
+        self.pending = []
+        self.pending_size = 0
+        return text
+
+    def _push(self, text, final):
+        stripped = []
+        for stage in self.stages:
+            text, hits = stage.feed(text, final)
+            stripped.extend(hits)
+        text = self.whitespace.feed(text, final)
+        return {"sanitized": text, "stripped_patterns": stripped}
+
+
+class _PatternStream:
+    """One pattern over a stream: strips matches that can no longer change."""
+
+    CONTEXT = 64  # already-emitted chars kept for lookbehind / \b / ^
+
+    def __init__(self, pattern, label, max_holdback):
+        self.pattern = pattern
+        self.label = label
+        self.holdback = min(_max_width(pattern.pattern) + 1, max_holdback)
+        self.max_holdback = max_holdback
+        self.step = max(1, self.holdback // 4)  # amortizes rescans of the tail
+        self.buf = ""
+        self.start = 0  # buf[:start] is context that was already emitted
+        self.chunks = []  # text received since the last scan
+        self.size = 0
+        self.next_scan_at = 0
+
+    def feed(self, text, final):
+        if text:
+            self.chunks.append(text)
+            self.size += len(text)
+        if not final and len(self.buf) + self.size < self.next_scan_at:
+            return "", []
+
+        buf = self.buf + "".join(self.chunks)
+        self.chunks = []
+        self.size = 0
+        n = len(buf)
+
+        safe_end = n if final else n - self.holdback
+        cut = max(safe_end, self.start)
+        pos = self.start
+        out = []
+        hits = []
+        for m in self.pattern.finditer(buf, self.start):
+            if m.start() >= safe_end:
+                break
+            if m.end() > safe_end and safe_end - m.start() < self.max_holdback:
+                cut = m.start()  # may still grow with more text: decide later
+                break
+            out.append(buf[pos:m.start()])
+            hits.append(f"{self.label}: {m.group()}")
+            pos = m.end()
+        cut = max(cut, pos)
+        out.append(buf[pos:cut])
+
+        keep_from = max(0, cut - self.CONTEXT)
+        self.buf = buf[keep_from:]
+        self.start = cut - keep_from
+        self.next_scan_at = len(self.buf) + self.step
+        return "".join(out), hits
+
+
+class _WhitespaceStream:
+    """Streaming equivalent of re.sub("  +", " ", text).strip()."""
+
+    def __init__(self):
+        self.started = False
+        self.prev_space = False
+        self.pending = ""  # trailing whitespace, emitted only if text follows
+
+    def feed(self, text, final):
+        """Return cleaned text; trailing whitespace is dropped once final."""
+        if self.prev_space:
+            text = text.lstrip(" ")
+        text = _MULTISPACE_RE.sub(" ", text)
+        if text:
+            self.prev_space = text.endswith(" ")
+        if not self.started:
+            text = text.lstrip()
+            self.started = bool(text)
+        text = self.pending + text
+        body = text.rstrip()
+        self.pending = text[len(body):]
+        return body
+
+
+def _max_width(pattern):
+    """Upper bound on a pattern's match length (huge if unbounded)."""
+    if _sre_parse is None:
+        return 1 << 30
+    try:
+        return _sre_parse.parse(pattern).getwidth()[1]
+    except (re.error, TypeError, ValueError):
+        return 1 << 30
+
+
+def _combine(patterns):
+    """Merge patterns into `(?flags)(?=[first chars])(?P<_p0>...)|...`.
+
+    CPython's re does not optimize alternations, so a merged scan only beats
+    per-pattern scans when every pattern shares the same leading flags and
+    starts with a known set of characters: the lookahead lets the engine skip
+    ahead to candidate positions. Returns None otherwise, or when patterns
+    can't be merged safely (backreferences, conditionals, compile errors).
+    """
+    if len(patterns) < 2 or _sre_parse is None:
+        return None
+
+    flags = None
+    parts = []
+    first_chars = set()
+    for index, pattern in enumerate(patterns):
+        if _UNMERGEABLE_RE.search(pattern):
+            return None
+        m = _GLOBAL_FLAGS_RE.match(pattern)
+        pattern_flags = m.group(1) if m else ""
+        if flags is None:
+            flags = pattern_flags
+        elif pattern_flags != flags:
+            return None
+        body = pattern[m.end():] if m else pattern
+        try:
+            chars = _first_chars(_sre_parse.parse(pattern))
+        except (re.error, TypeError, ValueError):
+            return None
+        if not chars:
+            return None
+        first_chars |= chars
+        parts.append(f"(?P<_p{index}>{body})")
+
+    prefix = f"(?{flags})" if flags else ""
+    charset = "".join(re.escape(c) for c in sorted(first_chars))
+    try:
+        return re.compile(f"{prefix}(?=[{charset}])(?:{'|'.join(parts)})")
+    except re.error:
+        return None
+
+
+def _first_chars(parsed):
+    """Characters one of which must start every match, or None if unknown."""
+    if not len(parsed):
+        return None
+    op, av = parsed[0]
+    if op is _sre.LITERAL:
+        return {chr(av)}
+    if op is _sre.IN:
+        chars = set()
+        for item_op, item_av in av:
+            if item_op is not _sre.LITERAL:
+                return None
+            chars.add(chr(item_av))
+        return chars
+    if op is _sre.BRANCH:
+        chars = set()
+        for branch in av[1]:
+            branch_chars = _first_chars(branch)
+            if not branch_chars:
+                return None
+            chars |= branch_chars
+        return chars
+    if op is _sre.SUBPATTERN:
+        if av[1] or av[2]:
+            return None  # scoped flags, e.g. (?i:...), change what matches
+        return _first_chars(av[-1])
+    if op in (_sre.MAX_REPEAT, _sre.MIN_REPEAT) and av[0] >= 1:
+        return _first_chars(av[2])
+    return None
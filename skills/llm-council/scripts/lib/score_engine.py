@@ -0,0 +1,366 @@
+"""
+Score engine for council evaluations: evaluator x response x dimension.
+
+Evaluations are parsed once into a ScoreTensor. weighted(weights) applies a
+weight vector in one pass and returns WeightedScores, from which the ranking
+(per-evaluator z-normalization, mean z per response) and the sigma-deviation
+bias flags are derived without recomputing any weighted score. Re-scoring an
+archived session under new weights only repeats the weighted() step.
+
+With NumPy installed (and at least NUMPY_MIN_PAIRS scored pairs) the tensor
+is an E x R x D array and every step is a whole-array operation; otherwise a
+pure-Python path computes the same thing pair by pair. The NumPy path
+accumulates floats in the same order as the per-pair functions below and
+rounds like round(), so both paths produce identical rankings and scores.
+
+evaluator_taus() checks each evaluator's ordering against the others'
+(lib/rank_consistency.py). joint_ranking() replaces per-evaluator z-scores
+with a joint fit of evaluator offset/scale and response quality, for sparse
+panel matrices.
+"""
+
+import itertools
+import math
+
+from . import joint_scores, rank_consistency
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+NUMPY_MIN_PAIRS = 100  # evaluator/response pairs before the NumPy path pays off
+
+
+def weighted_score(scores, weights):
+    """Compute weighted sum: sum(score * weight/100)."""
+    total = 0.0
+    weight_sum = sum(weights.get(d, 0) for d in scores)
+    if weight_sum == 0:
+        return 0.0
+    for dim, score in scores.items():
+        w = weights.get(dim, 0) / 100.0
+        total += score * w
+    return round(total, 3)
+
+
+def _mean(values):
+    """Compute mean of a list."""
+    if not values:
+        return 0.0
+    return sum(values) / len(values)
+
+
+def _stdev(values, mean_val=None):
+    """Compute population stdev."""
+    if len(values) < 2:
+        return 0.0
+    if mean_val is None:
+        mean_val = _mean(values)
+    # d * d, not d ** 2: libm pow() can differ in the last bit, NumPy squares exactly
+    variance = sum((v - mean_val) * (v - mean_val) for v in values) / len(values)
+    return math.sqrt(variance)
+
+
+def z_normalize(evaluator_scores):
+    """Z-score normalize one evaluator's weighted scores.
+
+    Args:
+        evaluator_scores: {response_label: weighted_score}
+
+    Returns:
+        {response_label: z_score}
+    """
+    values = list(evaluator_scores.values())
+    if len(values) < 2:
+        return {k: 0.0 for k in evaluator_scores}
+
+    m = _mean(values)
+    s = _stdev(values, m)
+
+    if s == 0:
+        return {k: 0.0 for k in evaluator_scores}
+
+    return {k: round((v - m) / s, 4) for k, v in evaluator_scores.items()}
+
+
+class ScoreTensor:
+    """All evaluations of one session, indexed by evaluator, response, dimension."""
+
+    def __init__(self, evaluations, use_numpy=None):
+        self.evaluations = evaluations
+        self.evaluators = [ev.get("evaluator", "?") for ev in evaluations]
+        self._scores = [ev.get("scores", {}) for ev in evaluations]
+        # First-seen order; dict.fromkeys over chained keys runs at C speed
+        labels = {label: r for r, label in
+                  enumerate(dict.fromkeys(itertools.chain.from_iterable(self._scores)))}
+        dims = {dim: d for d, dim in enumerate(dict.fromkeys(itertools.chain.from_iterable(
+            itertools.chain.from_iterable(map(dict.values, self._scores)))))}
+        self.labels = list(labels)
+        self.dims = list(dims)
+        if use_numpy is None:
+            # Array setup costs more than it saves on small sessions
+            pairs = sum(map(len, self._scores))
+            use_numpy = pairs >= NUMPY_MIN_PAIRS
+        self.use_numpy = use_numpy and HAS_NUMPY
+        if self.use_numpy:
+            self._build_arrays(labels, dims)
+
+    def _build_arrays(self, labels, dims):
+        # Scores are stored by position within each pair's dict, not by
+        # dimension, so float sums accumulate in exactly the order
+        # weighted_score() uses; likewise labels by position per evaluator.
+        # Everything is flattened with C-level iterators and scattered at once.
+        chain = itertools.chain.from_iterable
+        n_eval = len(self.evaluators)
+        per_eval = np.fromiter(map(len, self._scores), np.intp, count=n_eval)
+        pairs = list(chain(map(dict.values, self._scores)))
+        lengths = np.fromiter(map(len, pairs), np.intp, count=len(pairs))
+        n_total = int(lengths.sum())
+
+        pair_e = np.repeat(np.arange(n_eval), per_eval)
+        pair_p = _positions(per_eval)
+        pair_r = np.fromiter(map(labels.__getitem__, chain(self._scores)), np.intp,
+                             count=len(pairs))
+        values = np.fromiter(chain(map(dict.values, pairs)), float, count=n_total)
+        dim_ids = np.fromiter(map(dims.__getitem__, chain(pairs)), np.intp, count=n_total)
+        pair_of = np.repeat(np.arange(len(pairs)), lengths)
+        e_idx, r_idx, p_idx = pair_e[pair_of], pair_r[pair_of], _positions(lengths)
+
+        n_pos = int(lengths.max()) if len(pairs) else 0
+        n_labels = int(per_eval.max()) if n_eval else 0
+        shape = (n_eval, len(self.labels), n_pos)
+        self.values = np.zeros(shape)
+        self.values[e_idx, r_idx, p_idx] = values
+        # Dimension at each position; padding points at an extra zero weight
+        self.dim_index = np.full(shape, len(self.dims), dtype=np.intp)
+        self.dim_index[e_idx, r_idx, p_idx] = dim_ids
+
+        self.scored = np.zeros(shape[:2], dtype=bool)  # evaluator scored response
+        self.scored[pair_e, pair_r] = True
+        # Label index at each position of an evaluator's scores (-1: none)
+        self.order = np.full((n_eval, n_labels), -1, dtype=np.intp)
+        self.order[pair_e, pair_p] = pair_r
+
+    def weighted(self, weights):
+        """Apply `weights` ({dim: percent}) to every evaluator/response pair."""
+        if not self.use_numpy:
+            per_evaluator = [
+                {label: weighted_score(dim_scores, weights)
+                 for label, dim_scores in ev.get("scores", {}).items()}
+                for ev in self.evaluations
+            ]
+            return WeightedScores(self, per_evaluator=per_evaluator)
+
+        raw = np.array([weights.get(dim, 0) for dim in self.dims] + [0], dtype=float)
+        scaled = raw / 100.0
+        n_eval, n_resp, n_pos = self.values.shape
+        total = np.zeros((n_eval, n_resp))
+        weight_sum = np.zeros((n_eval, n_resp))
+        for p in range(n_pos):
+            dim_ids = self.dim_index[:, :, p]
+            weight_sum += raw[dim_ids]
+            total += self.values[:, :, p] * scaled[dim_ids]
+        total[weight_sum == 0] = 0.0
+        return WeightedScores(self, matrix=_round_array(total, 3))
+
+
+class WeightedScores:
+    """Weighted score of each evaluator for each response under one weight set."""
+
+    def __init__(self, tensor, per_evaluator=None, matrix=None):
+        self.tensor = tensor
+        self.per_evaluator = per_evaluator  # pure Python: [{label: score}]
+        self.matrix = matrix                # NumPy: E x R, valid where tensor.scored
+
+    def ranking(self):
+        """[{label, z_score, raw_score}] sorted by mean z-score, best first."""
+        if self.matrix is None:
+            ranking = self._ranking_python()
+        else:
+            ranking = self._ranking_numpy()
+        ranking.sort(key=lambda r: r["z_score"], reverse=True)
+        return ranking
+
+    def _ranking_python(self):
+        z_lists = {}
+        raw_lists = {}
+        for scores in self.per_evaluator:
+            for label, z in z_normalize(scores).items():
+                z_lists.setdefault(label, []).append(z)
+                raw_lists.setdefault(label, []).append(scores[label])
+        return [{"label": label,
+                 "z_score": round(_mean(z_lists[label]), 4),
+                 "raw_score": round(_mean(raw_lists[label]), 3)}
+                for label in z_lists]
+
+    def _ranking_numpy(self):
+        ws = self.matrix
+        scored = self.tensor.scored
+        order = self.tensor.order
+        rows = np.arange(ws.shape[0])
+        count = scored.sum(axis=1)
+
+        # Per-evaluator mean and population stdev, summed in each evaluator's
+        # own label order (E x positions)
+        valid = order >= 0
+        in_order = np.where(valid, ws[rows[:, None], order], 0.0)
+        mean = _sum_rows(in_order.T) / np.maximum(count, 1)
+        squares = np.where(valid, np.square(in_order - mean[:, None]), 0.0)
+        stdev = np.sqrt(_sum_rows(squares.T) / np.maximum(count, 1))
+
+        usable = (count >= 2) & (stdev != 0)
+        z = (ws - mean[:, None]) / np.where(usable, stdev, 1.0)[:, None]
+        z = _round_array(z, 4)
+        z[~usable, :] = 0.0
+
+        # Per-response means over the evaluators that scored it, in evaluator order
+        n_scored = np.maximum(scored.sum(axis=0), 1)
+        z_mean = (_sum_rows(np.where(scored, z, 0.0)) / n_scored).tolist()
+        raw_mean = (_sum_rows(np.where(scored, ws, 0.0)) / n_scored).tolist()
+
+        # Labels in first-appearance order, as the pure-Python walk produces them
+        return [{"label": label,
+                 "z_score": round(z_mean[r], 4),
+                 "raw_score": round(raw_mean[r], 3)}
+                for r, label in enumerate(self.tensor.labels)]
+
+    def entries(self):
+        """[(evaluator_index, label_index, weighted_score)] in evaluation order."""
+        if self.matrix is None:
+            index = {label: r for r, label in enumerate(self.tensor.labels)}
+            return [(e, index[label], score)
+                    for e, scores in enumerate(self.per_evaluator)
+                    for label, score in scores.items()]
+        matrix = self.matrix.tolist()
+        return [(e, r, matrix[e][r])
+                for e, row in enumerate(self.tensor.order.tolist())
+                for r in row if r >= 0]
+
+    def evaluator_scores(self):
+        """[{label: weighted_score}] per evaluator, in each evaluator's label order."""
+        if self.matrix is None:
+            return self.per_evaluator
+        per_evaluator = [{} for _ in self.tensor.evaluators]
+        labels = self.tensor.labels
+        for e, r, score in self.entries():
+            per_evaluator[e][labels[r]] = score
+        return per_evaluator
+
+    def evaluator_taus(self):
+        """Each evaluator's Kendall tau vs the others' consensus (rank_consistency)."""
+        return rank_consistency.evaluator_taus(self.tensor.evaluators, self.evaluator_scores())
+
+    def joint_ranking(self, ridge=1.0, max_iterations=200, tolerance=1e-6):
+        """Ranking from the joint offset/scale/quality fit (see joint_scores).
+
+        Returns (ranking, fit): ranking rows are {label, z_score, raw_score}
+        with the standardized fitted quality as z_score.
+        """
+        entries = self.entries()
+        labels = self.tensor.labels
+        fitted = joint_scores.fit(entries, len(self.tensor.evaluators), len(labels),
+                                  ridge, max_iterations, tolerance)
+        raw_lists = [[] for _ in labels]
+        for _, r, score in entries:
+            raw_lists[r].append(score)
+        ranking = [{"label": label,
+                    "z_score": round(fitted["quality"][r], 4),
+                    "raw_score": round(_mean(raw_lists[r]), 3)}
+                   for r, label in enumerate(labels)]
+        ranking.sort(key=lambda row: row["z_score"], reverse=True)
+        return ranking, fitted
+
+    def bias_flags(self, variance_threshold):
+        """Flag evaluators deviating > threshold*sigma from a response's mean."""
+        if self.matrix is None:
+            return self._bias_python(variance_threshold)
+        return self._bias_numpy(variance_threshold)
+
+    def _bias_python(self, variance_threshold):
+        flags = []
+        response_scores = {}  # {response: [(evaluator, weighted_score)]}
+        for evaluator, scores in zip(self.tensor.evaluators, self.per_evaluator):
+            for label, ws in scores.items():
+                response_scores.setdefault(label, []).append((evaluator, ws))
+
+        for label, scores_list in response_scores.items():
+            if len(scores_list) < 2:
+                continue
+            values = [s for _, s in scores_list]
+            m = _mean(values)
+            s = _stdev(values, m)
+            if s == 0:
+                continue
+            for evaluator, ws in scores_list:
+                deviation = abs(ws - m) / s
+                if deviation > variance_threshold:
+                    flags.append(_bias_flag(evaluator, label, ws, m, s, deviation))
+        return flags
+
+    def _bias_numpy(self, variance_threshold):
+        ws = self.matrix
+        scored = self.tensor.scored
+        n_scored = scored.sum(axis=0)
+
+        mean = _sum_rows(np.where(scored, ws, 0.0)) / np.maximum(n_scored, 1)
+        squares = np.where(scored, np.square(ws - mean), 0.0)
+        stdev = np.sqrt(_sum_rows(squares) / np.maximum(n_scored, 1))
+
+        usable = (n_scored >= 2) & (stdev != 0)
+        deviation = np.abs(ws - mean) / np.where(usable, stdev, 1.0)
+        flagged = scored & usable & (deviation > variance_threshold)
+
+        flags = []
+        for r, e in zip(*np.nonzero(flagged.T)):  # response order, then evaluator
+            flags.append(_bias_flag(self.tensor.evaluators[e], self.tensor.labels[r],
+                                    float(ws[e, r]), float(mean[r]), float(stdev[r]),
+                                    float(deviation[e, r])))
+        return flags
+
+
+def _sum_rows(matrix):
+    """Column sums accumulated row by row, the order Python's sum() uses.
+
+    A running sum is sequential by definition; sum(axis=0) may switch to
+    pairwise summation (e.g. on a single column) and differ in the last bit.
+    """
+    if not len(matrix):
+        return np.zeros(matrix.shape[1:])
+    return np.add.accumulate(matrix, axis=0)[-1]
+
+
+def _positions(lengths):
+    """0..n-1 within each consecutive run of the given lengths, concatenated."""
+    starts = np.cumsum(lengths) - lengths
+    return np.arange(int(lengths.sum())) - np.repeat(starts, lengths)
+
+
+def _round_array(values, ndigits):
+    """Element-wise round(v, ndigits), matching Python's correctly rounded result.
+
+    np.rint(v * 10**n) / 10**n agrees with round() except where the scaled
+    value sits on (or within float error of) a .5 tie; those few elements are
+    re-rounded with round() itself.
+    """
+    scale = 10.0 ** ndigits
+    scaled = values * scale
+    out = np.rint(scaled) / scale
+    near_tie = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-6
+    for index in zip(*np.nonzero(near_tie)):
+        out[index] = round(float(values[index]), ndigits)
+    return out
+
+
+def _bias_flag(evaluator, label, score, mean, stdev, deviation):
+    return {
+        "type": "score_deviation",
+        "evaluator": evaluator,
+        "response": label,
+        "score": score,
+        "mean": round(mean, 3),
+        "stdev": round(stdev, 3),
+        "deviation_sigma": round(deviation, 2),
+    }
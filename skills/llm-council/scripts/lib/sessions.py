@@ -0,0 +1,84 @@
+"""
+Persistent per-session state for council scripts that are called repeatedly
+during one council run (e.g. once per arriving evaluation).
+
+Each session is a JSON file under cache_dir()/sessions. update() holds an
+exclusive flock across read-modify-write, so concurrent callers (separate
+processes, or the helper daemon's threads) never lose an update.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import time
+from contextlib import contextmanager
+
+from .io_helpers import CouncilError, cache_dir
+
+
+def sessions_dir():
+    return cache_dir() / "sessions"
+
+
+def _session_path(kind, session_id):
+    digest = hashlib.sha256(f"{kind}\0{session_id}".encode("utf-8")).hexdigest()[:24]
+    return sessions_dir() / f"{kind}-{digest}.json"
+
+
+@contextmanager
+def update(kind, session_id):
+    """Lock a session and yield its state dict (empty if new).
+
+    The dict is written back when the block exits without an exception; an
+    empty dict deletes the session.
+
+    Args:
+        kind: namespace, e.g. "scores"
+        session_id: caller-chosen session name
+    """
+    path = _session_path(kind, session_id)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        lock = open(f"{path}.lock", "a+")
+    except OSError as e:
+        raise CouncilError(f"Cannot open session store: {e}")
+
+    with lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        os.utime(lock.fileno())  # keeps prune() off locks that are in use
+        try:
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            state = {}
+        except (OSError, ValueError) as e:
+            raise CouncilError(f"Corrupt session state for '{session_id}': {e}")
+
+        yield state
+
+        if not state:
+            try:
+                os.unlink(path)  # the lock file stays until prune()
+            except OSError:
+                pass
+            return
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
+def prune(kind, max_age_hours):
+    """Delete `kind` session (and lock) files untouched for `max_age_hours`."""
+    cutoff = time.time() - max_age_hours * 3600
+    try:
+        entries = list(sessions_dir().glob(f"{kind}-*"))
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            if entry.stat().st_mtime < cutoff:
+                entry.unlink()
+        except OSError:
+            pass
@@ -0,0 +1,317 @@
+"""
+Single-pass MCP tool classifier for LLM and search tool detection.
+
+Each tool is normalized once (lowered name and description, parameter keys,
+required parameters) and scored against both llm_tool_detection and
+search_tool_detection. Description keywords of both configs share one
+keyword matcher, as do negative keywords, so each text is scanned once for
+both; name patterns are compiled when the classifier is built. Classifiers
+are cached per config tree, so a long-lived process compiles once until
+standard.yaml changes.
+
+Scores, evidence strings and classifications are the same as the original
+per-kind scripts produced. detect() adds the persistent per-tool result
+cache on top.
+"""
+
+import re
+import sqlite3
+
+from . import detection_cache
+from .io_helpers import CouncilError, load_config
+from .keyword_matcher import get_matcher
+
+KINDS = ("llm", "search")
+
+# kind -> (output key, confirmed classification, needs-confirmation classification)
+OUTPUTS = {
+    "llm": ("participants", "definite_llm", "likely_llm"),
+    "search": ("search_tools", "definite_search", "likely_search"),
+}
+
+# Tier 1 LLM parameter checks: (signal key, parameter name, prompt required?)
+_LLM_PARAMETER_CHECKS = [
+    ("required_prompt", "prompt", True),
+    ("optional_prompt", "prompt", False),
+    ("model_parameter", "model", None),
+    ("temperature_parameter", "temperature", None),
+    ("max_tokens_parameter", "max_tokens", None),
+]
+
+# [(llm_config, search_config, classifier)]; identity-compared, so a config
+# reload (new tree objects) builds a new classifier
+_CLASSIFIERS = []
+
+
+def get_classifier(llm_config, search_config):
+    """Return a cached ToolClassifier for these config sections."""
+    for llm, search, classifier in _CLASSIFIERS:
+        if llm is llm_config and search is search_config:
+            return classifier
+    classifier = ToolClassifier(llm_config, search_config)
+    _CLASSIFIERS[:] = [(llm_config, search_config, classifier)]
+    return classifier
+
+
+def detect(tools, kinds=KINDS, use_cache=True, catalog="default", changes_only=False):
+    """Classify `tools` and build the per-kind script outputs.
+
+    Results come from the persistent detection cache where possible (see
+    lib/detection_cache.py). Every cached run also replaces the catalog's
+    snapshot; with changes_only, each kind's output is the diff against the
+    previous snapshot instead of the usual lists.
+
+    Returns:
+        {kind: {output key: [...], "confirmation_needed": [...]}} sorted by
+        score descending, or {kind: detection_cache.changes(...)}.
+    """
+    configs = {"llm": load_config("llm_tool_detection"),
+               "search": load_config("search_tool_detection")}
+    classifier = get_classifier(configs["llm"], configs["search"])
+
+    store = detection_cache.open_cache() if use_cache else None
+    results = previous = None
+    if store is not None:
+        try:
+            with store:
+                results, previous = _cached_classify(store, classifier, configs, tools,
+                                                     kinds, catalog)
+        except (OSError, sqlite3.Error):
+            results = previous = None
+    if changes_only:
+        if previous is None:
+            raise CouncilError("changes_only needs the tool detection cache, "
+                               "which is disabled or unavailable")
+        return {kind: detection_cache.changes(previous[kind], results[kind])
+                for kind in kinds}
+    if results is None:
+        results = classifier.classify(tools, kinds)
+
+    detected = {}
+    for kind in kinds:
+        key, confirmed, likely = OUTPUTS[kind]
+        found = [r for r in results[kind] if r["classification"] == confirmed]
+        confirmation = [r for r in results[kind] if r["classification"] == likely]
+        found.sort(key=lambda r: r["score"], reverse=True)
+        confirmation.sort(key=lambda r: r["score"], reverse=True)
+        detected[kind] = {key: found, "confirmation_needed": confirmation}
+    return detected
+
+
+def detect_options(data):
+    """detect() keyword arguments from a script's input dict."""
+    catalog = data.get("catalog", "default")
+    if not isinstance(catalog, str) or not catalog:
+        raise CouncilError("'catalog' must be a non-empty string")
+    return {"use_cache": bool(data.get("cache", True)),
+            "changes_only": bool(data.get("changes_only", False)),
+            "catalog": catalog}
+
+
+def _cached_classify(store, classifier, configs, tools, kinds, catalog):
+    """classifier.classify() through the cache; also returns the previous run.
+
+    A kind whose catalog digest matches the last snapshot is served from it;
+    otherwise only tools missing from the per-tool cache are scored, and the
+    snapshot is replaced.
+    """
+    tools_hash = detection_cache.digest(tools)
+    results, previous, stale = {}, {}, {}
+    for kind in kinds:
+        catalog_hash = detection_cache.digest(
+            [detection_cache.config_digest(configs[kind]), tools_hash])
+        last_hash, previous[kind] = store.snapshot(catalog, kind)
+        if last_hash == catalog_hash:
+            results[kind] = previous[kind]
+        else:
+            stale[kind] = catalog_hash
+    if not stale:
+        return results, previous
+
+    tool_hashes = [detection_cache.tool_digest(t) for t in tools]
+    keys = {}
+    for kind in stale:
+        config_hash = detection_cache.config_digest(configs[kind])
+        keys[kind] = [detection_cache.entry_key(kind, config_hash, h) for h in tool_hashes]
+    cached = store.get_many(k for kind in stale for k in keys[kind])
+
+    missing = [i for i in range(len(tools))
+               if any(keys[kind][i] not in cached for kind in stale)]
+    fresh = {}
+    if missing:
+        scored = classifier.classify([tools[i] for i in missing], tuple(stale))
+        for kind in stale:
+            fresh.update((keys[kind][i], r) for i, r in zip(missing, scored[kind]))
+        store.put_many(fresh)
+    for kind, catalog_hash in stale.items():
+        results[kind] = [cached.get(k) or fresh[k] for k in keys[kind]]
+        store.save_snapshot(catalog, kind, catalog_hash, results[kind])
+    return results, previous
+
+
+def normalize(tool):
+    """Lowered text and parameter facts used by every signal."""
+    name = tool.get("name", "")
+    desc = tool.get("description", "")
+    params = tool.get("parameters", {})
+
+    param_keys = set()
+    if isinstance(params, dict):
+        for k, v in params.items():
+            param_keys.add(k.lower())
+            # Nested properties (JSON Schema style)
+            if isinstance(v, dict) and "properties" in v:
+                param_keys.update(p.lower() for p in v["properties"])
+    elif isinstance(params, list):
+        param_keys = {str(p).lower() for p in params}
+
+    return {
+        "name": name,
+        "name_lower": name.lower(),
+        "desc": desc,
+        "name_desc": name + " " + desc,
+        "params": params,
+        "param_keys": param_keys,
+    }
+
+
+def _param_is_required(params, name):
+    """Check if a parameter is required in the schema."""
+    if isinstance(params, dict):
+        required = params.get("required", [])
+        if isinstance(required, list) and name in required:
+            return True
+        param_def = params.get(name, {})
+        if isinstance(param_def, dict):
+            return param_def.get("required", False)
+    return False
+
+
+def _points(sig):
+    return sig.get("score", 0) if isinstance(sig, dict) else sig
+
+
+def _keyword_signals(signals):
+    return [(key, sig) for key, sig in signals.items()
+            if isinstance(sig, dict) and "keywords" in sig]
+
+
+def _compile_patterns(sig):
+    if isinstance(sig, dict) and "patterns" in sig:
+        return sig.get("score", 0), [re.compile(p, re.IGNORECASE) for p in sig["patterns"]]
+    return None
+
+
+class ToolClassifier:
+    """Both detection configs compiled for repeated classification."""
+
+    def __init__(self, llm_config, search_config):
+        self.configs = {"llm": llm_config, "search": search_config}
+
+        # One matcher per text for both kinds; group names are (kind, signal)
+        desc_groups, negative_groups = [], []
+        self.desc_points, self.negative_penalty = {}, {}
+        for kind, config in self.configs.items():
+            for key, sig in _keyword_signals(config.get("description_signals", {})):
+                desc_groups.append(((kind, key), sig["keywords"]))
+                self.desc_points[(kind, key)] = sig.get("score", 0)
+            for key, sig in _keyword_signals(config.get("negative_signals", {})):
+                negative_groups.append(((kind, key), sig["keywords"]))
+                self.negative_penalty[(kind, key)] = sig.get("penalty", 0)
+        self.desc_matcher = get_matcher(desc_groups)
+        self.negative_matcher = get_matcher(negative_groups)
+
+        llm_names = llm_config.get("name_signals", {})
+        # Explicit patterns first; suggestive only as fallback
+        self.llm_names = [(compiled, label) for compiled, label in (
+            (_compile_patterns(llm_names.get("explicit_patterns", {})), "explicit_name"),
+            (_compile_patterns(llm_names.get("suggestive_patterns", {})), "suggestive_name"),
+        ) if compiled]
+        search_names = _compile_patterns(
+            search_config.get("name_signals", {}).get("patterns", {}))
+        self.search_names = [(search_names, "name_pattern")] if search_names else []
+
+    def classify(self, tools, kinds=KINDS):
+        """{kind: [{name, score, classification, evidence}]} per tool, in order."""
+        results = {kind: [] for kind in kinds}
+        for tool in tools:
+            norm = normalize(tool)
+            desc_hits = self.desc_matcher.matched_groups(norm["desc"])
+            negative_hits = self.negative_matcher.matched_groups(norm["name_desc"])
+            for kind in kinds:
+                evidence = []  # [(points, text)]
+                if kind == "llm":
+                    self._llm_parameters(norm, evidence)
+                else:
+                    self._search_parameters(norm, evidence)
+                for group in desc_hits:
+                    if group[0] == kind:
+                        pts = self.desc_points[group]
+                        evidence.append((pts, f"{group[1]}(+{pts})"))
+                names = self.llm_names if kind == "llm" else self.search_names
+                evidence.extend(self._name(norm["name_lower"], names))
+                for group in negative_hits:
+                    if group[0] == kind:
+                        penalty = self.negative_penalty[group]
+                        evidence.append((penalty, f"{group[1]}({penalty})"))
+
+                score = sum(pts for pts, _ in evidence)
+                results[kind].append({
+                    "name": norm["name"],
+                    "score": score,
+                    "classification": self._classify(kind, score),
+                    "evidence": [text for _, text in evidence],
+                })
+        return results
+
+    def _llm_parameters(self, norm, evidence):
+        """Tier 1: LLM-indicative parameters."""
+        signals = self.configs["llm"].get("parameter_signals", {})
+        param_keys = norm["param_keys"]
+        prompt_matched = False
+        for signal_key, param_name, required_flag in _LLM_PARAMETER_CHECKS:
+            if signal_key not in signals:
+                continue
+            pts = _points(signals[signal_key])
+            if param_name == "prompt":
+                if "prompt" not in param_keys or prompt_matched:
+                    continue
+                if required_flag is True:
+                    if _param_is_required(norm["params"], "prompt"):
+                        evidence.append((pts, f"required_prompt(+{pts})"))
+                        prompt_matched = True
+                else:
+                    evidence.append((pts, f"optional_prompt(+{pts})"))
+                    prompt_matched = True
+            elif param_name in param_keys or param_name.replace("_", "") in param_keys:
+                evidence.append((pts, f"{signal_key}(+{pts})"))
+
+    def _search_parameters(self, norm, evidence):
+        """Search-indicative parameters (query, url)."""
+        sig = self.configs["search"].get("parameter_signals", {}).get("query_parameter", {})
+        pts = _points(sig)
+        if "query" in norm["param_keys"] or "url" in norm["param_keys"]:
+            evidence.append((pts, f"query_parameter(+{pts})"))
+
+    @staticmethod
+    def _name(name_lower, names):
+        """Name patterns; only the first matching signal applies."""
+        for (pts, patterns), label in names:
+            for pattern in patterns:
+                if pattern.search(name_lower):
+                    return [(pts, f"{label}(+{pts})")]
+        return []
+
+    def _classify(self, kind, score):
+        thresholds = self.configs[kind].get("thresholds", {})
+        if kind == "llm":
+            if score >= thresholds.get("definite_llm", 70):
+                return "definite_llm"
+            if score >= thresholds.get("likely_llm", 40):
+                return "likely_llm"
+            return "not_llm"
+        if score >= thresholds.get("definite_search", 60):
+            return "definite_search"
+        if score >= thresholds.get("not_search", 30):
+            return "likely_search"
+        return "not_search"
@@ -0,0 +1,262 @@
+"""
+Async transports for calling LLM tools from the helper scripts.
+
+A transport is anything with `async call(tool, prompt, timeout) -> str`
+that raises TransportError (or asyncio.TimeoutError) on failure.
+SimulatedTransport stands in for real endpoints in dry runs and tests.
+HttpTransport speaks MCP's streamable HTTP binding: JSON-RPC `tools/call`
+POSTed to the server endpoint, with the `initialize` handshake done once per
+endpoint and the Mcp-Session-Id header echoed back. Replies may be plain
+JSON or a text/event-stream carrying the JSON-RPC response.
+
+The HTTP client is a minimal asyncio one (Content-Length, chunked or
+read-to-close bodies), so cancelling a call closes its socket at once
+instead of leaving a thread blocked until its timeout.
+"""
+
+import asyncio
+import itertools
+import json
+import random
+import ssl
+from urllib.parse import urlsplit
+
+from .io_helpers import CouncilError, load_config
+
+PROTOCOL_VERSION = "2025-03-26"
+CLIENT_INFO = {"name": "llm-council", "version": "1"}
+
+_MAX_HEADER_LINES = 100
+
+
+class TransportError(Exception):
+    """A call failed: unreachable endpoint, HTTP/JSON-RPC error, bad reply."""
+
+
+class HttpTransport:
+    """MCP tools/call over HTTP.
+
+    Args:
+        endpoints: {tool: url}; tools not listed use `default_endpoint`
+        default_endpoint: url or None
+        argument: name of the tool argument that carries the prompt
+        handshake: send initialize / notifications/initialized first
+    """
+
+    def __init__(self, endpoints=None, default_endpoint=None, argument="prompt",
+                 handshake=True):
+        self.endpoints = dict(endpoints or {})
+        self.default_endpoint = default_endpoint
+        self.argument = argument
+        self.handshake = handshake
+        self._ids = itertools.count(1)
+        self._sessions = {}  # url -> asyncio.Task resolving to session id or None
+
+    def endpoint(self, tool):
+        return self.endpoints.get(tool, self.default_endpoint)
+
+    async def call(self, tool, prompt, timeout):
+        """Call `tool` with `prompt`; return its text output."""
+        url = self.endpoint(tool)
+        if not url:
+            raise TransportError(f"no endpoint for {tool}")
+        return await asyncio.wait_for(self._call(url, tool, prompt), timeout)
+
+    async def _call(self, url, tool, prompt):
+        headers = {}
+        if self.handshake:
+            session = await self._session(url)
+            if session:
+                headers["Mcp-Session-Id"] = session
+        result = await self._rpc(url, "tools/call",
+                                 {"name": tool, "arguments": {self.argument: prompt}}, headers)
+        if not isinstance(result, dict):
+            raise TransportError("tools/call returned no result object")
+        content = result.get("content", [])
+        if not isinstance(content, list):
+            raise TransportError("tools/call result 'content' is not a list")
+        texts = [part.get("text") for part in content
+                 if isinstance(part, dict) and part.get("type") == "text"]
+        if not all(isinstance(t, str) for t in texts):
+            raise TransportError("tools/call text content is not a string")
+        text = "".join(texts)
+        if result.get("isError"):
+            raise TransportError(f"tool error: {text[:200]}")
+        return text
+
+    async def _session(self, url):
+        """Initialize `url` once; concurrent callers share the handshake."""
+        task = self._sessions.get(url)
+        if task is None or (task.done() and (task.cancelled() or task.exception())):
+            task = asyncio.ensure_future(self._initialize(url))
+            self._sessions[url] = task
+        # shield: one caller timing out must not cancel the others' handshake
+        return await asyncio.shield(task)
+
+    async def _initialize(self, url):
+        params = {"protocolVersion": PROTOCOL_VERSION, "capabilities": {},
+                  "clientInfo": CLIENT_INFO}
+        status, headers, body = await _post(url, self._request("initialize", params), {})
+        _rpc_result(status, headers, body)
+        session = headers.get("mcp-session-id")
+        extra = {"Mcp-Session-Id": session} if session else {}
+        await _post(url, {"jsonrpc": "2.0", "method": "notifications/initialized"}, extra)
+        return session
+
+    async def _rpc(self, url, method, params, headers):
+        status, reply_headers, body = await _post(url, self._request(method, params), headers)
+        return _rpc_result(status, reply_headers, body)
+
+    def _request(self, method, params):
+        return {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params}
+
+
+class SimulatedTransport:
+    """Local fake endpoints with configurable latency distributions.
+
+    Args:
+        specs: {tool: {"median": 20, "sigma": 0.5, "failure_rate": 0.0,
+                       "tail": {"probability": 0.1, "multiplier": 5},
+                       "reply": "..."}}
+            Latency is median * lognormal(0, sigma) seconds, multiplied by
+            tail.multiplier with tail.probability; a failure is raised after
+            the latency has elapsed.
+        seed: RNG seed, so runs are repeatable
+        time_scale: real seconds slept per simulated second
+    """
+
+    def __init__(self, specs, seed=0, time_scale=1.0):
+        self.specs = specs
+        self.time_scale = time_scale
+        self._rng = random.Random(seed)
+
+    def sample(self, tool):
+        """(simulated latency in seconds, fails?) for one call to `tool`."""
+        spec = self.specs.get(tool)
+        if spec is None:
+            raise TransportError(f"no simulated endpoint for {tool}")
+        latency = spec.get("median", 10) * self._rng.lognormvariate(0, spec.get("sigma", 0.5))
+        tail = spec.get("tail") or {}
+        if self._rng.random() < tail.get("probability", 0):
+            latency *= tail.get("multiplier", 5)
+        return latency, self._rng.random() < spec.get("failure_rate", 0)
+
+    async def call(self, tool, prompt, timeout):
+        latency, fails = self.sample(tool)
+        delay = latency * self.time_scale
+        if delay > timeout:
+            await asyncio.sleep(timeout)
+            raise asyncio.TimeoutError
+        await asyncio.sleep(delay)
+        if fails:
+            raise TransportError(f"simulated failure of {tool}")
+        return self.specs[tool].get("reply", f"Response from {tool}")
+
+
+def from_input(data):
+    """(transport, time_scale) from a script input's simulate / endpoint(s) fields."""
+    simulate = data.get("simulate")
+    if simulate is not None:
+        if not isinstance(simulate, dict) or not isinstance(simulate.get("tools"), dict):
+            raise CouncilError("'simulate' must be {\"tools\": {tool: latency spec}, ...}")
+        scale = simulate.get("time_scale", 1.0)
+        if not isinstance(scale, (int, float)) or scale <= 0:
+            raise CouncilError("'simulate.time_scale' must be a positive number")
+        return SimulatedTransport(simulate["tools"], simulate.get("seed", 0), scale), scale
+    endpoints = data.get("endpoints") or {}
+    if not isinstance(endpoints, dict):
+        raise CouncilError("'endpoints' must map tools to MCP URLs")
+    if not endpoints and not data.get("endpoint"):
+        raise CouncilError("Provide 'endpoint', 'endpoints' or 'simulate'")
+    argument = load_config("security.probe_verification").get("prompt_argument", "prompt")
+    return HttpTransport(endpoints, data.get("endpoint"), argument), 1.0
+
+
+def _rpc_result(status, headers, body):
+    """JSON-RPC result from an HTTP reply, or TransportError."""
+    if status >= 400:
+        raise TransportError(f"HTTP {status}: {body[:200].decode('utf-8', 'replace')}")
+    text = body.decode("utf-8", "replace")
+    if headers.get("content-type", "").startswith("text/event-stream"):
+        # Last data: line that holds a JSON-RPC response
+        message = None
+        for line in text.splitlines():
+            if line.startswith("data:"):
+                try:
+                    candidate = json.loads(line[5:])
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(candidate, dict) and ("result" in candidate or "error" in candidate):
+                    message = candidate
+    else:
+        try:
+            message = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise TransportError(f"invalid JSON reply: {e}")
+    if not isinstance(message, dict):
+        raise TransportError("no JSON-RPC response in reply")
+    if "error" in message:
+        error = message["error"]
+        detail = error.get("message", error) if isinstance(error, dict) else error
+        raise TransportError(f"JSON-RPC error: {detail}")
+    return message.get("result")
+
+
+async def _post(url, payload, headers):
+    """POST JSON; return (status, {lowercase header: value}, body bytes)."""
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise TransportError(f"unsupported endpoint URL: {url}")
+    secure = parts.scheme == "https"
+    port = parts.port or (443 if secure else 80)
+    path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+    lines = [f"POST {path} HTTP/1.1", f"Host: {parts.netloc}",
+             "Content-Type: application/json",
+             "Accept: application/json, text/event-stream",
+             f"Content-Length: {len(body)}", "Connection: close"]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    request = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+    try:
+        reader, writer = await asyncio.open_connection(
+            parts.hostname, port, ssl=ssl.create_default_context() if secure else None)
+    except OSError as e:
+        raise TransportError(f"cannot connect to {parts.netloc}: {e}")
+    try:
+        writer.write(request)
+        await writer.drain()
+        return await _read_response(reader)
+    except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+        raise TransportError(f"bad HTTP reply from {parts.netloc}: {e}")
+    finally:
+        writer.close()
+
+
+async def _read_response(reader):
+    status_line = await reader.readline()
+    fields = status_line.split(None, 2)
+    if len(fields) < 2 or not fields[0].startswith(b"HTTP/"):
+        raise ValueError(f"bad status line {status_line[:80]!r}")
+    status = int(fields[1])
+    headers = {}
+    for _ in range(_MAX_HEADER_LINES):
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        return status, headers, b"".join(chunks)
+    if "content-length" in headers:
+        return status, headers, await reader.readexactly(int(headers["content-length"]))
+    return status, headers, await reader.read()
@@ -2,8 +2,10 @@
 YAML parser for LLM Council config files.
 
 Tries PyYAML first; falls back to a custom parser that handles the specific
-patterns found in protocols/standard.yaml (nested maps, inline dicts/lists,
-scalar types, block strings, comments).
+patterns found in protocols/standard.yaml and rubrics/*.yaml (nested maps,
+list-of-maps, inline dicts/lists, scalar types, block strings, comments).
+The fallback is the hot path on minimal images, so it reads each line once
+and resolves scalars with the same YAML 1.1 rules as PyYAML's safe_load.
 """
 
 import re
@@ -14,6 +16,12 @@ try:
 except ImportError:
     HAS_YAML = False
 
+# What load_yaml() raises on malformed YAML (the fallback raises ValueError)
+PARSE_ERRORS = (ValueError, yaml.YAMLError) if HAS_YAML else (ValueError,)
+
+# Bump when the fallback parser's output changes (invalidates config caches)
+FALLBACK_VERSION = 2
+
 
 def load_yaml(path):
     """Load a YAML file and return a dict."""
@@ -45,279 +53,419 @@ def extract_section(config, dotpath):
 # ---------------------------------------------------------------------------
 # Custom nested YAML parser
 # ---------------------------------------------------------------------------
+#
+# Two linear stages:
+#   _tokenize()  reads each line once: strips comments, splits "- " and
+#                "key: value" indicators, and materializes block scalars and
+#                plain-scalar continuation lines.
+#   _Builder     assembles the tree by recursive descent over the tokens with
+#                O(1) lookahead.
+#
+# Token: [indent, kind, key, raw_value, line_no]
+#   raw_value is None (nothing after the indicator), a raw scalar/flow string,
+#   or a _BlockScalar holding an already-materialized block string.
+
+_ITEM = 0  # "- ..." sequence entry
+_KEY = 1   # "key: ..." mapping entry
+
+
+class _BlockScalar(str):
+    """Marks a value that is already a final string (| or > block)."""
+
+
+_COMMENT_RE = re.compile(
+    r"""(?:^|(?<=[\s\[{,:]))(?:"(?:[^"\\]|\\.)*"|'(?:[^']|'')*')|(?:^|(?<=\s))#"""
+)
+_BLOCK_HEADER_RE = re.compile(r"([|>])([+-]?)([1-9]?)([+-]?)$")
+_DQ_RE = re.compile(r'"((?:[^"\\]|\\.)*)"', re.S)
+_SQ_RE = re.compile(r"'((?:[^']|'')*)'")
+_WS_RE = re.compile(r"\s*")
+_FLOW_PLAIN_RE = re.compile(r"(?:[^,\[\]{}:]|:(?=[^\s,\[\]{}]))*")
+_ESCAPE_RE = re.compile(r"\\(x[0-9A-Fa-f]{2}|u[0-9A-Fa-f]{4}|U[0-9A-Fa-f]{8}|.)", re.S)
+
+_ESCAPES = {
+    "0": "\0", "a": "\a", "b": "\b", "t": "\t", "\t": "\t", "n": "\n",
+    "v": "\v", "f": "\f", "r": "\r", "e": "\x1b", " ": " ", '"': '"',
+    "/": "/", "\\": "\\", "N": "\x85", "_": "\xa0", "L": "\u2028", "P": "\u2029",
+}
+
+# YAML 1.1 implicit types, as resolved by PyYAML's SafeLoader
+_BOOLS = {
+    "yes": True, "Yes": True, "YES": True, "true": True, "True": True,
+    "TRUE": True, "on": True, "On": True, "ON": True,
+    "no": False, "No": False, "NO": False, "false": False, "False": False,
+    "FALSE": False, "off": False, "Off": False, "OFF": False,
+}
+_NULLS = {"", "~", "null", "Null", "NULL"}
+_INT_RE = re.compile(r"""^(?:[-+]?0b[0-1_]+
+                    |[-+]?0[0-7_]+
+                    |[-+]?(?:0|[1-9][0-9_]*)
+                    |[-+]?0x[0-9a-fA-F_]+
+                    |[-+]?[1-9][0-9_]*(?::[0-5]?[0-9])+)$""", re.X)
+_FLOAT_RE = re.compile(r"""^(?:[-+]?(?:[0-9][0-9_]*)\.[0-9_]*(?:[eE][-+][0-9]+)?
+                    |\.[0-9][0-9_]*(?:[eE][-+][0-9]+)?
+                    |[-+]?[0-9][0-9_]*(?::[0-5]?[0-9])+\.[0-9_]*
+                    |[-+]?\.(?:inf|Inf|INF)
+                    |\.(?:nan|NaN|NAN))$""", re.X)
+
 
 def _parse_nested(content):
     """Parse YAML content without PyYAML.
 
-    Handles: nested maps, inline dicts {k: v}, inline lists [a, b],
-    list items (- val), scalars (int, float, bool, str), block strings (|),
-    comments (#).
+    Handles: nested maps, list items (- val), list-of-maps (- key: val),
+    inline dicts {k: v}, inline lists [a, b], quoted strings with escapes,
+    block strings (| and > with chomping indicators), plain multi-line
+    scalars, comments (#). Runs in time linear in the input size.
     """
-    lines = content.split("\n")
-    root = {}
-    # Stack of (indent_level, dict_ref)
-    stack = [(-1, root)]
+    tokens = _tokenize(content)
+    if not tokens:
+        return None
+    builder = _Builder(tokens)
+    result = builder.parse_block(tokens[0][0])
+    if builder.pos < len(tokens):
+        raise ValueError(f"line {tokens[builder.pos][4]}: unexpected indentation")
+    return result
+
+
+def _tokenize(content):
+    """Single pass over the lines, producing structural tokens."""
+    lines = content.splitlines()
+    n = len(lines)
+    tokens = []
     i = 0
 
-    while i < len(lines):
-        raw = lines[i]
-        # Strip inline comments (but not inside quoted strings)
-        stripped = _strip_comment(raw)
-        stripped_trimmed = stripped.strip()
+    while i < n:
+        line = lines[i]
+        i += 1
+        body = line.lstrip(" ")
+        if not body or body[0] == "#":
+            continue
+        indent = len(line) - len(body)
+        if "#" in body:
+            body = _strip_comment(body)
+        body = body.rstrip()
+        if not body:
+            continue
 
-        # Skip blank lines and comment-only lines
-        if not stripped_trimmed or stripped_trimmed.startswith("#"):
-            i += 1
+        # Sequence indicators ("- ", possibly several: "- - x")
+        item = None
+        while body == "-" or body.startswith("- "):
+            item = [indent, _ITEM, None, None, i]
+            tokens.append(item)
+            rest = body[1:].lstrip(" ")
+            indent += len(body) - len(rest)
+            body = rest
+        if not body:
             continue
 
-        indent = _indent_level(raw)
-
-        # Pop stack to find the correct parent
-        while len(stack) > 1 and stack[-1][0] >= indent:
-            stack.pop()
-        parent = stack[-1][1]
-
-        # Handle list item: - value or - key: value (list of dicts)
-        if stripped_trimmed.startswith("- "):
-            item_content = stripped_trimmed[2:].strip()
-            if isinstance(parent, list):
-                # Quoted strings are always scalars, even if they contain ':'
-                if (item_content.startswith('"') and item_content.endswith('"')) or \
-                   (item_content.startswith("'") and item_content.endswith("'")):
-                    parent.append(_parse_scalar(item_content))
-                    i += 1
-                    continue
-                if ":" in item_content:
-                    # List item is a map entry: - key: value
-                    item_dict = {}
-                    k, _, v = item_content.partition(":")
-                    k = k.strip()
-                    v = v.strip()
-                    if v:
-                        item_dict[k] = _parse_scalar(v)
-                    else:
-                        item_dict[k] = {}
-                    parent.append(item_dict)
-                    # Push so subsequent indented lines add to this dict
-                    # Use indent of the "- " content (indent + 2)
-                    stack.append((indent, item_dict))
-                else:
-                    parent.append(_parse_scalar(item_content))
-            i += 1
+        entry = _split_key(body)
+        if entry is not None:
+            token = [indent, _KEY, entry[0], entry[1] or None, i]
+            tokens.append(token)
+        elif item is not None:
+            token = item
+            token[3] = body
+        elif tokens and isinstance(tokens[-1][3], str) \
+                and not isinstance(tokens[-1][3], _BlockScalar) \
+                and indent > tokens[-1][0] and tokens[-1][3][0] not in "\"'[{":
+            # Continuation of a multi-line plain scalar
+            tokens[-1][3] += " " + body
             continue
+        else:
+            raise ValueError(f"line {i}: expected 'key: value' or '- item'")
 
-        # Handle key: value
-        if ":" in stripped_trimmed:
-            key, _, rest = stripped_trimmed.partition(":")
-            key = key.strip()
-            rest = rest.strip()
-
-            if not rest:
-                # Check next line to determine if list or nested map
-                next_indent, next_line = _peek_next(lines, i + 1)
-                if next_line is not None and next_line.strip().startswith("- "):
-                    # Next is a list
-                    new_list = []
-                    parent[key] = new_list
-                    stack.append((indent, new_list))
-                else:
-                    # Nested map
-                    new_dict = {}
-                    parent[key] = new_dict
-                    stack.append((indent, new_dict))
-            elif rest == "|" or rest == ">":
-                # Block string — consume indented lines
-                block_lines, i = _consume_block(lines, i + 1, indent)
-                parent[key] = "\n".join(block_lines)
-                continue
-            elif rest.startswith("{"):
-                # Inline dict
-                parent[key] = _parse_inline_dict(rest)
-            elif rest.startswith("["):
-                # Inline list
-                parent[key] = _parse_inline_list(rest)
-            else:
-                parent[key] = _parse_scalar(rest)
+        header = _BLOCK_HEADER_RE.match(token[3]) if token[3] else None
+        if header:
+            parent_indent = item[0] if token is item else token[0]
+            token[3], i = _consume_block(lines, i, parent_indent, header)
 
-        i += 1
+    return tokens
 
-    return root
 
+def _strip_comment(text):
+    """Cut a trailing # comment, ignoring '#' inside quoted scalars."""
+    for m in _COMMENT_RE.finditer(text):
+        if text[m.start()] == "#":
+            return text[:m.start()]
+    return text
 
-def _indent_level(line):
-    """Count leading spaces."""
-    return len(line) - len(line.lstrip(" "))
 
+def _split_key(body):
+    """Split 'key: value' -> (key, value_text); None if not a map entry."""
+    first = body[0]
+    if first in "\"'":
+        m = (_DQ_RE if first == '"' else _SQ_RE).match(body)
+        if not m:
+            return None
+        after = body[m.end():].lstrip(" ")
+        if after == ":" or after.startswith(": "):
+            return _parse_scalar(body[:m.end()]), after[1:].strip()
+        return None
+    if first in "[{":
+        return None
 
-def _strip_comment(line):
-    """Strip inline comments, preserving quoted strings."""
-    in_quote = None
-    for i, ch in enumerate(line):
-        if ch in ('"', "'") and (i == 0 or line[i - 1] != "\\"):
-            if in_quote == ch:
-                in_quote = None
-            elif in_quote is None:
-                in_quote = ch
-        elif ch == "#" and in_quote is None:
-            # Check for space before # (YAML requires it for inline comments)
-            if i == 0 or line[i - 1] == " ":
-                return line[:i]
-    return line
+    pos = body.find(": ")
+    if pos == -1:
+        if not body.endswith(":"):
+            return None
+        pos = len(body) - 1
+    return _parse_scalar(body[:pos].rstrip()), body[pos + 1:].strip()
 
 
-def _peek_next(lines, start):
-    """Look ahead to the next non-empty, non-comment line."""
-    for j in range(start, len(lines)):
-        s = lines[j].strip()
-        if s and not s.startswith("#"):
-            return _indent_level(lines[j]), lines[j]
-    return -1, None
+def _consume_block(lines, start, parent_indent, header):
+    """Consume a block string (| or >) starting at line index `start`.
 
+    Returns (_BlockScalar, next_line_index).
+    """
+    style = header.group(1)
+    chomp = header.group(2) or header.group(4)
+    explicit = header.group(3)
 
-def _consume_block(lines, start, parent_indent):
-    """Consume a block string (| or >) starting from `start`."""
+    block_indent = parent_indent + int(explicit) if explicit else None
     block = []
     i = start
-    while i < len(lines):
-        if lines[i].strip() == "" or _indent_level(lines[i]) > parent_indent:
-            block.append(lines[i].strip())
-            i += 1
+    n = len(lines)
+    while i < n:
+        line = lines[i]
+        body = line.lstrip(" ")
+        indent = len(line) - len(body)
+        if body:
+            if block_indent is None:
+                if indent <= parent_indent:
+                    break
+                block_indent = indent
+            elif indent < block_indent:
+                break
+            block.append(line[block_indent:])
         else:
-            break
-    # Remove trailing empty lines
+            block.append(line[block_indent:] if block_indent and len(line) > block_indent else "")
+        i += 1
+
+    trailing = 0
     while block and block[-1] == "":
         block.pop()
-    return block, i
-
-
-def _split_top_level(s, delimiter=","):
-    """Split string on delimiter, respecting brackets and quotes."""
-    parts = []
-    current = []
-    depth_bracket = 0
-    depth_brace = 0
-    in_quote = None
-
-    for ch in s:
-        if ch in ('"', "'") and in_quote is None:
-            in_quote = ch
-        elif ch == in_quote:
-            in_quote = None
-        elif in_quote is None:
-            if ch == "[":
-                depth_bracket += 1
-            elif ch == "]":
-                depth_bracket -= 1
-            elif ch == "{":
-                depth_brace += 1
-            elif ch == "}":
-                depth_brace -= 1
-            elif ch == delimiter and depth_bracket == 0 and depth_brace == 0:
-                parts.append("".join(current))
-                current = []
-                continue
-        current.append(ch)
-
-    if current:
-        parts.append("".join(current))
-    return parts
-
-
-def _parse_inline_dict(s):
-    """Parse `{ key: val, key2: val2 }` into a dict."""
-    s = s.strip()
-    if s.startswith("{"):
-        s = s[1:]
-    if s.endswith("}"):
-        s = s[:-1]
-    result = {}
-    for pair in _split_top_level(s):
-        pair = pair.strip()
-        if ":" in pair:
-            k, _, v = pair.partition(":")
-            v = v.strip()
-            if v.startswith("["):
-                result[k.strip()] = _parse_inline_list(v)
-            elif v.startswith("{"):
-                result[k.strip()] = _parse_inline_dict(v)
-            else:
-                result[k.strip()] = _parse_scalar(v)
-    return result
+        trailing += 1
+
+    text = "\n".join(block) if style == "|" else _fold(block)
+    if chomp == "-" or not block:
+        suffix = "\n" * trailing if chomp == "+" else ""
+    elif chomp == "+":
+        suffix = "\n" * (trailing + 1)
+    else:
+        suffix = "\n"
+    return _BlockScalar(text + suffix), i
+
+
+def _fold(block):
+    """Apply folded-style (>) line folding to block lines."""
+    out = []
+    breaks = 0
+    prev_normal = None  # None until the first content line
+    for line in block:
+        if not line:
+            breaks += 1
+            continue
+        normal = line[0] not in " \t"
+        if prev_normal is None:
+            out.append("\n" * breaks)
+        elif breaks:
+            out.append("\n" * (breaks if prev_normal and normal else breaks + 1))
+        else:
+            out.append(" " if prev_normal and normal else "\n")
+        out.append(line)
+        prev_normal = normal
+        breaks = 0
+    return "".join(out)
+
+
+class _Builder:
+    """Recursive-descent tree builder over _tokenize() output."""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def parse_block(self, indent):
+        if self.tokens[self.pos][1] == _ITEM:
+            return self.parse_sequence(indent)
+        return self.parse_mapping(indent)
+
+    def parse_mapping(self, indent):
+        result = {}
+        tokens = self.tokens
+        while self.pos < len(tokens):
+            token = tokens[self.pos]
+            if token[0] != indent or token[1] != _KEY:
+                break
+            self.pos += 1
+            result[token[2]] = self._value(token, indent, is_key=True)
+        return result
+
+    def parse_sequence(self, indent):
+        result = []
+        tokens = self.tokens
+        while self.pos < len(tokens):
+            token = tokens[self.pos]
+            if token[0] != indent or token[1] != _ITEM:
+                break
+            self.pos += 1
+            result.append(self._value(token, indent, is_key=False))
+        return result
+
+    def _value(self, token, indent, is_key):
+        raw = token[3]
+        nxt = self.tokens[self.pos] if self.pos < len(self.tokens) else None
+        if raw is not None:
+            if nxt is not None and nxt[0] > indent:
+                raise ValueError(f"line {nxt[4]}: unexpected indentation")
+            if isinstance(raw, _BlockScalar):
+                return str(raw)
+            if raw[0] in "[{":
+                return _parse_flow(raw)
+            return _parse_scalar(raw)
+        if nxt is not None:
+            if nxt[0] > indent:
+                return self.parse_block(nxt[0])
+            if is_key and nxt[0] == indent and nxt[1] == _ITEM:
+                # "key:" followed by a same-indent "- item" list
+                return self.parse_sequence(indent)
+        return None
 
 
-def _parse_inline_list(s):
-    """Parse `[a, b, c]` into a list."""
-    s = s.strip()
-    if s.startswith("["):
-        s = s[1:]
-    if s.endswith("]"):
-        s = s[:-1]
-    return [_parse_scalar(item.strip()) for item in _split_top_level(s) if item.strip()]
+def _parse_flow(text):
+    """Parse an inline `[a, b]` / `{k: v}` collection."""
+    value, _ = _flow_node(text, 0)
+    return value
+
+
+def _flow_node(text, pos):
+    """Parse one flow node at `pos`; return (value, end_pos)."""
+    n = len(text)
+    pos = _WS_RE.match(text, pos).end()
+    first = text[pos:pos + 1]
+
+    if first == "[":
+        items = []
+        pos += 1
+        while True:
+            pos = _WS_RE.match(text, pos).end()
+            if pos >= n or text[pos] == "]":
+                return items, pos + 1
+            item, pos = _flow_node(text, pos)
+            items.append(item)
+            pos = _flow_separator(text, pos, "]")
+
+    if first == "{":
+        result = {}
+        pos += 1
+        while True:
+            pos = _WS_RE.match(text, pos).end()
+            if pos >= n or text[pos] == "}":
+                return result, pos + 1
+            key, pos = _flow_node(text, pos)
+            pos = _WS_RE.match(text, pos).end()
+            value = None
+            if pos < n and text[pos] == ":":
+                value, pos = _flow_node(text, pos + 1)
+            result[key] = value
+            pos = _flow_separator(text, pos, "}")
+
+    if first in ("\"", "'"):
+        m = (_DQ_RE if first == '"' else _SQ_RE).match(text, pos)
+        if m:
+            return _parse_scalar(m.group()), m.end()
+
+    m = _FLOW_PLAIN_RE.match(text, pos)
+    return _resolve_plain(m.group().strip()), m.end()
+
+
+def _flow_separator(text, pos, closer):
+    """Skip whitespace and one ',' after a flow entry."""
+    pos = _WS_RE.match(text, pos).end()
+    if pos < len(text):
+        if text[pos] == ",":
+            return pos + 1
+        if text[pos] != closer:
+            raise ValueError(f"unexpected {text[pos]!r} in flow collection: {text}")
+    return pos
 
 
 def _unescape_double_quoted(s):
     """Process YAML double-quoted string escape sequences."""
-    # Common YAML escapes: \\ -> \, \n -> newline, \t -> tab, \" -> "
-    result = []
-    i = 0
-    while i < len(s):
-        if s[i] == "\\" and i + 1 < len(s):
-            nxt = s[i + 1]
-            if nxt == "\\":
-                result.append("\\")
-            elif nxt == "n":
-                result.append("\n")
-            elif nxt == "t":
-                result.append("\t")
-            elif nxt == '"':
-                result.append('"')
-            elif nxt == "/":
-                result.append("/")
-            else:
-                # Unknown escape — keep as-is (e.g. \b for regex)
-                result.append(s[i])
-                result.append(nxt)
-            i += 2
-        else:
-            result.append(s[i])
-            i += 1
-    return "".join(result)
+    if "\\" not in s:
+        return s
+    return _ESCAPE_RE.sub(_replace_escape, s)
+
+
+def _replace_escape(m):
+    code = m.group(1)
+    if len(code) > 1:
+        return chr(int(code[1:], 16))
+    # Unknown escape — keep as-is
+    return _ESCAPES.get(code, m.group())
 
 
 def _parse_scalar(s):
-    """Parse a scalar value: int, float, bool, null, or string."""
+    """Parse a scalar value: quoted string, or plain int/float/bool/null/str."""
     s = s.strip()
-
-    # Quoted string
-    if s.startswith('"') and s.endswith('"'):
-        # Double-quoted: process YAML escape sequences
-        return _unescape_double_quoted(s[1:-1])
-    if s.startswith("'") and s.endswith("'"):
-        # Single-quoted: no escapes (YAML spec)
-        return s[1:-1]
-
-    # Boolean
-    lower = s.lower()
-    if lower in ("true", "yes", "on"):
-        return True
-    if lower in ("false", "no", "off"):
-        return False
-
-    # Null
-    if lower in ("null", "~", ""):
+    if len(s) >= 2:
+        if s[0] == '"' and s[-1] == '"':
+            return _unescape_double_quoted(s[1:-1])
+        if s[0] == "'" and s[-1] == "'":
+            # Single-quoted: only '' is an escape (YAML spec)
+            return s[1:-1].replace("''", "'")
+    return _resolve_plain(s)
+
+
+def _resolve_plain(s):
+    """Resolve a plain scalar with YAML 1.1 implicit typing."""
+    if s in _NULLS:
         return None
+    if s in _BOOLS:
+        return _BOOLS[s]
+    first = s[0]
+    if first in "-+0123456789.":
+        if _INT_RE.match(s):
+            return _to_int(s)
+        if _FLOAT_RE.match(s):
+            return _to_float(s)
+    return s
 
-    # Integer
-    try:
-        return int(s)
-    except ValueError:
-        pass
-
-    # Float
-    try:
-        return float(s)
-    except ValueError:
-        pass
 
-    # Plain string (strip surrounding quotes if any stray ones)
-    return s
+def _to_int(s):
+    value = s.replace("_", "")
+    sign = -1 if value[0] == "-" else 1
+    if value[0] in "+-":
+        value = value[1:]
+    if value == "0":
+        return 0
+    if value.startswith("0b"):
+        return sign * int(value[2:], 2)
+    if value.startswith("0x"):
+        return sign * int(value[2:], 16)
+    if value[0] == "0":
+        return sign * int(value, 8)
+    if ":" in value:
+        return sign * _sexagesimal(value, int)
+    return sign * int(value)
+
+
+def _to_float(s):
+    value = s.replace("_", "").lower()
+    sign = -1 if value[0] == "-" else 1
+    if value[0] in "+-":
+        value = value[1:]
+    if value == ".inf":
+        return sign * float("inf")
+    if value == ".nan":
+        return float("nan")
+    if ":" in value:
+        return sign * _sexagesimal(value, float)
+    return sign * float(value)
+
+
+def _sexagesimal(value, cast):
+    total = cast(0)
+    for part in value.split(":"):
+        total = total * 60 + cast(part)
+    return total
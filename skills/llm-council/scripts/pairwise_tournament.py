@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Pairwise tournament: rank responses from short A-vs-B verdicts.
+
+Alternative to rubric scoring in Stage 2. Call it once per round with every
+verdict so far; it fits a Bradley-Terry model, returns the current ranking
+(same shape as score_results.py) and schedules the next, most informative
+pairs, Swiss-style: close in strength, still uncertain, rarely compared,
+each response at most once per round. About N*log2(N) comparisons in
+total, versus N*(N-1) full rubric evaluations.
+
+Input (stdin JSON):
+  {
+    "responses": ["A", "B", "C", "D", "E"],
+    "comparisons": [{"first": "A", "second": "B", "winner": "A", "judge": "codex"}],
+                                          # winner: a label or "tie"
+    "judges": ["claude", "codex", "gemini"],   # optional: assign a judge per pair
+    "authors": {"A": "claude", ...},           # optional: nobody judges their own
+    "batch": 2,                                # optional: pairs to schedule
+    "max_comparisons": 12,                     # optional
+    "seed": 0                                  # optional
+  }
+
+Output (stdout JSON):
+  {"ranking": [{label, z_score, raw_score}],
+   "records": [{label, wins, losses, ties, stderr}],
+   "comparisons": 4, "max_comparisons": 12, "done": false,
+   "next": [{"first": "C", "second": "E", "judge": "claude"}]}
+
+Prompt for each pair: prompts/compare.md
+Config: protocols/standard.yaml -> cross_evaluation.pairwise
+"""
+
+import math
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from lib import bradley_terry
+from lib.io_helpers import CouncilError, run, load_config
+
+
+def parse_comparisons(comparisons, index):
+    """Validate verdicts into [(i, j, score_i)] plus the judge of each."""
+    parsed, judges = [], []
+    for c in comparisons:
+        if not isinstance(c, dict):
+            raise CouncilError("Each comparison must be an object")
+        first, second, winner = c.get("first"), c.get("second"), c.get("winner")
+        if not isinstance(first, str) or not isinstance(second, str) or \
+                first not in index or second not in index or first == second:
+            raise CouncilError(f"Comparison {first!r} vs {second!r}: unknown or identical labels")
+        if winner not in (first, second, "tie"):
+            raise CouncilError(f"Comparison {first} vs {second}: winner must be "
+                               f"'{first}', '{second}' or 'tie'")
+        judge = c.get("judge")
+        if judge is not None and not isinstance(judge, str):
+            raise CouncilError(f"Comparison {first} vs {second}: 'judge' must be a name")
+        score = 0.5 if winner == "tie" else float(winner == first)
+        parsed.append((index[first], index[second], score))
+        judges.append(judge)
+    return parsed, judges
+
+
+def parse_judges(judges, authors, labels):
+    """Validate the optional judge names and {label: author} map."""
+    if judges is not None and (not isinstance(judges, list)
+                               or not all(isinstance(j, str) for j in judges)):
+        raise CouncilError("'judges' must be an array of names")
+    if judges and len(set(judges)) != len(judges):
+        raise CouncilError("'judges' must be unique")
+    if authors is None:
+        return judges, {}
+    if not isinstance(authors, dict) or not all(isinstance(a, str) for a in authors.values()):
+        raise CouncilError("'authors' must map response labels to names")
+    unknown = [label for label in authors if label not in labels]
+    if unknown:
+        raise CouncilError(f"'authors' keys are not responses: {unknown}")
+    return judges, authors
+
+
+def records(labels, comparisons):
+    rows = [{"label": label, "wins": 0, "losses": 0, "ties": 0} for label in labels]
+    for i, j, score in comparisons:
+        if score == 0.5:
+            rows[i]["ties"] += 1
+            rows[j]["ties"] += 1
+        else:
+            winner, loser = (i, j) if score == 1.0 else (j, i)
+            rows[winner]["wins"] += 1
+            rows[loser]["losses"] += 1
+    return rows
+
+
+def ranking_from(labels, fitted):
+    """score_results-shaped ranking: standardized strength as z_score."""
+    strength = fitted["strength"]
+    stdev = math.sqrt(sum(s * s for s in strength) / len(strength))
+    ranking = [{"label": label,
+                "z_score": round(strength[i] / stdev, 4) if stdev > 0 else 0.0,
+                "raw_score": round(strength[i], 3)}
+               for i, label in enumerate(labels)]
+    ranking.sort(key=lambda r: r["z_score"], reverse=True)
+    return ranking
+
+
+def schedule(labels, comparisons, fitted, batch, rng, judges=None, authors=None,
+             judge_load=None):
+    """Pick up to `batch` pairs by expected information, each label once if possible.
+
+    A pair's value is p(1-p) (outcome uncertainty) times the summed variance
+    of both strengths, discounted by how often the pair already met.
+    """
+    met = {}
+    for i, j, _ in comparisons:
+        key = (min(i, j), max(i, j))
+        met[key] = met.get(key, 0) + 1
+    strength, stderr = fitted["strength"], fitted["stderr"]
+
+    candidates = []
+    for i in range(len(labels)):
+        for j in range(i + 1, len(labels)):
+            p = bradley_terry.win_probability(strength[i], strength[j])
+            value = p * (1 - p) * (stderr[i] ** 2 + stderr[j] ** 2) / (1 + met.get((i, j), 0))
+            candidates.append((-round(value, 12), rng.random(), i, j))
+    candidates.sort()
+
+    load = dict(judge_load or {})
+    judge_order = rng.sample(judges, len(judges)) if judges else []
+    picked, used, chosen = [], set(), set()
+    for disjoint in (True, False):
+        for _, _, i, j in candidates:
+            if len(picked) >= batch:
+                break
+            if (i, j) in chosen:
+                continue
+            if disjoint and (i in used or j in used):
+                continue
+            judge = None
+            if judges:
+                banned = {(authors or {}).get(labels[i]), (authors or {}).get(labels[j])}
+                eligible = [name for name in judge_order if name not in banned]
+                if not eligible:
+                    continue
+                judge = min(eligible, key=lambda name: load.get(name, 0))
+                load[judge] = load.get(judge, 0) + 1
+            used.update((i, j))
+            chosen.add((i, j))
+            picked.append({"i": i, "j": j, "judge": judge})
+
+    pairs = []
+    for p in picked:
+        first, second = (p["i"], p["j"]) if rng.random() < 0.5 else (p["j"], p["i"])
+        pair = {"first": labels[first], "second": labels[second]}
+        if p["judge"] is not None:
+            pair["judge"] = p["judge"]
+        pairs.append(pair)
+    return pairs
+
+
+def handle(data):
+    labels = data.get("responses")
+    if (not labels or not isinstance(labels, list) or len(labels) < 2
+            or not all(isinstance(label, str) for label in labels)):
+        raise CouncilError("Input must contain 'responses' array of at least 2 labels")
+    if len(set(labels)) != len(labels):
+        raise CouncilError("'responses' labels must be unique")
+    index = {label: i for i, label in enumerate(labels)}
+    comparisons, judged_by = parse_comparisons(data.get("comparisons") or [], index)
+    judges, authors = parse_judges(data.get("judges"), data.get("authors"), index)
+
+    config = load_config("cross_evaluation.pairwise")
+    n = len(labels)
+    max_comparisons = data.get("max_comparisons", config.get("max_comparisons", "auto"))
+    if max_comparisons == "auto":
+        max_comparisons = max(n - 1, math.ceil(n * math.log2(n)))
+    if not isinstance(max_comparisons, int) or max_comparisons < 1:
+        raise CouncilError("'max_comparisons' must be a positive integer or 'auto'")
+    batch = data.get("batch", config.get("batch") or n // 2)
+    if not isinstance(batch, int) or batch < 1:
+        raise CouncilError("'batch' must be a positive integer")
+
+    fitted = bradley_terry.fit(n, comparisons, prior=config.get("prior", 1.0),
+                               max_iterations=config.get("max_iterations", 500),
+                               tolerance=config.get("tolerance", 1e-8))
+    rows = records(labels, comparisons)
+    for row, se in zip(rows, fitted["stderr"]):
+        row["stderr"] = round(se, 3)
+
+    remaining = max_comparisons - len(comparisons)
+    next_pairs = []
+    if remaining > 0:
+        seed = data.get("seed", config.get("seed", 0))
+        rng = random.Random(f"{seed}:{len(comparisons)}")
+        judge_load = {}
+        for judge in judged_by:
+            if judge is not None:
+                judge_load[judge] = judge_load.get(judge, 0) + 1
+        next_pairs = schedule(labels, comparisons, fitted, min(batch, remaining), rng,
+                              judges, authors, judge_load)
+        if not next_pairs:
+            raise CouncilError("No eligible judge for any pair: every judge is an author "
+                               "of one of its responses")
+
+    return {
+        "ranking": ranking_from(labels, fitted),
+        "records": rows,
+        "comparisons": len(comparisons),
+        "max_comparisons": max_comparisons,
+        "done": not next_pairs,
+        "next": next_pairs,
+    }
+
+
+def main():
+    run(handle)
+
+
+if __name__ == "__main__":
+    main()
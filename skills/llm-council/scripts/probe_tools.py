@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Probe-verify detected LLM tools concurrently under one global deadline.
+
+Every candidate gets security.probe_verification.probe_prompt at once (up to
+max_concurrency in flight), each within the per-probe timeout and all within
+the deadline. A reply passes when it equals expected_response after
+normalization (case, whitespace, punctuation and markdown ignored), so
+"**Pong.**" passes but a tool that echoes the prompt back does not. Passed
+probes are cached per tool and endpoint for cache_ttl seconds, so warm
+sessions skip probing.
+
+Input (stdin JSON):
+  {
+    "candidates": ["mcp__codex__codex",
+                   {"name": "mcp__gemini__ask", "endpoint": "http://127.0.0.1:8701/mcp"}],
+    "endpoint": "http://127.0.0.1:8700/mcp",  # optional: default MCP HTTP endpoint
+    "deadline": 15,                           # optional: seconds for all probes
+    "cache": true                             # optional: false = ignore cached passes
+  }
+
+Output (stdout JSON):
+  {
+    "verified": ["mcp__codex__codex"],
+    "excluded": [{"name": "...", "reason": "timeout after 10s"}],
+    "unprobed": ["..."],   # no endpoint and no cached pass: host must probe these
+    "probes": [{"name", "passed", "cached", "latency_ms", "response" | "error"}],
+    "elapsed_ms": 812.4
+  }
+
+Tools are called over MCP streamable HTTP (lib/transport.py).
+
+Config: protocols/standard.yaml -> security.probe_verification, tool_detection_cache
+"""
+
+import asyncio
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from lib import detection_cache
+from lib.io_helpers import CouncilError, run, load_config
+from lib.transport import HttpTransport, TransportError
+
+_NOT_WORD = re.compile(r"[\W_]+")
+
+
+def normalize_reply(text):
+    """Casefolded letters and digits only."""
+    return _NOT_WORD.sub("", text).casefold()
+
+
+def parse_candidates(candidates, default_endpoint):
+    """[(name, endpoint or None)] from names or {name, endpoint} objects."""
+    if not candidates or not isinstance(candidates, list):
+        raise CouncilError("Input must contain 'candidates' array")
+    parsed, seen = [], set()
+    for c in candidates:
+        if isinstance(c, str):
+            c = {"name": c}
+        if not isinstance(c, dict) or not isinstance(c.get("name"), str):
+            raise CouncilError("Each candidate must be a tool name or {name, endpoint}")
+        if c["name"] in seen:
+            raise CouncilError(f"Duplicate candidate: {c['name']}")
+        seen.add(c["name"])
+        parsed.append((c["name"], c.get("endpoint") or default_endpoint))
+    return parsed
+
+
+async def probe_all(transport, names, prompt, expected, timeout, deadline, max_concurrency):
+    """{name: probe result} for every name, finishing within `deadline` seconds."""
+    loop = asyncio.get_running_loop()
+    stop_at = loop.time() + deadline
+    gate = asyncio.Semaphore(max_concurrency)
+    expected_norm = normalize_reply(expected)
+
+    async def probe(name):
+        async with gate:
+            start = loop.time()
+            limit = min(timeout, stop_at - start)
+            result = {"name": name, "passed": False, "cached": False}
+            try:
+                reply = await transport.call(name, prompt, limit)
+            except asyncio.TimeoutError:
+                result["error"] = (f"timeout after {timeout}s" if limit == timeout
+                                   else "probe deadline reached")
+            except TransportError as e:
+                result["error"] = str(e)
+            except Exception as e:  # one misbehaving server fails only its own probe
+                result["error"] = f"{type(e).__name__}: {e}"
+            else:
+                result["passed"] = normalize_reply(reply) == expected_norm
+                result["response"] = reply[:200]
+            result["latency_ms"] = round((loop.time() - start) * 1000, 1)
+            return result
+
+    tasks = {name: asyncio.ensure_future(probe(name)) for name in names}
+    done, pending = await asyncio.wait(tasks.values(), timeout=max(0.0, deadline))
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+
+    results = {}
+    for name, task in tasks.items():
+        if task in done:
+            results[name] = task.result()
+        else:  # still queued behind max_concurrency at the deadline
+            results[name] = {"name": name, "passed": False, "cached": False,
+                             "error": "probe deadline reached", "latency_ms": None}
+    return results
+
+
+def handle(data):
+    config = load_config("security.probe_verification")
+    default_endpoint = data.get("endpoint", config.get("endpoint"))
+    candidates = parse_candidates(data.get("candidates"), default_endpoint)
+    deadline = data.get("deadline", config.get("deadline", 15))
+    if not isinstance(deadline, (int, float)) or deadline <= 0:
+        raise CouncilError("'deadline' must be a positive number of seconds")
+    use_cache = data.get("cache", True)
+    if not isinstance(use_cache, bool):
+        raise CouncilError("'cache' must be true or false")
+
+    prompt = config.get("probe_prompt", "Respond with exactly: PONG")
+    expected = config.get("expected_response", "PONG")
+    start = time.perf_counter()
+    if not config.get("enabled", True):
+        names = [name for name, _ in candidates]
+        return {"verified": names, "excluded": [], "unprobed": [], "probes": [],
+                "elapsed_ms": 0.0}
+
+    keys = {name: detection_cache.probe_key(name, endpoint, prompt, expected)
+            for name, endpoint in candidates}
+    store = detection_cache.open_cache()
+    cached = {}
+    if store is not None and use_cache:
+        try:
+            cached = store.passed_probes(keys.values(), config.get("cache_ttl", 3600))
+        except sqlite3.Error:
+            cached = {}
+
+    probes, to_probe, unprobed = {}, [], []
+    for name, endpoint in candidates:
+        if keys[name] in cached:
+            probes[name] = {"name": name, "passed": True, "cached": True,
+                            "latency_ms": cached[keys[name]]}
+        elif endpoint:
+            to_probe.append(name)
+        else:
+            unprobed.append(name)
+
+    if to_probe:
+        transport = HttpTransport(
+            {name: endpoint for name, endpoint in candidates if endpoint},
+            argument=config.get("prompt_argument", "prompt"))
+        probes.update(asyncio.run(probe_all(
+            transport, to_probe, prompt, expected, config.get("timeout", 10), deadline,
+            config.get("max_concurrency", 8))))
+
+    if store is not None:
+        with store:
+            try:
+                store.record_probes(
+                    {keys[n]: probes[n]["latency_ms"] for n in to_probe if probes[n]["passed"]},
+                    [keys[n] for n in to_probe if not probes[n]["passed"]])
+            except sqlite3.Error:
+                pass
+
+    exclude = config.get("on_failure", "exclude") == "exclude"
+    verified, excluded = [], []
+    for name, _ in candidates:
+        probe = probes.get(name)
+        if probe is None:
+            continue
+        if probe["passed"] or not exclude:
+            verified.append(name)
+        else:
+            excluded.append({"name": name,
+                             "reason": probe.get("error") or "unexpected response"})
+    return {
+        "verified": verified,
+        "excluded": excluded,
+        "unprobed": unprobed,
+        "probes": [probes[name] for name, _ in candidates if name in probes],
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+def main():
+    run(handle)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Record LLM tool call latencies and outcomes, and stage durations, in the
+local history.
+
+Call after each stage with every external call it made, including failures
+and timeouts, and with the stage's own duration; select_participants.py
+reads the calls, check_budget.py the stage timings. run_stage.py and
+collect_responses.py record both themselves.
+
+Input (stdin JSON, "calls" and/or "stages"):
+  {"calls": [{"tool": "mcp__codex__codex", "latency": 41.2, "outcome": "ok",
+              "stage": "collect"},                        # stage optional
+             {"tool": "mcp__gemini__ask", "latency": 120, "outcome": "timeout"}],
+   "stages": [{"mode": "standard", "stage": "collect", "participants": 3,
+               "seconds": 48.5}]}                         # one debate round per row
+
+  latency: seconds; for a timeout, the time the call was given up after
+  outcome: ok | timeout | error
+  participants: external participants in the stage
+
+Output (stdout JSON):
+  {"recorded": 2, "tools": {"mcp__codex__codex": {calls, p50, p90, p95,
+                                                  timeout_rate, failure_rate}},
+   "recorded_stages": 1}
+
+Config: protocols/standard.yaml -> history
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from lib.history import OUTCOMES, HistoryStore, summarize
+from lib.io_helpers import CouncilError, run
+
+
+def parse_calls(calls):
+    """Validate the calls array."""
+    if not isinstance(calls, list):
+        raise CouncilError("'calls' must be an array")
+    for i, call in enumerate(calls):
+        if not isinstance(call, dict) or not isinstance(call.get("tool"), str):
+            raise CouncilError(f"calls[{i}]: missing 'tool'")
+        latency = call.get("latency")
+        if not isinstance(latency, (int, float)) or isinstance(latency, bool) or latency < 0:
+            raise CouncilError(f"calls[{i}]: 'latency' must be a non-negative number of seconds")
+        if call.get("outcome") not in OUTCOMES:
+            raise CouncilError(f"calls[{i}]: 'outcome' must be one of {', '.join(OUTCOMES)}")
+    return calls
+
+
+def parse_stages(stages):
+    """Validate the stages array."""
+    if not isinstance(stages, list):
+        raise CouncilError("'stages' must be an array")
+    for i, stage in enumerate(stages):
+        if not isinstance(stage, dict) or not all(
+                isinstance(stage.get(k), str) and stage[k] for k in ("mode", "stage")):
+            raise CouncilError(f"stages[{i}]: missing 'mode' or 'stage'")
+        participants = stage.get("participants")
+        if not isinstance(participants, int) or isinstance(participants, bool) or \
+                participants < 0:
+            raise CouncilError(f"stages[{i}]: 'participants' must be a non-negative integer")
+        seconds = stage.get("seconds")
+        if not isinstance(seconds, (int, float)) or isinstance(seconds, bool) or seconds < 0:
+            raise CouncilError(f"stages[{i}]: 'seconds' must be a non-negative number")
+    return stages
+
+
+def handle(data):
+    if not data.get("calls") and not data.get("stages"):
+        raise CouncilError("Input must contain 'calls' and/or 'stages' array")
+    calls = parse_calls(data.get("calls") or [])
+    stages = parse_stages(data.get("stages") or [])
+    samples = {}
+    with HistoryStore() as store:
+        if calls:
+            store.record_calls(calls)
+            samples = store.samples({c["tool"] for c in calls})
+        if stages:
+            store.record_stages(stages)
+    return {
+        "recorded": len(calls),
+        "tools": {tool: summarize(rows) for tool, rows in sorted(samples.items())},
+        "recorded_stages": len(stages),
+    }
+
+
+def main():
+    run(handle)
+
+
+if __name__ == "__main__":
+    main()
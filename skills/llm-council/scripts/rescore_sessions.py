@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Re-score archived council sessions in bulk, e.g. after tuning weights or
+bias_mitigation.detection.variance_threshold.
+
+Usage:
+    python3 scripts/rescore_sessions.py SOURCE [SOURCE ...] [--workers N]
+        [--weights JSON|FILE] [--variance-threshold X] [--normalization MODE]
+        [--output FILE] [--diff FILE]
+
+SOURCE is a JSONL file (one session per line), a .json file (one session),
+a directory (every *.jsonl / *.json inside, sorted) or "-" for stdin. A
+session is a score_results.py input plus optional "id" and the stored
+result to compare against ("result": {"ranking": [...]}, or a top-level
+"ranking").
+
+Output:
+  --output (default stdout): JSONL {"id", "ranking", "bias_flags"} per
+    session, in input order; bad sessions give {"id", "error"}.
+  --diff: JSONL per session whose ranking changed vs the stored one:
+    {"id", "top_changed", "old_top", "new_top", "kendall_tau",
+     "moves": [{label, old_rank, new_rank}]}
+  stderr: summary JSON {sessions, errors, compared, changed, top_changed,
+    mean_kendall_tau, seconds, sessions_per_sec}
+
+Sessions are handed to workers as raw lines and parsed, scored and
+serialized there, so the parent only moves strings.
+"""
+
+import argparse
+import json
+import sys
+import time
+from contextlib import ExitStack
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from lib.io_helpers import CouncilError, parse_input, write_jsonl
+from lib.parallel import pool_imap
+from lib.rank_consistency import kendall_tau
+from score_results import NORMALIZATIONS, score_record
+
+_overrides = {}
+
+
+def _init_worker(overrides):
+    _overrides.clear()
+    _overrides.update(overrides)
+
+
+def iter_sources(sources):
+    """Yield (source_name, line_no, text) per session, in order."""
+    for source in sources:
+        if source == "-":
+            for line_no, line in enumerate(sys.stdin, 1):
+                if line.strip():
+                    yield "<stdin>", line_no, line
+            continue
+        path = Path(source)
+        if path.is_dir():
+            files = sorted(p for p in path.iterdir() if p.suffix in (".json", ".jsonl"))
+        else:
+            files = [path]
+        for file in files:
+            with open(file, encoding="utf-8") as f:
+                if file.suffix == ".json":
+                    yield str(file), 1, f.read()
+                    continue
+                for line_no, line in enumerate(f, 1):
+                    if line.strip():
+                        yield str(file), line_no, line
+
+
+def ranking_diff(old_ranking, new_ranking):
+    """Compare two rankings; None when the order is unchanged."""
+    old_order = [r["label"] for r in old_ranking]
+    new_order = [r["label"] for r in new_ranking]
+    if old_order == new_order:
+        return None
+    old_rank = {label: i + 1 for i, label in enumerate(old_order)}
+    new_rank = {label: i + 1 for i, label in enumerate(new_order)}
+    shared = [label for label in new_order if label in old_rank]
+    tau = kendall_tau([old_rank[label] for label in shared],
+                      [new_rank[label] for label in shared])
+    return {
+        "top_changed": old_order[:1] != new_order[:1],
+        "old_top": old_order[0] if old_order else None,
+        "new_top": new_order[0] if new_order else None,
+        "kendall_tau": round(tau, 4) if tau is not None else None,
+        "moves": [{"label": label, "old_rank": old_rank.get(label), "new_rank": new_rank[label]}
+                  for label in new_order if old_rank.get(label) != new_rank[label]],
+    }
+
+
+def rescore_one(item):
+    """Worker: raw session text -> (status, result line, diff line or None).
+
+    status is "error", "scored" (no stored ranking) or "compared".
+    """
+    source, line_no, text = item
+    session_id = f"{source}:{line_no}"
+    try:
+        data = parse_input(text)
+    except CouncilError as e:
+        result, error = None, str(e)
+    else:
+        session_id = data.get("id", session_id)
+        stored = data.get("result")
+        stored = (stored if isinstance(stored, dict) else data).get("ranking")
+        if isinstance(stored, list) and not all(
+                isinstance(r, dict) and isinstance(r.get("label"), str) for r in stored):
+            result, error = None, "stored 'ranking' must be [{label, ...}]"
+        else:
+            result, error = score_record(data, _overrides)
+    if error is not None:
+        return "error", json.dumps({"id": session_id, "error": error}, ensure_ascii=False), None
+
+    line = json.dumps({"id": session_id, "ranking": result["ranking"],
+                       "bias_flags": result["bias_flags"]}, ensure_ascii=False)
+    if not isinstance(stored, list):
+        return "scored", line, None
+    diff = ranking_diff(stored, result["ranking"])
+    if diff is not None:
+        diff = json.dumps({"id": session_id, **diff}, ensure_ascii=False)
+    return "compared", line, diff
+
+
+def rescore(sources, overrides, workers=1, out=None, diff_out=None):
+    """Re-score every session; returns the summary dict."""
+    out = out or sys.stdout
+    stats = {"sessions": 0, "errors": 0, "compared": 0, "changed": 0, "top_changed": 0}
+    taus = []
+    start = time.perf_counter()
+    for status, line, diff in pool_imap(rescore_one, iter_sources(sources), workers,
+                                        _init_worker, (overrides,), chunksize=64):
+        out.write(line + "\n")
+        stats["sessions"] += 1
+        stats["errors"] += status == "error"
+        stats["compared"] += status == "compared"
+        if diff is not None:
+            if diff_out:
+                diff_out.write(diff + "\n")
+            report = json.loads(diff)
+            stats["changed"] += 1
+            stats["top_changed"] += report["top_changed"]
+            if report["kendall_tau"] is not None:
+                taus.append(report["kendall_tau"])
+        elif status == "compared":
+            taus.append(1.0)
+    out.flush()
+
+    seconds = time.perf_counter() - start
+    stats["mean_kendall_tau"] = round(sum(taus) / len(taus), 4) if taus else None
+    stats["seconds"] = round(seconds, 3)
+    stats["sessions_per_sec"] = round(stats["sessions"] / seconds, 1) if seconds else None
+    return stats
+
+
+def _load_weights(value):
+    """--weights: inline JSON object or a path to a JSON file."""
+    text = value
+    if not value.lstrip().startswith("{"):
+        with open(value, encoding="utf-8") as f:
+            text = f.read()
+    weights = json.loads(text)
+    if not isinstance(weights, dict):
+        raise ValueError("weights must be a JSON object")
+    return weights
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score archived council sessions")
+    parser.add_argument("sources", nargs="+", metavar="SOURCE",
+                        help="JSONL/JSON file, directory of them, or - for stdin")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="process pool size (0 = CPU count, 1 = in-process)")
+    parser.add_argument("--weights", help="override weights: JSON object or JSON file")
+    parser.add_argument("--variance-threshold", type=float,
+                        help="override bias_mitigation.detection.variance_threshold")
+    parser.add_argument("--normalization", choices=NORMALIZATIONS)
+    parser.add_argument("--output", help="results JSONL (default stdout)")
+    parser.add_argument("--diff", help="write ranking changes vs stored results here")
+    args = parser.parse_args()
+
+    overrides = {}
+    try:
+        if args.weights:
+            overrides["weights"] = _load_weights(args.weights)
+    except (OSError, ValueError) as e:
+        write_jsonl({"error": f"--weights: {e}"})
+        sys.exit(1)
+    if args.variance_threshold is not None:
+        overrides["variance_threshold"] = args.variance_threshold
+    if args.normalization:
+        overrides["normalization"] = args.normalization
+
+    try:
+        with ExitStack() as stack:
+            out = (stack.enter_context(open(args.output, "w", encoding="utf-8"))
+                   if args.output else sys.stdout)
+            diff_out = (stack.enter_context(open(args.diff, "w", encoding="utf-8"))
+                        if args.diff else None)
+            stats = rescore(args.sources, overrides, args.workers, out, diff_out)
+    except OSError as e:
+        write_jsonl({"error": str(e)})
+        sys.exit(1)
+    write_jsonl(stats, sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Run one fan-out stage's LLM calls (collect, evaluate, debate) concurrently.
+
+Calls go out through lib/executor.py with at most
+resource_budget.executor.max_concurrency in flight. Each is bounded by
+resource_budget.time.per_call (or its own "timeout") and the whole stage by
+the stage budget: min(per_call, stage_budget_ratio x the mode's remaining
+time), as in select_participants.py. While calls run, check_budget.py is
+polled every poll_interval seconds with the stage's elapsed time added,
+predicting from the stages after this one (see budget_monitor); when its
+action changes from the one at stage start (e.g. continue -> degrade), or it
+says stop, every call still queued or running is cancelled. Finished
+calls (ok, timeout or error) are added to the call history, and the stage's
+duration to the stage timings check_budget.py predicts from (one debate
+round per run).
+
+Input (stdin JSON):
+  {
+    "stage": "evaluate",                   # collect | evaluate | debate | ...
+    "calls": [{"id": "A->B", "tool": "mcp__codex__codex", "prompt": "...",
+               "timeout": 60}],            # timeout optional (default per_call)
+    "mode": "standard", "elapsed": 75,     # optional: budget accounting
+    "debate_rounds": 1,                    # optional: debate rounds still to run after this stage
+    "endpoint": "http://127.0.0.1:8700/mcp",  # MCP HTTP (or "endpoints": {tool: url})
+    "simulate": {"tools": {"mcp__codex__codex": {"median": 20}},
+                 "seed": 0, "time_scale": 0.01}  # instead of endpoints (not recorded)
+  }
+
+Output (stdout JSON):
+  {
+    "stage": "evaluate",
+    "results": [{"id", "tool", "status": "ok|timeout|error|cancelled", "latency",
+                 "response"|"error"|"reason"}],              # in input order
+    "budget": {"action": "degrade", "degrade_to": "quick", "stage_elapsed": 31.0, ...}|null,
+    "summary": {"ok": 3, "timeout": 0, "error": 0, "cancelled": 1, "deadline": 52.5,
+                "elapsed": 31.0, "total_elapsed": 106.0},
+    "recorded_calls": 3
+  }
+
+Stream mode (--stream): the same stdin JSON; events are written as JSONL as
+they land (call results in completion order, a {"event": "budget", ...} line
+if the budget cancels the stage), then {"event": "summary", ...} with the
+summary and budget fields above.
+
+Config: protocols/standard.yaml -> resource_budget (time, selection, executor), history
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+import check_budget
+from lib.executor import fan_out
+from lib.history import HistoryStore
+from lib.io_helpers import CouncilError, run, load_config, read_input, write_jsonl
+from lib.transport import SimulatedTransport, from_input
+from select_participants import stage_budget
+
+STATUSES = ("ok", "timeout", "error", "cancelled")
+
+
+def parse_calls(calls):
+    """Validate the calls array."""
+    if not calls or not isinstance(calls, list):
+        raise CouncilError("Input must contain 'calls' array")
+    seen = set()
+    for i, call in enumerate(calls):
+        if not isinstance(call, dict) or not isinstance(call.get("tool"), str):
+            raise CouncilError(f"calls[{i}]: missing 'tool'")
+        if not isinstance(call.get("prompt"), str) or not call["prompt"]:
+            raise CouncilError(f"calls[{i}]: missing 'prompt'")
+        timeout = call.get("timeout")
+        if timeout is not None and (not isinstance(timeout, (int, float)) or timeout <= 0):
+            raise CouncilError(f"calls[{i}]: 'timeout' must be a positive number of seconds")
+        key = json.dumps(call.get("id", i), sort_keys=True)  # ids may be any JSON value
+        if key in seen:
+            raise CouncilError(f"calls[{i}]: duplicate id {key}")
+        seen.add(key)
+    return [dict(call, id=call.get("id", i)) for i, call in enumerate(calls)]
+
+
+def budget_monitor(mode, elapsed, stage, participants, debate_rounds=None):
+    """Budget callback for fan_out: check_budget's answer once its action changes.
+
+    The check predicts from the stage after this one (the next debate round
+    while debate_rounds are left), as if this stage ended at the poll: a
+    lower bound on the finish, so a running stage is only cancelled once even
+    that overruns. After the mode's last stage, the ratio check applies.
+    """
+    query = {"current_mode": mode, "participants": participants}
+    stages = load_config("protocol_modes").get(mode, {}).get("stages", [])
+    if stage == "debate" and debate_rounds:
+        query.update(next_stage="debate", debate_rounds=debate_rounds)
+    elif stage in stages and stages.index(stage) + 1 < len(stages):
+        query["next_stage"] = stages[stages.index(stage) + 1]
+        if query["next_stage"] == "debate":
+            query["debate_rounds"] = debate_rounds or 0
+    initial = check_budget.handle(dict(query, elapsed=elapsed))["action"]
+
+    def poll(stage_elapsed):
+        decision = check_budget.handle(dict(query, elapsed=round(elapsed + stage_elapsed, 3)))
+        if decision["action"] == initial and initial != "stop":
+            return {"action": "continue"}
+        return decision
+
+    return poll
+
+
+async def execute(data, on_event=None):
+    """Run the stage; returns the output dict. on_event(event) sees each event."""
+    stage = data.get("stage", "collect")
+    if not isinstance(stage, str) or not stage:
+        raise CouncilError("'stage' must be a stage name")
+    calls = parse_calls(data.get("calls"))
+    transport, time_scale = from_input(data)
+
+    budget_cfg = load_config("resource_budget")
+    settings = budget_cfg.get("executor", {})
+    mode = data.get("mode") or load_config("protocol_modes").get("default", "standard")
+    elapsed = data.get("elapsed", 0)
+    if not isinstance(elapsed, (int, float)) or elapsed < 0:
+        raise CouncilError("'elapsed' must be a non-negative number of seconds")
+    debate_rounds = data.get("debate_rounds")
+    if debate_rounds is not None and (not isinstance(debate_rounds, int) or debate_rounds < 0):
+        raise CouncilError("'debate_rounds' must be a non-negative integer")
+    deadline = stage_budget(mode, elapsed, budget_cfg, budget_cfg.get("selection", {}))
+    per_call = budget_cfg.get("time", {}).get("per_call", 120)
+    monitor = budget_monitor(mode, elapsed, stage, len({c["tool"] for c in calls}),
+                             debate_rounds)
+
+    results, decision = {}, None
+    events = fan_out(transport, calls, per_call, deadline,
+                     settings.get("max_concurrency", 8), monitor,
+                     settings.get("poll_interval", 1.0), time_scale)
+    async for event in events:
+        if event.get("event") == "budget":
+            decision = {k: v for k, v in event.items() if k != "event"}
+        else:
+            results[json.dumps(event["id"], sort_keys=True)] = event
+        if on_event:
+            on_event(event)
+
+    ordered = [results[json.dumps(call["id"], sort_keys=True)] for call in calls]
+    finished = [{"tool": r["tool"], "latency": r["latency"], "outcome": r["status"],
+                 "stage": stage} for r in ordered if r["status"] != "cancelled"]
+    stage_elapsed = decision["stage_elapsed"] if decision else \
+        max([r["latency"] or 0.0 for r in ordered] or [0.0])
+    recorded = 0
+    if finished and not isinstance(transport, SimulatedTransport) and \
+            settings.get("record_history", True):
+        with HistoryStore() as store:
+            store.record_calls(finished)
+            if decision is None:  # a cancelled stage's duration says nothing
+                store.record_stages([{"mode": mode, "stage": stage, "seconds": stage_elapsed,
+                                      "participants": len({c["tool"] for c in calls})}])
+        recorded = len(finished)
+    summary = {status: sum(r["status"] == status for r in ordered) for status in STATUSES}
+    summary.update(deadline=round(deadline, 1), elapsed=round(stage_elapsed, 3),
+                   total_elapsed=round(elapsed + stage_elapsed, 3))
+    return {"stage": stage, "results": ordered, "budget": decision, "summary": summary,
+            "recorded_calls": recorded}
+
+
+def handle(data):
+    return asyncio.run(execute(data))
+
+
+def stream(data, out=None):
+    """--stream: write events as JSONL as they land, then the summary."""
+    result = asyncio.run(execute(data, lambda event: write_jsonl(event, out)))
+    write_jsonl({"event": "summary", "stage": result["stage"], "budget": result["budget"],
+                 "summary": result["summary"], "recorded_calls": result["recorded_calls"]},
+                out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run one fan-out stage's LLM calls")
+    parser.add_argument("--stream", action="store_true",
+                        help="write call results as JSONL as they land")
+    args = parser.parse_args()
+
+    if args.stream:
+        try:
+            stream(read_input())
+        except CouncilError as e:
+            write_jsonl({"error": str(e)})
+            sys.exit(1)
+        return
+    run(handle)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,54 +5,178 @@ Sanitize LLM response content by stripping injection and self-ID patterns.
 Input (stdin JSON):  {"content": "..."}
 Output (stdout JSON): {"sanitized": "...", "stripped_patterns": [...]}
 
+Batch input:  {"contents": {"<label>": "...", ...}}
+Batch output: {"results": {"<label>": {"sanitized": "...", "stripped_patterns": [...]}}}
+  Large batches (security.sanitization.batch.parallel_min_chars) are spread
+  over a process pool.
+
+Batch stream mode (--jsonl [--workers N]), one response per line:
+  Input (stdin JSONL):   {"label": "A", "content": "..."}
+  Output (stdout JSONL): {"label": "A", "sanitized": "...", "stripped_patterns": [...]}
+
+Stream mode (--stream), one JSON object per line in both directions:
+  Input (stdin JSONL):   {"id": "A", "chunk": "..."} ... {"id": "A", "done": true}
+  Output (stdout JSONL): {"id": "A", "sanitized": "<new safe text>",
+                          "stripped_patterns": [...], "done": false}
+  Streams are independent per id; unfinished streams are flushed at EOF.
+
 Config: protocols/standard.yaml -> security.sanitization + security.self_id_stripping
 """
 
-import re
+import argparse
+import json
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
-from lib.io_helpers import read_input, write_output, fail, load_config
+from lib.io_helpers import CouncilError, run, load_config, iter_jsonl, write_jsonl
+from lib.parallel import pool_imap, pool_map
+from lib.sanitizer import StreamSanitizer, get_sanitizer
+
+# Set per process by _init_worker for batch sanitization
+_worker_sanitizer = None
 
 
 def sanitize(content, injection_patterns, self_id_patterns):
-    """Strip injection and self-ID patterns from content."""
-    stripped = []
-    result = content
+    """Strip injection and self-ID patterns from content.
 
-    # Strip injection patterns
-    for pattern in injection_patterns:
-        for m in re.finditer(pattern, result):
-            stripped.append(f"injection: {m.group()}")
-        result = re.sub(pattern, "", result)
+    Patterns are compiled once per process and merged into one scan per
+    pattern set (see lib/sanitizer.py).
+    """
+    return get_sanitizer(injection_patterns, self_id_patterns).sanitize(content)
 
-    # Strip self-identification
-    for pattern in self_id_patterns:
-        for m in re.finditer(pattern, result):
-            stripped.append(f"self_id: {m.group()}")
-        result = re.sub(pattern, "", result)
 
-    # Clean up whitespace
-    result = re.sub(r"  +", " ", result).strip()
+def _init_worker(injection_patterns, self_id_patterns):
+    global _worker_sanitizer
+    _worker_sanitizer = get_sanitizer(injection_patterns, self_id_patterns)
 
-    return {"sanitized": result, "stripped_patterns": stripped}
 
+def _sanitize_one(content):
+    return _worker_sanitizer.sanitize(content)
 
-def main():
-    data = read_input()
-    content = data.get("content")
-    if content is None:
-        fail("Input must contain 'content' string")
 
+def _sanitize_event(event):
+    data, error = event
+    if error is None and not isinstance(data.get("content"), str):
+        error = "Line must contain 'content' string"
+    if error is not None:
+        result = {"error": error}
+    else:
+        result = _sanitize_one(data["content"])
+    if data is not None and "label" in data:
+        result = {"label": data["label"], **result}
+    return result
+
+
+def sanitize_batch(contents, injection_patterns, self_id_patterns,
+                   workers=None, parallel_min_chars=1 << 20):
+    """Sanitize {label: text}; returns {label: result} in input order.
+
+    Runs in-process unless the batch holds at least `parallel_min_chars`
+    characters, since worker startup costs more than small inputs save.
+    """
+    labels = list(contents)
+    texts = [contents[label] for label in labels]
+    if sum(len(text) for text in texts) < parallel_min_chars:
+        workers = 1
+    results = pool_map(_sanitize_one, texts, workers, _init_worker,
+                       (tuple(injection_patterns), tuple(self_id_patterns)))
+    return dict(zip(labels, results))
+
+
+def _patterns():
     san_config = load_config("security.sanitization")
     sid_config = load_config("security.self_id_stripping")
+    return san_config, san_config.get("patterns", []), sid_config.get("patterns", [])
+
+
+def handle(data):
+    contents = data.get("contents")
+    if contents is not None:
+        if not isinstance(contents, dict) or \
+                not all(isinstance(text, str) for text in contents.values()):
+            raise CouncilError("'contents' must be an object of label -> string")
+        san_config, injection_patterns, self_id_patterns = _patterns()
+        batch = san_config.get("batch", {})
+        return {"results": sanitize_batch(
+            contents, injection_patterns, self_id_patterns,
+            workers=batch.get("workers"),
+            parallel_min_chars=batch.get("parallel_min_chars", 1 << 20),
+        )}
 
-    injection_patterns = san_config.get("patterns", [])
-    self_id_patterns = sid_config.get("patterns", [])
+    content = data.get("content")
+    if content is None:
+        raise CouncilError("Input must contain 'content' string or 'contents' object")
+
+    _, injection_patterns, self_id_patterns = _patterns()
+    return sanitize(content, injection_patterns, self_id_patterns)
+
+
+def sanitize_jsonl(lines, workers=1, out=None):
+    """Sanitize one {"label", "content"} object per line, in input order."""
+    _, injection_patterns, self_id_patterns = _patterns()
+    results = pool_imap(_sanitize_event, iter_jsonl(lines), workers, _init_worker,
+                        (tuple(injection_patterns), tuple(self_id_patterns)))
+    for result in results:
+        write_jsonl(result, out)
+
+
+def stream(lines, out=None):
+    """Sanitize interleaved chunk events, writing one JSONL line per event."""
+    san_config, injection_patterns, self_id_patterns = _patterns()
+    max_holdback = san_config.get("streaming", {}).get("max_holdback", 2048)
+
+    streams = {}
+    for data, error in iter_jsonl(lines):
+        if error is None and "id" not in data:
+            error = "Event must contain 'id'"
+        if error is None and not isinstance(data.get("chunk", ""), str):
+            error = "'chunk' must be a string"
+        if error is not None:
+            write_jsonl({"error": error}, out)
+            continue
+
+        stream_id = data["id"]
+        key = json.dumps(stream_id, sort_keys=True)  # ids may be any JSON value
+        if key not in streams:
+            streams[key] = (stream_id, StreamSanitizer(
+                injection_patterns, self_id_patterns, max_holdback))
+        sanitizer = streams[key][1]
+
+        result = sanitizer.feed(data.get("chunk", ""))
+        done = bool(data.get("done"))
+        if done:
+            tail = streams.pop(key)[1].close()
+            result["sanitized"] += tail["sanitized"]
+            result["stripped_patterns"] += tail["stripped_patterns"]
+        write_jsonl({"id": stream_id, **result, "done": done}, out)
+
+    for stream_id, sanitizer in streams.values():
+        write_jsonl({"id": stream_id, **sanitizer.close(), "done": True}, out)
 
-    result = sanitize(content, injection_patterns, self_id_patterns)
-    write_output(result)
+
+def main():
+    parser = argparse.ArgumentParser(description="Sanitize LLM response content")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--stream", action="store_true",
+                      help="read chunk events as JSONL and sanitize incrementally")
+    mode.add_argument("--jsonl", action="store_true",
+                      help="read one {label, content} object per line")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="process pool size for --jsonl (0 = CPU count)")
+    args = parser.parse_args()
+
+    if args.stream or args.jsonl:
+        try:
+            if args.stream:
+                stream(sys.stdin)
+            else:
+                sanitize_jsonl(sys.stdin, args.workers)
+        except CouncilError as e:
+            write_jsonl({"error": str(e)})
+            sys.exit(1)
+        return
+    run(handle)
 
 
 if __name__ == "__main__":
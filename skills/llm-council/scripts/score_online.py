@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Incremental score aggregation with provisional rankings.
+
+Feed evaluator outputs as they arrive instead of waiting for all of them.
+With a "session", state persists between calls (cache_dir()/sessions);
+without one, the given evaluations are aggregated in a single call.
+
+Input (stdin JSON):
+  {
+    "session": "council-123",            # optional: persist state between calls
+    "weights": {"accuracy": 30, ...},    # required when the session starts
+    "evaluation": {"evaluator": "A", "scores": {"B": {...}, ...}},   # or
+    "evaluations": [...],                # several at once (optional)
+    "expected": 5,                       # evaluations expected in total (optional)
+    "reset": false,                      # drop existing session state first
+    "close": false                       # delete the session after this call
+  }
+
+Output (stdout JSON):
+  {"received": 3, "evaluators": [...], "complete": false,
+   "ranking": [{label, z_score, raw_score, evaluations, z_stdev}],
+   "margins": [{above, below, margin, margin_sigma}]}
+
+Once every evaluation is in, ranking matches score_results.py.
+
+Config: protocols/standard.yaml -> cross_evaluation.score_aggregation.online
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from lib import sessions
+from lib.io_helpers import CouncilError, run, load_config
+from lib.online_scores import OnlineAggregator
+
+SESSION_KIND = "scores"
+
+
+def _new_evaluations(data):
+    evaluations = list(data.get("evaluations") or [])
+    if data.get("evaluation") is not None:
+        evaluations.append(data["evaluation"])
+    for ev in evaluations:
+        if not isinstance(ev, dict) or not isinstance(ev.get("scores", {}), dict):
+            raise CouncilError("Each evaluation must be an object with a 'scores' object")
+    return evaluations
+
+
+def update(aggregator, evaluations):
+    """Add evaluations, rejecting evaluators already counted (e.g. retries)."""
+    seen = set(aggregator.evaluators)
+    for ev in evaluations:
+        evaluator = ev.get("evaluator")
+        if evaluator is not None and evaluator in seen:
+            raise CouncilError(f"Evaluation from '{evaluator}' already recorded")
+        if evaluator is not None:
+            seen.add(evaluator)
+        aggregator.add(ev)
+
+
+def report(aggregator, expected=None):
+    ranking = aggregator.ranking()
+    result = {
+        "received": len(aggregator.evaluators),
+        "evaluators": list(aggregator.evaluators),
+        "ranking": ranking,
+        "margins": aggregator.margins(ranking),
+    }
+    if expected is not None:
+        result["complete"] = len(aggregator.evaluators) >= expected
+    return result
+
+
+def handle(data):
+    evaluations = _new_evaluations(data)
+    weights = data.get("weights")
+    if weights is not None and not isinstance(weights, dict):
+        raise CouncilError("'weights' must be an object")
+    expected = data.get("expected")
+
+    session_id = data.get("session")
+    if session_id is None:
+        if not evaluations or not weights:
+            raise CouncilError("Input must contain 'evaluations' and 'weights' "
+                               "(or a 'session')")
+        aggregator = OnlineAggregator(weights)
+        update(aggregator, evaluations)
+        return report(aggregator, expected)
+
+    config = load_config("cross_evaluation.score_aggregation").get("online", {})
+    sessions.prune(SESSION_KIND, config.get("session_ttl_hours", 24))
+
+    with sessions.update(SESSION_KIND, str(session_id)) as state:
+        if data.get("reset"):
+            state.clear()
+        if not state:
+            if not weights:
+                raise CouncilError(f"Session '{session_id}' is new: 'weights' required")
+        elif weights is not None and weights != state["weights"]:
+            raise CouncilError(f"Session '{session_id}' was started with different weights")
+
+        aggregator = OnlineAggregator(weights or state["weights"], state)
+        update(aggregator, evaluations)
+        result = report(aggregator, expected)
+        result["session"] = session_id
+
+        state.clear()
+        if not data.get("close"):
+            state.update(aggregator.to_state())
+    return result
+
+
+def main():
+    run(handle)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,167 +8,242 @@ Input (stdin JSON):
       {"evaluator": "A", "scores": {"B": {"accuracy": 8, ...}, "C": {...}}},
       ...
     ],
-    "weights": {"accuracy": 30, "verifiability": 15, ...}
+    "weights": {"accuracy": 30, "verifiability": 15, ...},
+    "normalization": "z_score",     # optional: z_score | joint | calibrated (default: config)
+    "record": "council-123",        # optional: add these scores to the calibration
+                                    # store (once per id)
+    "consistency": true,            # optional: report every evaluator's Kendall tau
+    "variance_threshold": 2.0       # optional: override bias_mitigation.detection
   }
 
 Output (stdout JSON):
-  {"ranking": [{label, z_score, raw_score}], "bias_flags": [...]}
+  {"ranking": [{label, z_score, raw_score}],
+   "bias_flags": [{"type": "score_deviation", evaluator, response, score, mean,
+                   stdev, deviation_sigma},
+                  {"type": "rank_consistency", evaluator, kendall_tau, responses}]}
+  "consistency" adds {"rank_consistency": [{evaluator, kendall_tau, responses}]}
+  joint adds {"normalization": "joint", "converged": bool,
+              "evaluator_fits": [{evaluator, offset, scale}]}
+  calibrated adds {"normalization": "calibrated"}; "record" adds {"recorded": bool}
+
+"joint" fits evaluator offsets/scales together with response quality across
+the sparse matrix (lib/joint_scores.py); use it for panel evaluation, where
+each evaluator sees only a few responses. "calibrated" standardizes each
+dimension score against the evaluator's history across sessions
+(lib/calibration.py), blended with this session's stats.
+
+Rank consistency compares each evaluator's ordering with the leave-one-out
+consensus of the others (Kendall tau-b, O(R log R) per evaluator).
+
+Batch mode: score_results.py --jsonl [FILE] [--workers N]
+  Input (JSONL, FILE or stdin): one session input per line, plus optional "id"
+  Output (stdout JSONL): one result per line, in input order, with "id" echoed
+  Invalid lines produce {"id": ..., "error": "..."} and processing continues.
+  Use it to audit archived sessions, e.g. with "consistency": true.
+
+Config: protocols/standard.yaml -> cross_evaluation.score_aggregation
+        + bias_mitigation.detection
 """
 
+import argparse
 import math
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
-from lib.io_helpers import read_input, write_output, fail, load_config
+from lib import calibration, rank_consistency
+from lib.io_helpers import CouncilError, run, load_config, iter_jsonl, write_jsonl
+from lib.parallel import pool_imap
+from lib.score_engine import ScoreTensor, weighted_score, z_normalize
 
 
-def weighted_score(scores, weights):
-    """Compute weighted sum: sum(score * weight/100)."""
-    total = 0.0
-    weight_sum = sum(weights.get(d, 0) for d in scores)
-    if weight_sum == 0:
-        return 0.0
-    for dim, score in scores.items():
-        w = weights.get(dim, 0) / 100.0
-        total += score * w
-    return round(total, 3)
+NORMALIZATIONS = ("z_score", "joint", "calibrated")
 
 
-def _mean(values):
-    """Compute mean of a list."""
-    if not values:
-        return 0.0
-    return sum(values) / len(values)
-
-
-def _stdev(values, mean_val=None):
-    """Compute population stdev."""
-    if len(values) < 2:
-        return 0.0
-    if mean_val is None:
-        mean_val = _mean(values)
-    variance = sum((v - mean_val) ** 2 for v in values) / len(values)
-    return math.sqrt(variance)
-
-
-def z_normalize(evaluator_scores):
-    """Z-score normalize one evaluator's weighted scores.
-
-    Args:
-        evaluator_scores: {response_label: weighted_score}
-
-    Returns:
-        {response_label: z_score}
-    """
-    values = list(evaluator_scores.values())
-    if len(values) < 2:
-        return {k: 0.0 for k in evaluator_scores}
-
-    m = _mean(values)
-    s = _stdev(values, m)
-
-    if s == 0:
-        return {k: 0.0 for k in evaluator_scores}
-
-    return {k: round((v - m) / s, 4) for k, v in evaluator_scores.items()}
-
-
-def aggregate_scores(evaluations, weights):
+def aggregate_scores(evaluations, weights, tensor=None):
     """
     1. Compute weighted score per evaluator per response
     2. Z-normalize per evaluator
     3. Average z-scores per response
     4. Rank by averaged z-score
-    """
-    # Step 1+2: Per-evaluator weighted scores, then z-normalize
-    response_z_scores = {}  # {response_label: [z_scores]}
 
-    for ev in evaluations:
-        evaluator_weighted = {}
-        for resp_label, dim_scores in ev.get("scores", {}).items():
-            evaluator_weighted[resp_label] = weighted_score(dim_scores, weights)
+    Pass a ScoreTensor to reuse one parse of `evaluations` across calls.
+    """
+    tensor = tensor or ScoreTensor(evaluations)
+    return tensor.weighted(weights).ranking()
 
-        z_scores = z_normalize(evaluator_weighted)
 
-        for resp_label, z in z_scores.items():
-            response_z_scores.setdefault(resp_label, []).append(z)
+def aggregate_joint(evaluations, weights, joint_cfg=None, tensor=None):
+    """Rank by a joint fit of evaluator offset/scale and response quality.
 
-    # Step 3+4: Average and rank
-    ranking = []
-    for label, z_list in response_z_scores.items():
-        avg_z = round(_mean(z_list), 4)
-        # Also compute raw average for reference
-        raw_scores = []
-        for ev in evaluations:
-            if label in ev.get("scores", {}):
-                raw_scores.append(weighted_score(ev["scores"][label], weights))
-        avg_raw = round(_mean(raw_scores), 3) if raw_scores else 0.0
+    Returns (ranking, evaluator_fits, converged).
+    """
+    tensor = tensor or ScoreTensor(evaluations)
+    return _joint(tensor.weighted(weights), joint_cfg or {})
 
-        ranking.append({"label": label, "z_score": avg_z, "raw_score": avg_raw})
 
-    ranking.sort(key=lambda r: r["z_score"], reverse=True)
-    return ranking
+def _joint(scores, joint_cfg):
+    ranking, fitted = scores.joint_ranking(
+        ridge=joint_cfg.get("ridge", 1.0),
+        max_iterations=joint_cfg.get("max_iterations", 200),
+        tolerance=joint_cfg.get("tolerance", 1e-6))
+    fits = [{"evaluator": evaluator,
+             "offset": round(fitted["offset"][e], 3),
+             "scale": round(fitted["scale"][e], 3)}
+            for e, evaluator in enumerate(scores.tensor.evaluators)]
+    return ranking, fits, fitted["converged"]
 
 
-def detect_bias(evaluations, weights, variance_threshold):
-    """Flag evaluators whose scores deviate > threshold*sigma from cross-evaluator mean."""
-    flags = []
+def aggregate_calibrated(evaluations, weights, store, prior_weight=20):
+    """Rank with per-evaluator, per-dimension priors from a CalibrationStore."""
+    evaluators = {ev.get("evaluator", "?") for ev in evaluations}
+    return calibration.calibrated_ranking(evaluations, weights, store.priors(evaluators),
+                                          prior_weight)
 
-    # Collect all weighted scores per response across evaluators
-    response_scores = {}  # {response: [(evaluator, weighted_score)]}
 
-    for ev in evaluations:
-        evaluator = ev.get("evaluator", "?")
-        for resp_label, dim_scores in ev.get("scores", {}).items():
-            ws = weighted_score(dim_scores, weights)
-            response_scores.setdefault(resp_label, []).append((evaluator, ws))
+def detect_bias(evaluations, weights, variance_threshold, tensor=None):
+    """Flag evaluators whose scores deviate > threshold*sigma from cross-evaluator mean."""
+    tensor = tensor or ScoreTensor(evaluations)
+    return tensor.weighted(weights).bias_flags(variance_threshold)
 
-    # Check each response
-    for resp_label, scores_list in response_scores.items():
-        if len(scores_list) < 2:
-            continue
 
-        values = [s for _, s in scores_list]
-        m = _mean(values)
-        s = _stdev(values, m)
+def check_consistency(evaluations, weights, tensor=None):
+    """Kendall tau of every evaluator vs the leave-one-out consensus."""
+    tensor = tensor or ScoreTensor(evaluations)
+    return tensor.weighted(weights).evaluator_taus()
 
-        if s == 0:
-            continue
 
-        for evaluator, ws in scores_list:
-            deviation = abs(ws - m) / s
-            if deviation > variance_threshold:
-                flags.append({
-                    "evaluator": evaluator,
-                    "response": resp_label,
-                    "score": ws,
-                    "mean": round(m, 3),
-                    "stdev": round(s, 3),
-                    "deviation_sigma": round(deviation, 2),
-                })
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and \
+        math.isfinite(value)
 
-    return flags
 
+def parse_evaluations(evaluations):
+    """Validate the evaluations array: [{evaluator, scores: {label: {dim: number}}}]."""
+    if not evaluations or not isinstance(evaluations, list):
+        raise CouncilError("Input must contain 'evaluations' array")
+    for i, ev in enumerate(evaluations):
+        if not isinstance(ev, dict) or not isinstance(ev.get("scores", {}), dict):
+            raise CouncilError(f"evaluations[{i}]: expected {{evaluator, scores: {{...}}}}")
+        if not isinstance(ev.get("evaluator", ""), str):
+            raise CouncilError(f"evaluations[{i}].evaluator: must be a name")
+        for label, dim_scores in ev.get("scores", {}).items():
+            if not isinstance(dim_scores, dict):
+                raise CouncilError(f"evaluations[{i}].scores.{label}: expected {{dimension: score}}")
+            for dim, score in dim_scores.items():
+                if not _is_number(score):
+                    raise CouncilError(f"evaluations[{i}].scores.{label}.{dim}: "
+                                       f"score must be a number, got {score!r}")
+    return evaluations
+
+
+def parse_weights(weights):
+    """Validate the weights object: {dimension: number}."""
+    if not weights or not isinstance(weights, dict):
+        raise CouncilError("Input must contain 'weights' object")
+    for dim, weight in weights.items():
+        if not _is_number(weight):
+            raise CouncilError(f"weights.{dim}: must be a number, got {weight!r}")
+    return weights
 
-def main():
-    data = read_input()
 
-    evaluations = data.get("evaluations")
-    if not evaluations or not isinstance(evaluations, list):
-        fail("Input must contain 'evaluations' array")
+def handle(data):
+    evaluations = parse_evaluations(data.get("evaluations"))
+    weights = parse_weights(data.get("weights"))
 
-    weights = data.get("weights")
-    if not weights or not isinstance(weights, dict):
-        fail("Input must contain 'weights' object")
+    agg_cfg = load_config("cross_evaluation.score_aggregation")
+    normalization = data.get("normalization", agg_cfg.get("normalization", "z_score"))
+    if normalization not in NORMALIZATIONS:
+        raise CouncilError(f"'normalization' must be one of {list(NORMALIZATIONS)}")
 
     bias_cfg = load_config("bias_mitigation.detection")
-    variance_threshold = bias_cfg.get("variance_threshold", 2.0)
+    variance_threshold = data.get("variance_threshold", bias_cfg.get("variance_threshold", 2.0))
+    if not _is_number(variance_threshold) or variance_threshold <= 0:
+        raise CouncilError("'variance_threshold' must be a positive number")
+
+    # Weighted scores are computed once and shared by ranking and bias checks
+    scores = ScoreTensor(evaluations).weighted(weights)
+    bias_flags = scores.bias_flags(variance_threshold)
+    consistency_check = bias_cfg.get("consistency_check", True)
+    if consistency_check or data.get("consistency"):
+        taus = scores.evaluator_taus()
+    if consistency_check:
+        bias_flags += rank_consistency.flag_inconsistent(
+            taus, bias_cfg.get("consistency_min_tau", 0.0),
+            bias_cfg.get("consistency_min_responses", 4))
+
+    ranking, extra = None, {}
+    if normalization == "z_score":
+        ranking = scores.ranking()
+    elif normalization == "joint":
+        ranking, fits, converged = _joint(scores, agg_cfg.get("joint", {}))
+        extra = {"normalization": normalization, "converged": converged,
+                 "evaluator_fits": fits}
+    else:
+        extra = {"normalization": normalization}
+
+    record = data.get("record")
+    if ranking is None or record is not None:
+        cal_cfg = agg_cfg.get("calibration", {})
+        path = cal_cfg.get("path")
+        with calibration.CalibrationStore(Path(path).expanduser() if path else None) as store:
+            # Rank before recording, so this session is not its own prior
+            if ranking is None:
+                ranking = aggregate_calibrated(evaluations, weights, store,
+                                               cal_cfg.get("prior_weight", 20))
+            if record is not None:
+                extra["recorded"] = store.record(record, evaluations)
+
+    if data.get("consistency"):
+        extra["rank_consistency"] = taus
+    return {"ranking": ranking, "bias_flags": bias_flags, **extra}
+
+
+def score_record(data, overrides=None):
+    """Score one batch record; returns (result, error), one of them None."""
+    try:
+        return handle({**data, **(overrides or {})}), None
+    except CouncilError as e:
+        return None, str(e)
+
+
+def _score_line(event):
+    data, error = event
+    if error is None:
+        result, error = score_record(data)
+    if error is not None:
+        result = {"error": error}
+    if data is not None and "id" in data:
+        result = {"id": data["id"], **result}
+    return result
+
+
+def score_jsonl(lines, workers=1, out=None):
+    """Score one session object per line, writing results in input order."""
+    for result in pool_imap(_score_line, iter_jsonl(lines), workers):
+        write_jsonl(result, out)
 
-    ranking = aggregate_scores(evaluations, weights)
-    bias_flags = detect_bias(evaluations, weights, variance_threshold)
 
-    write_output({"ranking": ranking, "bias_flags": bias_flags})
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate council evaluation scores")
+    parser.add_argument("--jsonl", nargs="?", const="-", metavar="FILE",
+                        help="batch mode: read JSONL sessions from FILE (default stdin)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="process pool size for --jsonl (0 = CPU count)")
+    args = parser.parse_args()
+
+    if args.jsonl is None:
+        run(handle)
+        return
+    if args.jsonl == "-":
+        score_jsonl(sys.stdin, args.workers)
+        return
+    try:
+        with open(args.jsonl, encoding="utf-8") as f:
+            score_jsonl(f, args.workers)
+    except OSError as e:
+        write_jsonl({"error": f"Cannot read {args.jsonl}: {e}"})
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Choose which detected LLM tools take part when there are more than
+resource_budget.limits.max_participants allows (participant_overflow).
+
+top_by_score keeps the highest detection scores. latency_aware keeps the
+same number of participants but picks the set with the lowest expected stage
+critical path (the expected slowest call of a fan-out stage) from the local
+call history (record_history.py): each tool's recent latencies, capped at
+per_call, with timeouts and errors. Sets within tie_seconds of the fastest
+are ranked by expected detection-score-weighted responses. If even the
+fastest set would overrun the stage budget (stage_budget_ratio of the
+mode's remaining time, at most per_call), it drops its slowest members
+until it fits, but only members whose own history makes them slow; tools
+estimated from pooled or default latencies are kept. Tools failing more
+than max_failure_rate of their calls are dropped first and left out of
+the pooled history. With no history, latency_aware picks the same set as
+top_by_score.
+
+Input (stdin JSON):
+  {
+    "candidates": [{"name": "mcp__codex__codex", "score": 85}, ...],  # detect_llms participants
+    "mode": "standard",         # optional (default: protocol_modes.default)
+    "elapsed": 12,              # optional: seconds already spent
+    "policy": "latency_aware"   # optional (default: participant_overflow)
+  }
+
+Output (stdout JSON):
+  {
+    "policy": "latency_aware",
+    "participants": ["mcp__codex__codex", ...],    # external tools; the host is one more
+    "expected_critical_path": 38.4,
+    "stage_budget": 90.0,
+    "within_budget": true,
+    "baseline": {"participants": [...], "expected_critical_path": 97.1},  # top_by_score
+    "candidates": [{"name", "score", "selected", "reason", "history": "own|pooled|default",
+                    "calls", "p50", "p95", "timeout_rate", "failure_rate"}],
+    "explanation": "..."
+  }
+
+Config: protocols/standard.yaml -> resource_budget, history
+"""
+
+import bisect
+import itertools
+import sys
+from math import comb
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from lib.history import HistoryStore, summarize
+from lib.io_helpers import CouncilError, run, load_config
+
+POLICIES = ("top_by_score", "latency_aware")
+
+# Latency grid points for the expected-maximum integral
+_GRID_POINTS = 256
+
+# Above this many subsets, only the fastest tools are searched
+_MAX_SUBSETS = 5000
+
+
+class ToolModel:
+    """One candidate's latency distribution and success rate."""
+
+    def __init__(self, name, score, samples, pooled, per_call, settings):
+        self.name = name
+        self.score = score
+        own = _has_own_history(samples, settings)
+        if own:
+            self.source, rows = "own", samples
+        elif len(pooled) >= settings.get("min_samples", 5):
+            self.source, rows = "pooled", pooled
+        else:
+            default = min(settings.get("default_latency", 20), per_call)
+            self.source, rows = "default", [(default, "ok")]
+        self.latencies = sorted(min(latency, per_call) for latency, _ in rows)
+        self.success = sum(outcome == "ok" for _, outcome in rows) / len(rows)
+        self.stats = summarize(samples)
+        self.failed = _failure_rate(samples)
+        self.unreliable = _unreliable(samples, settings)
+
+    def cdf(self, grid):
+        n = len(self.latencies)
+        return [bisect.bisect_right(self.latencies, v) / n for v in grid]
+
+
+def _has_own_history(samples, settings):
+    return len(samples) >= settings.get("min_samples", 5)
+
+
+def _failure_rate(samples):
+    if not samples:
+        return 0.0
+    return 1 - sum(outcome == "ok" for _, outcome in samples) / len(samples)
+
+
+def _unreliable(samples, settings):
+    """Enough own calls, and more of them failed than max_failure_rate allows."""
+    return (_has_own_history(samples, settings)
+            and _failure_rate(samples) > settings.get("max_failure_rate", 0.5))
+
+
+def latency_grid(models):
+    values = sorted({v for m in models for v in m.latencies})
+    if len(values) <= _GRID_POINTS:
+        return values
+    # Evenly spaced picks, always keeping the maximum
+    step = len(values) / _GRID_POINTS
+    return [values[min(len(values) - 1, int((i + 1) * step) - 1)] for i in range(_GRID_POINTS)]
+
+
+def expected_max(cdfs, grid):
+    """E[max latency] of independent tools, from their CDFs on `grid`."""
+    total = previous = 0.0
+    for j, v in enumerate(grid):
+        g = 1.0
+        for cdf in cdfs:
+            g *= cdf[j]
+        total += v * (g - previous)
+        previous = g
+    return total
+
+
+def best_set(models, size, cdfs, grid, tie_seconds, required=()):
+    """(subset, expected critical path) of `size` tools; ties go to expected yield.
+
+    Every subset includes the `required` models.
+    """
+    required = tuple(required)
+    pool = [m for m in models if m not in required]
+    size -= len(required)
+    if comb(len(pool), size) > _MAX_SUBSETS:
+        pool = sorted(pool, key=lambda m: expected_max([cdfs[m.name]], grid))
+        while comb(len(pool), size) > _MAX_SUBSETS:
+            pool = pool[:-1]
+    scored = []
+    for rest in itertools.combinations(pool, size):
+        subset = required + rest
+        path = expected_max([cdfs[m.name] for m in subset], grid)
+        scored.append((path, -sum(m.success * m.score for m in subset), subset))
+    fastest = min(path for path, _, _ in scored)
+    path, _, subset = min((s for s in scored if s[0] <= fastest + tie_seconds),
+                          key=lambda s: (s[1], s[0]))
+    return list(subset), path
+
+
+def stage_budget(mode, elapsed, budget_cfg, settings):
+    per_call = budget_cfg.get("time", {}).get("per_call", 120)
+    total = budget_cfg.get("time", {}).get("total", {}).get(mode)
+    if total is None:
+        raise CouncilError(f"No budget defined for mode: {mode}")
+    remaining = max(0.0, total - elapsed)
+    return min(per_call, settings.get("stage_budget_ratio", 0.5) * remaining)
+
+
+def select(candidates, mode, elapsed, policy, history):
+    budget_cfg = load_config("resource_budget")
+    limits = budget_cfg.get("limits", {})
+    settings = budget_cfg.get("selection", {})
+    per_call = budget_cfg.get("time", {}).get("per_call", 120)
+    slots = max(1, limits.get("max_participants", 5) - 1)  # the host is a participant
+    budget = stage_budget(mode, elapsed, budget_cfg, settings)
+
+    # Tools dropped as unreliable would drag every unknown tool's estimate to per_call
+    pooled = [row for rows in history.values() if not _unreliable(rows, settings)
+              for row in rows]
+    models = [ToolModel(c["name"], c["score"], history.get(c["name"], []), pooled, per_call,
+                        settings) for c in candidates]
+    by_score = sorted(models, key=lambda m: m.score, reverse=True)
+    grid = latency_grid(models)
+    cdfs = {m.name: m.cdf(grid) for m in models}
+    baseline = by_score[:slots]
+    baseline_path = expected_max([cdfs[m.name] for m in baseline], grid)
+
+    reasons = {}
+    if policy == "top_by_score":
+        chosen, path = baseline, baseline_path
+        for m in by_score[slots:]:
+            reasons[m.name] = f"over max_participants ({slots} external slots), lower score"
+    else:
+        eligible = [m for m in models if not m.unreliable] or models
+        for m in models:
+            if m not in eligible:
+                reasons[m.name] = (f"failed {m.failed:.0%} of recent calls "
+                                   f"(max_failure_rate {settings.get('max_failure_rate', 0.5)})")
+        tie_seconds = settings.get("tie_seconds", 1.0)
+        size = min(slots, len(eligible))
+        chosen, path = best_set(eligible, size, cdfs, grid, tie_seconds)
+        full_size = chosen
+        # Only a tool's own history is evidence enough to drop it for the budget
+        keep = [m for m in chosen if m.source != "own"]
+        while path > budget and size > max(1, len(keep)):
+            smaller, smaller_path = best_set(eligible, size - 1, cdfs, grid, tie_seconds, keep)
+            if smaller_path >= path:
+                break
+            size -= 1
+            chosen, path = smaller, smaller_path
+        for m in eligible:
+            if m in chosen:
+                continue
+            swaps = [(expected_max([cdfs[o.name] for o in chosen if o is not out] + [cdfs[m.name]],
+                                   grid), out) for out in chosen]
+            swap_path, out = min(swaps, key=lambda s: s[0])
+            if m in full_size:
+                reasons[m.name] = f"dropped to fit the {budget:.1f}s stage budget"
+            elif swap_path - path > tie_seconds:
+                reasons[m.name] = (f"slower: replacing {out.name} would add "
+                                   f"{swap_path - path:.1f}s to the expected critical path")
+            else:
+                reasons[m.name] = "similar latency, lower score x success rate"
+
+    chosen = sorted(chosen, key=lambda m: m.score, reverse=True)
+    rows = []
+    for m in models:
+        row = {"name": m.name, "score": m.score, "selected": m in chosen,
+               "reason": "selected" if m in chosen else reasons.get(m.name, "not selected"),
+               "history": m.source}
+        row.update(m.stats)
+        rows.append(row)
+
+    dropped = len(models) - len(chosen)
+    explanation = (f"{policy}: kept {len(chosen)} of {len(models)} candidates; expected "
+                   f"critical path {path:.1f}s vs stage budget {budget:.1f}s")
+    if policy == "latency_aware" and {m.name for m in chosen} != {m.name for m in baseline}:
+        explanation += f" (top_by_score would expect {baseline_path:.1f}s)"
+    if dropped == 0:
+        explanation += "; no overflow"
+    return {
+        "policy": policy,
+        "participants": [m.name for m in chosen],
+        "expected_critical_path": round(path, 1),
+        "stage_budget": round(budget, 1),
+        "within_budget": path <= budget,
+        "baseline": {"participants": [m.name for m in baseline],
+                     "expected_critical_path": round(baseline_path, 1)},
+        "candidates": rows,
+        "explanation": explanation,
+    }
+
+
+def parse_candidates(candidates):
+    if not candidates or not isinstance(candidates, list):
+        raise CouncilError("Input must contain 'candidates' array")
+    parsed, seen = [], set()
+    for i, c in enumerate(candidates):
+        if not isinstance(c, dict) or not isinstance(c.get("name"), str):
+            raise CouncilError(f"candidates[{i}]: expected {{name, score}}")
+        score = c.get("score", 0)
+        if not isinstance(score, (int, float)):
+            raise CouncilError(f"candidates[{i}]: 'score' must be a number")
+        if c["name"] in seen:
+            raise CouncilError(f"Duplicate candidate: {c['name']}")
+        seen.add(c["name"])
+        parsed.append({"name": c["name"], "score": score})
+    return parsed
+
+
+def handle(data):
+    candidates = parse_candidates(data.get("candidates"))
+    mode = data.get("mode") or load_config("protocol_modes").get("default", "standard")
+    elapsed = data.get("elapsed", 0)
+    if not isinstance(elapsed, (int, float)) or elapsed < 0:
+        raise CouncilError("'elapsed' must be a non-negative number of seconds")
+    policy = data.get("policy") or load_config("resource_budget.limits").get(
+        "participant_overflow", "top_by_score")
+    if policy not in POLICIES:
+        raise CouncilError(f"Unknown policy: {policy} (expected one of {', '.join(POLICIES)})")
+
+    # Loaded for top_by_score too, so its critical path estimate is real
+    with HistoryStore() as store:
+        history = store.samples()
+    return select(candidates, mode, elapsed, policy, history)
+
+
+def main():
+    run(handle)
+
+
+if __name__ == "__main__":
+    main()
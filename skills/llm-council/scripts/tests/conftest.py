@@ -0,0 +1,18 @@
+"""Shared fixtures: scripts/ on sys.path and a private cache dir per test."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lib.io_helpers import CACHE_DIR_ENV  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Point LLM_COUNCIL_CACHE_DIR (config, detection and history stores) at tmp_path."""
+    path = tmp_path / "cache"
+    monkeypatch.setenv(CACHE_DIR_ENV, str(path))
+    return path
@@ -0,0 +1,107 @@
+"""Hedged Stage 1 collection against seeded simulated endpoints."""
+
+import asyncio
+
+import pytest
+
+import collect_responses
+from lib.io_helpers import CouncilError
+from lib.transport import SimulatedTransport
+
+TIME_SCALE = 0.002  # real seconds per simulated second
+
+
+def fixed(median, **spec):
+    """A simulated tool that always takes `median` seconds (sigma 0)."""
+    return dict(spec, median=median, sigma=0)
+
+
+def collect(specs, participants, spares=(), hedge_after=None, median=None,
+            deadline=90, max_hedges=2, allow_retry=True):
+    transport = SimulatedTransport(specs, seed=0, time_scale=TIME_SCALE)
+    prompts = {p: "question" for p in participants}
+    return asyncio.run(collect_responses.collect(
+        transport, prompts, list(spares), hedge_after or {}, median or {}, 120, deadline,
+        max_hedges, allow_retry, TIME_SCALE))
+
+
+def test_tail_latency_primary_is_hedged_and_backup_wins():
+    result = collect_responses.handle({
+        "participants": ["slow"], "prompt": "question", "spares": ["fast"],
+        "hedge_after": {"slow": 15},
+        "simulate": {"tools": {"slow": fixed(10, tail={"probability": 1.0, "multiplier": 20}),
+                               "fast": fixed(5, reply="from fast")},
+                     "seed": 0, "time_scale": TIME_SCALE},
+    })
+    [response] = result["responses"]
+    assert response["tool"] == "fast"
+    assert response["attempt"] == "spare"
+    assert response["hedged"] is True
+    assert response["response"] == "from fast"
+    assert 19 <= response["latency"] < 40
+    assert result["failed"] == []
+    assert result["hedges"] == {"issued": 1, "won": 1, "max": 2}
+    assert result["recorded_calls"] == 0  # simulated calls are never recorded
+
+
+def test_fast_primary_is_not_hedged():
+    results, hedges, calls = collect({"a": fixed(5), "spare": fixed(1)}, ["a"], ["spare"],
+                                     hedge_after={"a": 30}, median={"spare": 1})
+    assert results[0]["attempt"] == "primary"
+    assert results[0]["hedged"] is False
+    assert hedges["issued"] == 0
+    assert [c["tool"] for c in calls] == ["a"]
+
+
+def test_max_hedges_is_respected():
+    specs = {p: fixed(50) for p in ("a", "b", "c")}
+    specs.update({s: fixed(5) for s in ("s1", "s2", "s3")})
+    results, hedges, calls = collect(
+        specs, ["a", "b", "c"], ["s1", "s2", "s3"], hedge_after=dict.fromkeys("abc", 10),
+        median=dict.fromkeys(["s1", "s2", "s3"], 5), max_hedges=2)
+    assert hedges == {"issued": 2, "won": 2, "max": 2}
+    assert sorted(r["attempt"] for r in results) == ["primary", "spare", "spare"]
+    assert sum(c["tool"].startswith("s") for c in calls) == 2
+    # the loser of each race was cancelled, not recorded
+    assert sorted(c["tool"] for c in calls if not c["tool"].startswith("s")) == \
+        [r["participant"] for r in results if r["attempt"] == "primary"]
+
+
+def test_hedge_skipped_when_backup_median_misses_deadline():
+    specs = {"a": fixed(50), "spare": fixed(5)}
+    results, hedges, _ = collect(specs, ["a"], ["spare"], hedge_after={"a": 10},
+                                 median={"a": 100, "spare": 100}, deadline=90)
+    assert hedges["issued"] == 0
+    assert results[0]["attempt"] == "primary"
+
+    results, hedges, _ = collect(specs, ["a"], ["spare"], hedge_after={"a": 10},
+                                 median={"a": 100, "spare": 30}, deadline=90)
+    assert hedges["issued"] == 1
+    assert results[0]["tool"] == "spare"
+
+
+def test_failed_primary_is_retried_at_once():
+    results, hedges, calls = collect({"a": fixed(5, failure_rate=1.0), "b": fixed(5)},
+                                     ["a"], ["b"], median={"b": 5})
+    assert results[0]["tool"] == "b"
+    assert 9 <= results[0]["latency"] < 20
+    assert hedges["issued"] == 1
+    assert [c["outcome"] for c in calls] == ["error", "ok"]
+
+
+def test_cold_start_uses_default_trigger():
+    trigger, median = collect_responses.latency_plan(["a"], {}, 0.9, 5, 45, 20)
+    assert trigger == {"a": 45}
+    assert median == {"a": 20}
+
+
+@pytest.mark.parametrize("data, message", [
+    ({"participants": ["a"], "prompt": "q", "spares": None, "hedge_after": {"a": -1}},
+     "'hedge_after'"),
+    ({"participants": ["a"], "prompt": "q", "spares": "b"}, "'spares'"),
+    ({"participants": ["a", "a"], "prompt": "q"}, "Duplicate participants"),
+])
+def test_rejects_bad_input(data, message):
+    data["simulate"] = {"tools": {"a": fixed(1)}, "time_scale": TIME_SCALE}
+    with pytest.raises(CouncilError, match=message):
+        collect_responses.handle(data)
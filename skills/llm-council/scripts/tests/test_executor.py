@@ -0,0 +1,227 @@
+"""fan_out and run_stage against seeded simulated endpoints."""
+
+import asyncio
+import io
+import json
+
+import pytest
+
+import run_stage
+from lib.executor import fan_out
+from lib.io_helpers import CouncilError
+from lib.transport import SimulatedTransport
+
+TIME_SCALE = 0.002  # real seconds per simulated second
+
+
+class Recording(SimulatedTransport):
+    """SimulatedTransport that tracks calls in flight and cancelled calls."""
+
+    def __init__(self, specs):
+        super().__init__(specs, seed=0, time_scale=TIME_SCALE)
+        self.in_flight = self.peak = 0
+        self.started, self.cancelled = [], []
+
+    async def call(self, tool, prompt, timeout):
+        self.started.append(prompt)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            return await super().call(tool, prompt, timeout)
+        except asyncio.CancelledError:
+            self.cancelled.append(prompt)
+            raise
+        finally:
+            self.in_flight -= 1
+
+
+def fixed(median, **spec):
+    return dict(spec, median=median, sigma=0)
+
+
+def calls_for(durations):
+    """One call per id, to a tool that always takes that many seconds."""
+    return [{"id": i, "tool": f"t{d}", "prompt": i} for i, d in durations.items()]
+
+
+def gather(transport, calls, per_call=120, deadline=90, **kwargs):
+    async def main():
+        return [event async for event in fan_out(transport, calls, per_call, deadline,
+                                                 time_scale=TIME_SCALE, **kwargs)]
+    return asyncio.run(main())
+
+
+def transport_for(durations, **spec):
+    return Recording({f"t{d}": fixed(d, **spec) for d in durations.values()})
+
+
+def test_concurrency_is_bounded():
+    durations = {f"c{i}": 5 for i in range(6)}
+    transport = transport_for(durations)
+    events = gather(transport, calls_for(durations), max_concurrency=2)
+    assert transport.peak == 2
+    assert sorted(e["id"] for e in events) == sorted(durations)
+    assert {e["status"] for e in events} == {"ok"}
+    # three waves of two 5 s calls
+    assert max(e["latency"] for e in events) < 10
+    assert len(transport.started) == 6
+
+
+def test_events_stream_in_completion_order():
+    durations = {"a": 30, "b": 10, "c": 20}
+    events = gather(transport_for(durations), calls_for(durations))
+    assert [e["id"] for e in events] == ["b", "c", "a"]
+    assert [e["response"] for e in events] == ["Response from t10", "Response from t20",
+                                              "Response from t30"]
+
+
+def test_per_call_and_call_timeouts():
+    durations = {"default": 50, "own": 50, "quick": 5}
+    calls = calls_for(durations)
+    calls[1]["timeout"] = 10
+    events = {e["id"]: e for e in gather(transport_for(durations), calls, per_call=30)}
+    assert events["quick"]["status"] == "ok"
+    assert events["default"]["status"] == "timeout"
+    assert events["default"]["error"] == "no reply within 30s"
+    assert 29 <= events["default"]["latency"] < 40
+    assert events["own"]["status"] == "timeout"
+    assert 9 <= events["own"]["latency"] < 20
+
+
+def test_stage_deadline_bounds_running_and_queued_calls():
+    durations = {"first": 15, "second": 15}
+    events = {e["id"]: e for e in gather(transport_for(durations), calls_for(durations),
+                                         deadline=20, max_concurrency=1)}
+    assert events["first"]["status"] == "ok"
+    # started at ~15 s, so only ~5 s were left of the stage
+    assert events["second"]["status"] == "timeout"
+    assert 19 <= events["first"]["latency"] + events["second"]["latency"] < 30
+
+
+def test_errors_are_events():
+    durations = {"bad": 5, "good": 6}
+    transport = Recording({"t5": fixed(5, failure_rate=1.0), "t6": fixed(6)})
+    events = {e["id"]: e for e in gather(transport, calls_for(durations))}
+    assert events["bad"]["status"] == "error"
+    assert events["bad"]["error"] == "simulated failure of t5"
+    assert events["good"]["status"] == "ok"
+
+
+def test_unexpected_exception_fails_only_its_call():
+    class Broken(Recording):
+        async def call(self, tool, prompt, timeout):
+            if tool == "t5":
+                raise KeyError("boom")
+            return await super().call(tool, prompt, timeout)
+
+    durations = {"bad": 5, "good": 6}
+    transport = Broken({"t6": fixed(6)})
+    events = {e["id"]: e for e in gather(transport, calls_for(durations))}
+    assert events["bad"] == dict(events["bad"], status="error", error="KeyError: 'boom'")
+    assert events["good"]["status"] == "ok"
+
+
+@pytest.mark.parametrize("action", ["degrade", "stop"])
+def test_budget_decision_cancels_outstanding_calls(action):
+    durations = {"quick": 5, "running": 100, "queued": 100}
+    transport = transport_for(durations)
+    polls = []
+
+    def budget(stage_elapsed):
+        polls.append(stage_elapsed)
+        if stage_elapsed < 20:
+            return {"action": "continue"}
+        return {"action": action, "degrade_to": "quick"}
+
+    events = gather(transport, calls_for(durations), max_concurrency=2, budget=budget,
+                    poll_interval=5)
+    kinds = [e.get("event") or e["status"] for e in events]
+    assert kinds == ["ok", "budget", "cancelled", "cancelled"]
+    budget_event = events[1]
+    assert budget_event["action"] == action
+    assert 20 <= budget_event["stage_elapsed"] < 30
+
+    cancelled = {e["id"]: e for e in events[2:]}
+    assert set(cancelled) == {"running", "queued"}
+    assert {e["reason"] for e in cancelled.values()} == {f"budget {action}"}
+    # "queued" was started after "quick" finished; the stage ended well before either replied
+    assert all(e["latency"] is not None and e["latency"] < 30 for e in cancelled.values())
+    assert sorted(transport.cancelled) == ["queued", "running"]
+    assert transport.in_flight == 0
+    assert len(polls) >= 4
+
+
+def test_budget_cancels_calls_that_never_started():
+    durations = {"running": 100, "queued": 100}
+    transport = transport_for(durations)
+    events = gather(transport, calls_for(durations), max_concurrency=1,
+                    budget=lambda _: {"action": "stop"}, poll_interval=1)
+    cancelled = {e["id"]: e for e in events if e.get("status") == "cancelled"}
+    assert cancelled["queued"]["latency"] is None
+    assert transport.started == ["running"]
+    assert transport.cancelled == ["running"]
+
+
+def test_closing_the_stream_cancels_calls():
+    durations = {"quick": 5, "slow": 100}
+    transport = transport_for(durations)
+
+    async def main():
+        stream = fan_out(transport, calls_for(durations), 120, 90, time_scale=TIME_SCALE)
+        first = await stream.__anext__()
+        await stream.aclose()
+        return first
+
+    assert asyncio.run(main())["id"] == "quick"
+    assert transport.cancelled == ["slow"]
+
+
+def test_run_stage_returns_results_in_input_order():
+    result = run_stage.handle({
+        "stage": "evaluate", "mode": "deep",
+        "calls": [{"id": "slow", "tool": "a", "prompt": "p"},
+                  {"id": "fast", "tool": "b", "prompt": "p"}],
+        "simulate": {"tools": {"a": fixed(20), "b": fixed(5)}, "time_scale": TIME_SCALE},
+    })
+    assert [r["id"] for r in result["results"]] == ["slow", "fast"]
+    assert result["budget"] is None
+    assert result["summary"] == dict(result["summary"], ok=2, timeout=0, error=0, cancelled=0)
+    assert result["recorded_calls"] == 0
+
+
+def test_run_stage_cancels_on_mid_stage_degrade():
+    # deep: 360 s budget, degrade at 80% = 288 s, i.e. 58 s into this stage
+    result = run_stage.handle({
+        "stage": "evaluate", "mode": "deep", "elapsed": 230,
+        "calls": [{"id": 1, "tool": "a", "prompt": "p"}],
+        "simulate": {"tools": {"a": fixed(100)}, "time_scale": TIME_SCALE},
+    })
+    assert result["budget"]["action"] == "degrade"
+    assert result["budget"]["degrade_to"] == "standard"
+    assert 58 <= result["budget"]["stage_elapsed"] < 65
+    assert result["results"][0]["status"] == "cancelled"
+    assert result["results"][0]["reason"] == "budget degrade"
+    assert result["summary"]["total_elapsed"] == round(230 + result["budget"]["stage_elapsed"], 3)
+
+
+def test_run_stage_stream_writes_events_then_summary():
+    out = io.StringIO()
+    run_stage.stream({"calls": [{"id": 1, "tool": "a", "prompt": "p"}],
+                      "simulate": {"tools": {"a": fixed(5)}, "time_scale": TIME_SCALE}}, out)
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [line.get("event") for line in lines] == [None, "summary"]
+    assert lines[0]["status"] == "ok"
+    assert lines[1]["summary"]["ok"] == 1
+
+
+@pytest.mark.parametrize("data, message", [
+    ({"calls": []}, "'calls'"),
+    ({"calls": [{"id": 1, "tool": "a", "prompt": "p"}, {"id": 1, "tool": "a", "prompt": "p"}]},
+     "duplicate id"),
+    ({"calls": [{"tool": "a", "prompt": "p", "timeout": 0}]}, "'timeout'"),
+    ({"calls": [{"tool": "a", "prompt": "p"}], "debate_rounds": -1}, "'debate_rounds'"),
+])
+def test_run_stage_rejects_bad_input(data, message):
+    data["simulate"] = {"tools": {"a": fixed(1)}, "time_scale": TIME_SCALE}
+    with pytest.raises(CouncilError, match=message):
+        run_stage.handle(data)
@@ -0,0 +1,50 @@
+"""Input validation and judge scheduling in pairwise_tournament.py."""
+
+import pytest
+
+import pairwise_tournament
+from lib.io_helpers import CouncilError
+
+
+@pytest.mark.parametrize("data, message", [
+    ({"responses": [["A"], "B"]}, "'responses'"),
+    ({"responses": ["A", "A"]}, "unique"),
+    ({"responses": ["A", "B"], "judges": "xy"}, "'judges' must be an array"),
+    ({"responses": ["A", "B"], "judges": ["x", "x"]}, "'judges' must be unique"),
+    ({"responses": ["A", "B"], "authors": ["x"]}, "'authors' must map"),
+    ({"responses": ["A", "B"], "authors": {"C": "x"}}, "not responses: \\['C'\\]"),
+    ({"responses": ["A", "B"],
+      "comparisons": [{"first": ["A"], "second": "B", "winner": "B"}]}, "unknown"),
+    ({"responses": ["A", "B"],
+      "comparisons": [{"first": "A", "second": "B", "winner": "B", "judge": [1]}]},
+     "'judge' must be a name"),
+])
+def test_rejects_bad_input(data, message):
+    with pytest.raises(CouncilError, match=message):
+        pairwise_tournament.handle(data)
+
+
+def test_no_eligible_judge_is_an_error_not_done():
+    with pytest.raises(CouncilError, match="No eligible judge"):
+        pairwise_tournament.handle({"responses": ["A", "B", "C"], "judges": ["x"],
+                                    "authors": {"A": "x", "B": "x", "C": "x"}})
+
+
+def test_judges_never_judge_their_own_response():
+    authors = {"A": "x", "B": "y", "C": "z", "D": "x"}
+    result = pairwise_tournament.handle({"responses": list(authors), "judges": ["x", "y", "z"],
+                                         "authors": authors, "batch": 6})
+    assert result["done"] is False
+    assert result["next"]
+    for pair in result["next"]:
+        assert pair["judge"] not in (authors[pair["first"]], authors[pair["second"]])
+
+
+def test_done_after_max_comparisons():
+    comparisons = [{"first": "A", "second": "B", "winner": "A"},
+                   {"first": "B", "second": "C", "winner": "B"}]
+    result = pairwise_tournament.handle({"responses": ["A", "B", "C"],
+                                         "comparisons": comparisons, "max_comparisons": 2})
+    assert result["done"] is True
+    assert result["next"] == []
+    assert [r["label"] for r in result["ranking"]] == ["A", "B", "C"]
@@ -0,0 +1,129 @@
+"""probe_tools.py against a stub MCP streamable-HTTP server on 127.0.0.1."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import probe_tools
+from lib.io_helpers import CouncilError
+
+# tool -> (seconds before replying, reply text; None echoes the prompt)
+STUB_TOOLS = {
+    "fast": (0.0, "PONG"),
+    "markdown": (0.0, "**Pong.**"),
+    "echo": (0.0, None),
+    "slow": (1.5, "PONG"),
+}
+
+
+class StubMCP(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    calls = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        message = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if message["method"] == "notifications/initialized":
+            return self._reply(202, b"")
+        if message["method"] == "initialize":
+            result = {"protocolVersion": "2025-03-26", "capabilities": {},
+                      "serverInfo": {"name": "stub"}}
+            return self._reply(200, self._result(message, result), {"Mcp-Session-Id": "s1"})
+        name = message["params"]["name"]
+        StubMCP.calls.append(name)
+        delay, text = STUB_TOOLS[name]
+        time.sleep(delay)
+        text = message["params"]["arguments"]["prompt"] if text is None else text
+        try:
+            self._reply(200, self._result(message, {"content": [{"type": "text", "text": text}]}))
+        except OSError:  # the client gave up on a slow probe
+            pass
+
+    @staticmethod
+    def _result(message, result):
+        return json.dumps({"jsonrpc": "2.0", "id": message["id"], "result": result}).encode()
+
+    def _reply(self, status, body, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def endpoint():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubMCP)
+    thread = threading.Thread(target=server.serve_forever,
+                              kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    StubMCP.calls = []
+    yield f"http://127.0.0.1:{server.server_address[1]}/mcp"
+    server.shutdown()
+    server.server_close()
+
+
+def test_markdown_pong_passes(endpoint):
+    result = probe_tools.handle({"candidates": ["fast", "markdown"], "endpoint": endpoint})
+    assert result["verified"] == ["fast", "markdown"]
+    assert result["excluded"] == []
+    assert [p["response"] for p in result["probes"]] == ["PONG", "**Pong.**"]
+
+
+def test_echoed_prompt_fails(endpoint):
+    result = probe_tools.handle({"candidates": ["echo"], "endpoint": endpoint})
+    assert result["verified"] == []
+    assert result["excluded"] == [{"name": "echo", "reason": "unexpected response"}]
+
+
+def test_slow_endpoint_hits_deadline(endpoint):
+    start = time.perf_counter()
+    result = probe_tools.handle({"candidates": ["fast", "slow"], "endpoint": endpoint,
+                                 "deadline": 0.3})
+    assert time.perf_counter() - start < 1.2
+    assert result["verified"] == ["fast"]
+    assert result["excluded"] == [{"name": "slow", "reason": "probe deadline reached"}]
+
+
+def test_second_run_uses_cached_pass(endpoint, cache_dir):
+    first = probe_tools.handle({"candidates": ["fast"], "endpoint": endpoint})
+    second = probe_tools.handle({"candidates": ["fast"], "endpoint": endpoint})
+    assert (cache_dir / "tool_detection.sqlite3").exists()
+    assert first["probes"][0]["cached"] is False
+    assert second["verified"] == ["fast"]
+    assert second["probes"][0]["cached"] is True
+    assert StubMCP.calls == ["fast"]
+
+    fresh = probe_tools.handle({"candidates": ["fast"], "endpoint": endpoint, "cache": False})
+    assert fresh["probes"][0]["cached"] is False
+    assert StubMCP.calls == ["fast", "fast"]
+
+
+def test_failed_probe_is_not_cached(endpoint):
+    probe_tools.handle({"candidates": ["echo"], "endpoint": endpoint})
+    result = probe_tools.handle({"candidates": ["echo"], "endpoint": endpoint})
+    assert result["probes"][0]["cached"] is False
+    assert StubMCP.calls == ["echo", "echo"]
+
+
+def test_no_endpoint_is_unprobed():
+    result = probe_tools.handle({"candidates": ["fast"]})
+    assert result == dict(result, verified=[], excluded=[], unprobed=["fast"], probes=[])
+
+
+@pytest.mark.parametrize("data, message", [
+    ({"candidates": [{"name": "a", "endpoint": "http://127.0.0.1:1/mcp"}, "a"]},
+     "Duplicate candidate: a"),
+    ({"candidates": ["a"], "cache": "no"}, "'cache' must be true or false"),
+    ({"candidates": ["a"], "deadline": 0}, "'deadline'"),
+])
+def test_rejects_bad_input(data, message):
+    with pytest.raises(CouncilError, match=message):
+        probe_tools.handle(data)
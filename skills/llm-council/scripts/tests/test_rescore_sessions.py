@@ -0,0 +1,45 @@
+"""Bad archived sessions become error lines; the batch keeps going."""
+
+import io
+import json
+
+import pytest
+
+import rescore_sessions
+import score_results
+
+GOOD = {"evaluations": [{"evaluator": "A", "scores": {"B": {"accuracy": 8}}},
+                        {"evaluator": "B", "scores": {"A": {"accuracy": 5}}}],
+        "weights": {"accuracy": 100}}
+
+
+@pytest.mark.parametrize("session, error", [
+    ({"evaluations": [{"evaluator": ["A"], "scores": {}}]}, "evaluator: must be a name"),
+    ({"evaluations": [{"evaluator": "A", "scores": {"B": {"accuracy": "8"}}}]},
+     "score must be a number"),
+    ({"evaluations": [{"evaluator": "A", "scores": {"B": [8]}}]}, "expected {dimension: score}"),
+    ({"evaluations": ["A"]}, "expected {evaluator, scores"),
+    ({"weights": {"accuracy": None}}, "weights.accuracy: must be a number"),
+    ({"variance_threshold": float("nan")}, "'variance_threshold'"),
+    ({"ranking": [["A"]]}, "stored 'ranking'"),
+])
+def test_bad_session_gets_error_line(tmp_path, session, error):
+    path = tmp_path / "sessions.jsonl"
+    lines = [dict(GOOD, id=1), dict(GOOD, id=2, **session), dict(GOOD, id=3)]
+    path.write_text("".join(json.dumps(line) + "\n" for line in lines))
+    out = io.StringIO()
+    stats = rescore_sessions.rescore([str(path)], {}, out=out)
+    results = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r["id"] for r in results] == [1, 2, 3]
+    assert error in results[1]["error"]
+    assert "ranking" in results[0] and "ranking" in results[2]
+    assert stats["errors"] == 1
+
+
+def test_score_record_does_not_hide_programming_errors(monkeypatch):
+    def broken(*args):
+        raise KeyError("bug")
+
+    monkeypatch.setattr(score_results, "handle", broken)
+    with pytest.raises(KeyError):
+        score_results.score_record(GOOD)
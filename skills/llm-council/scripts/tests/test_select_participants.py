@@ -0,0 +1,65 @@
+"""latency_aware selection from recorded call history."""
+
+import pytest
+
+import select_participants
+from lib.history import HistoryStore
+
+
+def record(tool, latency, outcome="ok", n=10):
+    with HistoryStore() as store:
+        store.record_calls([{"tool": tool, "latency": latency, "outcome": outcome,
+                             "stage": "collect"}] * n)
+
+
+def select(names):
+    candidates = [{"name": name, "score": 90 - i} for i, name in enumerate(names)]
+    result = select_participants.handle({"candidates": candidates, "mode": "standard",
+                                         "policy": "latency_aware"})
+    return result, {c["name"]: c for c in result["candidates"]}
+
+
+def test_unreliable_tool_does_not_poison_the_pooled_prior():
+    record("a", 120, "timeout")
+    result, rows = select("abcdef")
+    assert rows["a"]["reason"].startswith("failed 100%")
+    assert len(result["participants"]) == 4
+    assert {rows[name]["history"] for name in "bcdef"} == {"default"}
+    assert result["within_budget"] is True
+    assert not any("stage budget" in row["reason"] for row in rows.values())
+
+
+def test_pooled_prior_uses_reliable_tools_only():
+    record("a", 120, "timeout")
+    record("x", 30)
+    result, rows = select("abc")
+    assert rows["b"]["history"] == rows["c"]["history"] == "pooled"
+    assert result["expected_critical_path"] == pytest.approx(30)
+
+
+def test_own_slow_history_is_dropped_to_fit_the_budget():
+    record("b", 5)
+    record("c", 10)
+    record("d", 100)
+    result, rows = select("bcd")
+    assert result["participants"] == ["b", "c"]
+    assert rows["d"]["reason"] == "dropped to fit the 90.0s stage budget"
+    assert result["within_budget"] is True
+
+
+def test_pooled_estimates_alone_never_shrink_the_set():
+    record("x", 100)  # reliable but slow, and not a candidate
+    result, rows = select("bcd")
+    assert result["participants"] == ["b", "c", "d"]
+    assert {row["history"] for row in rows.values()} == {"pooled"}
+    assert result["within_budget"] is False
+
+
+def test_only_own_history_tools_are_dropped():
+    record("b", 100)
+    record("x", 30)
+    record("y", 30)
+    result, rows = select("bcd")
+    # c and d are estimated from the pool; b's own history is what overruns
+    assert sorted(result["participants"]) == ["c", "d"]
+    assert rows["b"]["reason"] == "dropped to fit the 90.0s stage budget"
@@ -15,7 +15,7 @@ import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
-from lib.io_helpers import read_input, write_output, fail, load_config
+from lib.io_helpers import CouncilError, run, load_config
 
 # Core6 dimensions that have bounds constraints
 CORE6 = ["accuracy", "verifiability", "completeness", "clarity", "actionability", "relevance"]
@@ -96,15 +96,17 @@ def validate_and_normalize(weights, constraints):
     }
 
 
-def main():
-    data = read_input()
+def handle(data):
     weights = data.get("weights")
     if not weights or not isinstance(weights, dict):
-        fail("Input must contain 'weights' object")
+        raise CouncilError("Input must contain 'weights' object")
 
     constraints = load_config("rubric_selection.weight_constraints")
-    result = validate_and_normalize(weights, constraints)
-    write_output(result)
+    return validate_and_normalize(weights, constraints)
+
+
+def main():
+    run(handle)
 
 
 if __name__ == "__main__":